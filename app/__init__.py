@@ -7,9 +7,10 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
 from config.config import config
+from app.utils.db_routing import RoutingSession
 
-# 初始化扩展
-db = SQLAlchemy()
+# 初始化扩展（会话在只读请求中把查询路由到只读副本）
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 csrf = CSRFProtect()
 
@@ -28,8 +29,17 @@ def create_app(config_name='default'):
     # 加载配置
     app.config.from_object(config[config_name])
     
+    # 根据连接池配置生成引擎参数（Flask-SQLAlchemy 3.0 不读取旧的 SQLALCHEMY_POOL_* 配置）
+    from app.utils.db_pool import build_engine_options, init_engine_pool
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config)
+    
     # 初始化扩展
     db.init_app(app)
+    init_engine_pool(app)
+    
+    # 只读副本路由
+    from app.utils.db_routing import init_replica_routing
+    init_replica_routing(app)
     login_manager.init_app(app)
     csrf.init_app(app)
     
@@ -37,6 +47,22 @@ def create_app(config_name='default'):
     from app.utils.logger import setup_logging
     setup_logging(app)
     
+    # 配置缓存后端
+    from app.utils.cache import init_cache
+    init_cache(app)
+    
+    # 检查任务队列的部署条件（依赖缓存后端）
+    from app.services.jobs import init_jobs
+    init_jobs(app)
+    
+    # 配置浏览次数缓冲
+    from app.services.view_counter import init_view_counter
+    init_view_counter(app)
+    
+    # 配置分类注册表
+    from app.services.category_registry import init_category_registry
+    init_category_registry(app)
+    
     # 配置性能监控
     from app.utils.performance import setup_performance_monitoring
     setup_performance_monitoring(app)
@@ -52,9 +78,9 @@ def create_app(config_name='default'):
     
     @login_manager.user_loader
     def load_user(user_id):
-        """加载用户回调函数"""
-        from app.models.user import User
-        return User.query.get(int(user_id))
+        """加载用户回调函数（返回缓存的身份信息，见 app.utils.principal）"""
+        from app.utils.principal import load_principal
+        return load_principal(int(user_id))
     
     # 注册蓝图
     from app.routes.auth import auth_bp
@@ -102,8 +128,34 @@ def create_app(config_name='default'):
             return ''
         return text.replace('\n', '<br>\n')
     
+    # 注册命令行命令
+    from app.commands import register_commands
+    register_commands(app)
+    
     # 创建数据库表
     with app.app_context():
+        from sqlalchemy import inspect
+        existing_tables = set(inspect(db.engine).get_table_names())
         db.create_all()
+        
+        # 为已有数据库补充新增的列和索引
+        from app.utils.database import upgrade_schema
+        added_columns = upgrade_schema()
+        from app.services.jobs import enqueue
+        if {'articles.comment_count', 'comments.reply_count'} & set(added_columns):
+            enqueue('counters.reconcile', dedupe_key='counters.reconcile')
+        if 'comments.path' in added_columns:
+            # 补齐之前评论线程分页按 parent_id 组装没有路径的回复
+            enqueue('comments.backfill_paths', dedupe_key='comments.backfill_paths')
+        if 'users' in existing_tables and 'user_stats' not in existing_tables:
+            # 已有用户的统计汇总在生成之前按实际数据即时统计
+            enqueue('users.rebuild_stats', dedupe_key='users.rebuild_stats')
+        if 'articles.word_count' in added_columns:
+            # 补齐之前旧文章的详情页不显示字数和阅读时间
+            enqueue('articles.backfill_stats', dedupe_key='articles.backfill_stats')
+        
+        # 初始化全文检索索引
+        from app.services.search import init_search
+        init_search(app)
     
     return app
\ No newline at end of file
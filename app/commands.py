@@ -0,0 +1,218 @@
+"""
+命令行命令
+Command Line Commands
+
+通过 flask 命令行执行的维护任务，例如：
+    flask search-index rebuild
+    flask counters reconcile
+    flask comments backfill-paths
+    flask articles backfill-stats
+    flask users delete 42
+    flask users rebuild-stats
+    flask jobs work
+    flask indexes advise
+"""
+import click
+from flask.cli import AppGroup
+
+
+search_cli = AppGroup('search-index', help='全文检索索引维护')
+
+
+@search_cli.command('create')
+def create_search_index():
+    """创建全文检索索引（已存在时跳过）"""
+    from app.services.search import create_index, get_dialect
+
+    click.echo(f'正在为 {get_dialect()} 创建全文检索索引...')
+    if create_index():
+        click.echo('全文检索索引已就绪。')
+    else:
+        click.echo('当前数据库不支持全文检索索引，将使用LIKE匹配。')
+
+
+@search_cli.command('rebuild')
+def rebuild_search_index():
+    """重建全文检索索引"""
+    from app.services.search import rebuild_index, get_dialect
+
+    click.echo(f'正在重建 {get_dialect()} 全文检索索引...')
+    if rebuild_index():
+        click.echo('全文检索索引重建完成。')
+    else:
+        click.echo('当前数据库不支持全文检索索引，将使用LIKE匹配。')
+
+
+counters_cli = AppGroup('counters', help='冗余计数维护')
+
+
+@counters_cli.command('reconcile')
+@click.option('--batch-size', default=1000, show_default=True, help='每批处理的主键范围大小')
+def reconcile_counters(batch_size):
+    """重新计算文章评论数和评论回复数"""
+    from app.models.comment import Comment
+
+    click.echo('正在重新计算评论计数...')
+    for column, fixed in Comment.reconcile_counters(batch_size=batch_size).items():
+        click.echo(f'{column}: 修正 {fixed} 行')
+    click.echo('评论计数重新计算完成。')
+
+
+comments_cli = AppGroup('comments', help='评论数据维护')
+
+
+@comments_cli.command('backfill-paths')
+@click.option('--batch-size', default=1000, show_default=True, help='每批处理的行数')
+def backfill_comment_paths(batch_size):
+    """为缺少物化路径的评论分批补充路径"""
+    from app.models.comment import Comment
+
+    click.echo('正在补充评论物化路径...')
+    filled = Comment.backfill_paths(batch_size=batch_size)
+    click.echo(f'评论物化路径补充完成，共 {filled} 条。')
+
+
+articles_cli = AppGroup('articles', help='文章数据维护')
+
+
+@articles_cli.command('backfill-stats')
+@click.option('--batch-size', default=500, show_default=True, help='每批读取的文章数量')
+def backfill_article_stats(batch_size):
+    """为缺少字数统计的文章补齐字数、阅读时间和空摘要"""
+    from app.models.article import Article
+
+    click.echo('正在统计文章字数...')
+    filled = Article.backfill_content_stats(batch_size=batch_size)
+    click.echo(f'文章字数统计完成，共 {filled} 篇。')
+
+
+@articles_cli.command('delete')
+@click.argument('article_ids', nargs=-1, type=int, required=True)
+@click.option('--batch-size', default=500, show_default=True, help='每批删除的行数')
+def delete_articles(article_ids, batch_size):
+    """分批删除文章及其全部评论"""
+    from app.services.deletion import delete_articles as delete
+
+    counts = delete(article_ids, batch_size=batch_size, progress=_echo_deletion_progress)
+    click.echo(f"删除完成：{counts['articles']} 篇文章，{counts['comments']} 条评论。")
+
+
+users_cli = AppGroup('users', help='用户数据维护')
+
+
+@users_cli.command('delete')
+@click.argument('user_id', type=int)
+@click.option('--batch-size', default=500, show_default=True, help='每批删除的行数')
+def delete_user(user_id, batch_size):
+    """分批删除用户及其全部文章和评论"""
+    from app.services.deletion import delete_user as delete
+
+    counts = delete(user_id, batch_size=batch_size, progress=_echo_deletion_progress)
+    if not counts['users']:
+        click.echo(f'用户 {user_id} 不存在。')
+        return
+    click.echo(f"删除完成：{counts['articles']} 篇文章，{counts['comments']} 条评论。")
+
+
+@users_cli.command('rebuild-stats')
+@click.option('--batch-size', default=1000, show_default=True, help='每批处理的用户ID范围大小')
+def rebuild_user_stats(batch_size):
+    """重新统计用户的文章、评论和浏览次数汇总"""
+    from app.models.user_stats import UserStats
+
+    click.echo('正在重新统计用户汇总...')
+    result = UserStats.rebuild(batch_size=batch_size)
+    click.echo(f"用户汇总统计完成：新增 {result['created']} 行，修正 {result['fixed']} 行。")
+
+
+def _echo_deletion_progress(stage, counts):
+    click.echo(f"已删除 {counts['articles']} 篇文章，{counts['comments']} 条评论")
+
+
+jobs_cli = AppGroup('jobs', help='后台任务队列')
+
+
+@jobs_cli.command('work')
+@click.option('--burst', is_flag=True, help='处理完所有到期任务后退出')
+def work(burst):
+    """运行任务进程"""
+    from flask import current_app
+    from app.services.jobs import run_worker
+
+    processed = run_worker(current_app._get_current_object(), burst=burst)
+    if burst:
+        click.echo(f'共执行 {processed} 个任务。')
+
+
+@jobs_cli.command('enqueue')
+@click.argument('job_type')
+@click.option('--payload', default='{}', show_default=True, help='任务参数（JSON）')
+def enqueue_job(job_type, payload):
+    """将任务加入队列，例如 flask jobs enqueue search.reindex"""
+    import json
+    from app.services.jobs import enqueue
+
+    try:
+        job = enqueue(job_type, json.loads(payload), dedupe_key=job_type if payload == '{}' else None)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    click.echo(f'任务 {job.id} ({job.type}) 状态: {job.status}')
+
+
+@jobs_cli.command('list')
+@click.option('--status', type=click.Choice(['queued', 'running', 'finished', 'failed']), help='按状态筛选')
+@click.option('--limit', default=20, show_default=True, help='显示数量')
+def list_jobs(status, limit):
+    """列出最近的任务"""
+    from app.models.job import Job
+
+    query = Job.query
+    if status:
+        query = query.filter_by(status=status)
+    for job in query.order_by(Job.id.desc()).limit(limit):
+        error = f'  {job.last_error}' if job.last_error else ''
+        click.echo(f'{job.id}\t{job.type}\t{job.status}\t尝试 {job.attempts}/{job.max_attempts}{error}')
+
+
+indexes_cli = AppGroup('indexes', help='数据库索引检查')
+
+
+@indexes_cli.command('advise')
+@click.option('--verbose', '-v', is_flag=True, help='显示所有查询的SQL和执行计划')
+@click.option('--strict', is_flag=True, help='发现问题时以非零状态码退出（用于部署检查）')
+def advise_indexes(verbose, strict):
+    """用 EXPLAIN 检查热点查询形态，报告全表扫描和额外排序"""
+    from app.utils.index_advisor import advise
+
+    results = advise()
+    flagged = [result for result in results if result['issues']]
+    for result in results:
+        if not (verbose or result['issues']):
+            continue
+        marker = '!!' if result['issues'] else 'OK'
+        click.echo(f"{marker} {result['name']}")
+        for issue in result['issues']:
+            click.echo(f'   - {issue}')
+        if verbose:
+            click.echo('   ' + ' '.join(result['sql'].split()))
+            for line in result['plan']:
+                click.echo(f'   | {line}')
+    click.echo(f'共检查 {len(results)} 个查询形态，{len(flagged)} 个存在问题。')
+    if strict and flagged:
+        raise SystemExit(1)
+
+
+def register_commands(app):
+    """
+    注册命令行命令
+
+    Args:
+        app: Flask应用实例
+    """
+    app.cli.add_command(search_cli)
+    app.cli.add_command(counters_cli)
+    app.cli.add_command(comments_cli)
+    app.cli.add_command(articles_cli)
+    app.cli.add_command(users_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(indexes_cli)
@@ -5,7 +5,7 @@ Article Forms
 from flask_wtf import FlaskForm
 from wtforms import StringField, TextAreaField, SelectField, SubmitField, HiddenField
 from wtforms.validators import DataRequired, Length, Optional, ValidationError
-from app.models.category import Category
+from app.services.category_registry import category_choices, get_category
 
 class ArticleForm(FlaskForm):
     """
@@ -42,16 +42,13 @@ class ArticleForm(FlaskForm):
     
     def __init__(self, *args, **kwargs):
         super(ArticleForm, self).__init__(*args, **kwargs)
-        # 动态加载分类选项
-        self.category_id.choices = [(0, '请选择分类')] + [
-            (category.id, category.name) for category in Category.query.all()
-        ]
+        # 动态加载分类选项（读取进程内分类快照）
+        self.category_id.choices = category_choices('请选择分类')
     
     def validate_category_id(self, field):
         """验证分类ID"""
         if field.data and field.data > 0:
-            category = Category.query.get(field.data)
-            if not category:
+            if not get_category(field.data):
                 raise ValidationError('选择的分类不存在')
 
 class ArticleSearchForm(FlaskForm):
@@ -73,10 +70,8 @@ class ArticleSearchForm(FlaskForm):
     
     def __init__(self, *args, **kwargs):
         super(ArticleSearchForm, self).__init__(*args, **kwargs)
-        # 动态加载分类选项
-        self.category_id.choices = [(0, '所有分类')] + [
-            (category.id, category.name) for category in Category.query.all()
-        ]
+        # 动态加载分类选项（读取进程内分类快照）
+        self.category_id.choices = category_choices('所有分类')
 
 class ArticleDeleteForm(FlaskForm):
     """
@@ -7,5 +7,7 @@ from .admin import Admin
 from .category import Category
 from .article import Article
 from .comment import Comment
+from .job import Job
+from .user_stats import UserStats
 
-__all__ = ['User', 'Admin', 'Category', 'Article', 'Comment']
\ No newline at end of file
+__all__ = ['User', 'Admin', 'Category', 'Article', 'Comment', 'Job', 'UserStats']
\ No newline at end of file
@@ -47,7 +47,8 @@ class Admin(db.Model):
             permissions = self.get_default_permissions()
         self.set_permissions(permissions)
     
-    def get_default_permissions(self):
+    @staticmethod
+    def get_default_permissions():
         """
         获取默认权限
         
@@ -97,6 +98,24 @@ class Admin(db.Model):
         """
         self.permissions = json.dumps(permissions, ensure_ascii=False)
     
+    @staticmethod
+    def parse_permissions(text):
+        """
+        解析JSON格式的权限文本
+        
+        Args:
+            text (str): 权限文本
+            
+        Returns:
+            dict: 权限字典，为空或格式错误时返回默认权限
+        """
+        if text:
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError:
+                pass
+        return Admin.get_default_permissions()
+    
     def get_permissions(self):
         """
         获取权限
@@ -104,17 +123,14 @@ class Admin(db.Model):
         Returns:
             dict: 权限字典
         """
-        if self.permissions:
-            try:
-                return json.loads(self.permissions)
-            except json.JSONDecodeError:
-                return self.get_default_permissions()
-        return self.get_default_permissions()
+        return self.parse_permissions(self.permissions)
     
     def has_permission(self, module, action):
         """
         检查是否有特定权限
         
+        解析结果按权限文本缓存在实例上，权限修改后自动重新解析。
+        
         Args:
             module (str): 模块名称
             action (str): 操作名称
@@ -122,8 +138,11 @@ class Admin(db.Model):
         Returns:
             bool: 是否有权限
         """
-        permissions = self.get_permissions()
-        return permissions.get(module, {}).get(action, False)
+        cached = getattr(self, '_parsed_permissions', None)
+        if cached is None or cached[0] != self.permissions:
+            cached = (self.permissions, self.parse_permissions(self.permissions))
+            self._parsed_permissions = cached
+        return cached[1].get(module, {}).get(action, False)
     
     def can_manage_users(self):
         """
@@ -224,6 +243,21 @@ class Admin(db.Model):
         """
         return self.role == 'super_admin'
     
+    def get_cache_tags(self):
+        """
+        获取管理员记录变更时需要失效的缓存标签
+        
+        角色和权限缓存在登录用户的身份信息中（见 app.utils.principal）。
+        
+        Returns:
+            set: 缓存标签集合
+        """
+        from app.utils.cache import get_attribute_values, has_relevant_changes
+        
+        if not has_relevant_changes(self):
+            return set()
+        return {f'principal:{user_id}' for user_id in get_attribute_values(self, 'user_id')}
+    
     def to_dict(self):
         """
         转换为字典
@@ -2,9 +2,83 @@
 文章数据模型
 Article Data Model
 """
+import math
+import re
 from datetime import datetime
 from app import db
-from sqlalchemy import or_
+
+
+# 正文切分为标签和文本片段：标签内不含 "<"，未闭合的 "<" 按普通文本处理，扫描不会越过下一个 "<"；
+# 长文本按 4KB 分段，提取摘要时不会复制整段正文
+_MARKUP_RE = re.compile(r'<[^<>]+>|[^<]{1,4096}|<')
+_TAG_RE = re.compile(r'<[^<>]+>')
+_CJK_RE = re.compile('[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af]+')
+_WORD_RE = re.compile(r"[A-Za-z0-9]+(?:['’][A-Za-z]+)*")
+
+# 阅读速度：中日韩文字按字计，其他文字按单词计
+READING_SPEED_CHARS = 400  # 字/分钟
+READING_SPEED_WORDS = 200  # 词/分钟
+
+
+def iter_text(content):
+    """
+    逐段产出去除HTML标签后的文本（不生成完整的去标签副本）
+
+    Args:
+        content (str): 文章正文
+
+    Yields:
+        str: 标签之间的文本片段
+    """
+    for match in _MARKUP_RE.finditer(content or ''):
+        text = match.group()
+        if text[0] != '<' or len(text) == 1:
+            yield text
+
+
+def extract_summary(content, length=200):
+    """
+    提取摘要：去除HTML标签后的前 length 个字符，之后还有文本时追加省略号
+
+    凑满长度后即停止扫描，耗时与正文长度无关。
+
+    Args:
+        content (str): 文章正文
+        length (int): 摘要长度
+
+    Returns:
+        str: 摘要
+    """
+    parts = []
+    remaining = length
+    for text in iter_text(content):
+        if len(text) > remaining:
+            parts.append(text[:remaining])
+            return ''.join(parts) + '...'
+        parts.append(text)
+        remaining -= len(text)
+    return ''.join(parts)
+
+
+def count_words(content):
+    """
+    统计正文字数并估算阅读时间
+
+    中日韩文字每字计一个字，其他文字按连续字母数字计一个词。需要扫描全文，只在保存时执行。
+
+    Args:
+        content (str): 文章正文
+
+    Returns:
+        tuple: (字数, 阅读时间（分钟，至少1分钟）)
+    """
+    # 标签替换为空格，避免相邻标签两侧的单词被连在一起
+    text = _TAG_RE.sub(' ', content or '')
+    chars = sum(map(len, _CJK_RE.findall(text)))
+    words = len(_WORD_RE.findall(text))
+    minutes = chars / READING_SPEED_CHARS + words / READING_SPEED_WORDS
+    return chars + words, max(1, math.ceil(minutes))
+
 
 class Article(db.Model):
     """
@@ -18,15 +92,32 @@ class Article(db.Model):
     - 3.5: 用户删除自己的文章时移除文章及其相关评论
     """
     __tablename__ = 'articles'
+    # 与列表页的过滤和排序条件一致的组合索引（主键隐式位于索引末尾，满足 (时间, id) 游标排序），
+    # flask indexes advise 会用 EXPLAIN 检查各查询形态是否命中
+    __table_args__ = (
+        # 公开列表：status='published' ORDER BY published_at DESC
+        db.Index('ix_articles_status_published_at', 'status', 'published_at'),
+        # 分类列表和分类文章数：category_id=? AND status='published'
+        db.Index('ix_articles_category_status_published_at', 'category_id', 'status', 'published_at'),
+        # 我的文章：author_id=? ORDER BY created_at DESC
+        db.Index('ix_articles_author_created_at', 'author_id', 'created_at'),
+        # 后台文章管理：status=? ORDER BY created_at DESC
+        db.Index('ix_articles_status_created_at', 'status', 'created_at'),
+    )
     
     # 主键
     id = db.Column(db.Integer, primary_key=True)
     
     # 基本信息
     title = db.Column(db.String(200), nullable=False, index=True)
-    content = db.Column(db.Text, nullable=False)
+    # 正文延迟加载：列表只显示标题和摘要，编辑页和搜索摘录用 undefer(Article.content) 在同一查询中加载
+    content = db.deferred(db.Column(db.Text, nullable=False))
     summary = db.Column(db.String(500))
     
+    # 字数和阅读时间（分钟），正文变化时在保存前计算
+    word_count = db.Column(db.Integer)
+    reading_time = db.Column(db.Integer)
+    
     # 关联字段
     author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), index=True)
@@ -37,6 +128,8 @@ class Article(db.Model):
     
     # 统计信息
     view_count = db.Column(db.Integer, default=0, nullable=False)
+    # 评论数量（冗余计数，由评论模型的事件在同一事务内维护）
+    comment_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     
     # 时间戳
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -81,10 +174,13 @@ class Article(db.Model):
             length (int): 摘要长度
         """
         if self.content:
-            # 移除HTML标签（简单处理）
-            import re
-            clean_content = re.sub(r'<[^>]+>', '', self.content)
-            self.summary = clean_content[:length] + ('...' if len(clean_content) > length else '')
+            self.summary = extract_summary(self.content, length)
+    
+    def update_content_stats(self):
+        """
+        根据正文统计字数和阅读时间
+        """
+        self.word_count, self.reading_time = count_words(self.content)
     
     def publish(self):
         """
@@ -163,14 +259,36 @@ class Article(db.Model):
         """
         return user.id == self.author_id or user.is_admin()
     
+    def get_cache_tags(self):
+        """
+        获取文章变更时需要失效的缓存标签
+        
+        浏览次数的变化不影响缓存内容，因此只有浏览次数变化时不失效。
+        文章更换分类时，新旧分类的标签都会失效。
+        
+        Returns:
+            set: 缓存标签集合
+        """
+        from app.utils.cache import get_attribute_values, has_relevant_changes
+        
+        if not has_relevant_changes(self, ignored=('view_count',)):
+            return set()
+        
+        tags = {'article-list', f'article:{self.id}', f'user:{self.author_id}'}
+        for category_id in get_attribute_values(self, 'category_id'):
+            tags.add(f'category:{category_id}')
+        return tags
+    
     def get_comment_count(self):
         """
         获取文章评论数量
         
+        读取由评论增删维护的计数列，不再执行COUNT查询。
+        
         Returns:
             int: 评论数量
         """
-        return self.comments.count()
+        return self.comment_count or 0
     
     def get_approved_comments(self):
         """
@@ -179,9 +297,8 @@ class Article(db.Model):
         Returns:
             Query: 评论查询对象
         """
-        return self.comments.filter_by(status='approved').order_by(
-            self.comments.property.mapper.class_.created_at.asc()
-        )
+        from app.models.comment import Comment
+        return self.comments.filter_by(status='approved').order_by(Comment.created_at.asc())
     
     @staticmethod
     def validate_title(title):
@@ -223,6 +340,8 @@ class Article(db.Model):
         """
         搜索文章
         
+        有关键词时使用全文索引并按相关度排序，否则按创建时间倒序。
+        
         Args:
             keyword (str): 搜索关键词
             category_id (int): 分类ID
@@ -231,20 +350,8 @@ class Article(db.Model):
         Returns:
             Query: 文章查询对象
         """
-        query = Article.query.filter_by(status=status)
-        
-        if keyword:
-            search_filter = or_(
-                Article.title.contains(keyword),
-                Article.content.contains(keyword),
-                Article.summary.contains(keyword)
-            )
-            query = query.filter(search_filter)
-        
-        if category_id:
-            query = query.filter_by(category_id=category_id)
-        
-        return query.order_by(Article.created_at.desc())
+        from app.services.search import search_articles
+        return search_articles(keyword, category_id=category_id, status=status)
     
     @staticmethod
     def get_published_articles():
@@ -267,7 +374,8 @@ class Article(db.Model):
         Returns:
             list: 文章列表
         """
-        return Article.get_published_articles().limit(limit).all()
+        from app.utils.performance import optimize_article_query
+        return optimize_article_query(Article.get_published_articles()).limit(limit).all()
     
     def to_dict(self, include_content=False):
         """
@@ -279,6 +387,9 @@ class Article(db.Model):
         Returns:
             dict: 文章信息字典
         """
+        from app.services.category_registry import get_category
+
+        category = get_category(self.category_id)
         data = {
             'id': self.id,
             'title': self.title,
@@ -286,10 +397,12 @@ class Article(db.Model):
             'author_id': self.author_id,
             'author_name': self.author.get_display_name() if self.author else None,
             'category_id': self.category_id,
-            'category_name': self.category.name if self.category else None,
+            'category_name': category.name if category else None,
             'status': self.status,
             'view_count': self.view_count,
             'comment_count': self.get_comment_count(),
+            'word_count': self.word_count,
+            'reading_time': self.reading_time,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'published_at': self.published_at.isoformat() if self.published_at else None
@@ -300,5 +413,64 @@ class Article(db.Model):
         
         return data
     
+    @staticmethod
+    def backfill_content_stats(batch_size=500):
+        """
+        按主键分批为缺少字数统计的文章计算字数和阅读时间
+        
+        同时为没有摘要的文章生成摘要。每批单独提交，不修改文章的更新时间，可在线执行。
+        
+        Args:
+            batch_size (int): 每批读取的文章数量
+            
+        Returns:
+            int: 补齐统计的文章数量
+        """
+        from sqlalchemy import select, bindparam, func
+        from app.utils.cache import invalidate_tags
+        
+        table = Article.__table__
+        update = table.update().where(table.c.id == bindparam('row_id')).values(
+            word_count=bindparam('words'), reading_time=bindparam('minutes'),
+            summary=func.coalesce(func.nullif(table.c.summary, ''), bindparam('generated_summary')),
+            updated_at=table.c.updated_at
+        )
+        
+        filled = 0
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                select(table.c.id, table.c.content)
+                .where(table.c.id > last_id, table.c.word_count.is_(None))
+                .order_by(table.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            
+            params = []
+            for row in rows:
+                words, minutes = count_words(row.content)
+                params.append({
+                    'row_id': row.id, 'words': words, 'minutes': minutes,
+                    'generated_summary': extract_summary(row.content)
+                })
+            db.session.execute(update, params)
+            db.session.commit()
+            invalidate_tags('article-list', *(f"article:{param['row_id']}" for param in params))
+            filled += len(params)
+        
+        return filled
+    
     def __repr__(self):
-        return f'<Article {self.title}>'
\ No newline at end of file
+        return f'<Article {self.title}>'
+
+
+@db.event.listens_for(Article, 'before_insert')
+@db.event.listens_for(Article, 'before_update')
+def _update_content_stats(mapper, connection, target):
+    from sqlalchemy import inspect
+    
+    # 只有正文变化（或尚未统计）时才重新计算，发布、改分类等更新不读取正文
+    if target.word_count is None or inspect(target).attrs.content.history.has_changes():
+        target.update_content_stats()
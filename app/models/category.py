@@ -58,6 +58,22 @@ class Category(db.Model):
         slug = re.sub(r'[-\s]+', '-', slug)
         return slug.strip('-')
     
+    def get_cache_tags(self):
+        """
+        获取分类变更时需要失效的缓存标签
+        
+        分类名称显示在文章列表中，因此分类变更也会失效文章列表。
+        
+        Returns:
+            set: 缓存标签集合
+        """
+        from app.utils.cache import has_relevant_changes
+        
+        if not has_relevant_changes(self):
+            return set()
+        
+        return {'category-list', 'article-list', f'category:{self.id}'}
+    
     def get_article_count(self):
         """
         获取分类下的文章数量
@@ -65,7 +81,37 @@ class Category(db.Model):
         Returns:
             int: 文章数量
         """
-        return self.articles.filter_by(status='published').count()
+        count = self.__dict__.get('_article_count')
+        if count is None:
+            count = self.articles.filter_by(status='published').count()
+        return count
+    
+    @staticmethod
+    def preload_article_counts(categories):
+        """
+        批量加载分类下已发布文章数量
+        
+        用一条分组聚合查询代替逐个调用 get_article_count。
+        
+        Args:
+            categories (list): 分类列表
+            
+        Returns:
+            list: 原分类列表
+        """
+        from app.models.article import Article
+        
+        ids = [category.id for category in categories if category.id is not None]
+        if not ids:
+            return categories
+        
+        rows = db.session.query(Article.category_id, db.func.count(Article.id))\
+                         .filter(Article.category_id.in_(ids), Article.status == 'published')\
+                         .group_by(Article.category_id).all()
+        counts = dict(rows)
+        for category in categories:
+            category._article_count = counts.get(category.id, 0)
+        return categories
     
     def get_published_articles(self):
         """
@@ -171,4 +217,10 @@ class Category(db.Model):
         }
     
     def __repr__(self):
-        return f'<Category {self.name}>'
\ No newline at end of file
+        return f'<Category {self.name}>'
+
+
+@db.event.listens_for(Category, 'expire')
+def _discard_preloaded_count(target, attrs):
+    """对象过期（如提交后）时丢弃预加载的计数，避免读到旧值"""
+    target.__dict__.pop('_article_count', None)
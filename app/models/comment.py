@@ -5,6 +5,12 @@ Comment Data Model
 from datetime import datetime
 from app import db
 
+# 物化路径：每一级为定宽的36进制评论ID加分隔符，例如 "00000a/00000f/"。
+# 定宽编码使路径的字符串顺序与线程的深度优先顺序一致，子树对应一个连续的路径区间。
+PATH_SEGMENT_WIDTH = 6
+PATH_SEPARATOR = '/'
+PATH_MAX_LENGTH = 255
+
 class Comment(db.Model):
     """
     评论模型
@@ -16,7 +22,26 @@ class Comment(db.Model):
     - 4.4: 用户删除自己的评论时移除该评论
     """
     __tablename__ = 'comments'
+    __table_args__ = (
+        db.Index('ix_comments_article_path', 'article_id', 'path'),
+        # 文章评论树：article_id=? AND status='approved' ORDER BY created_at
+        db.Index('ix_comments_article_status_created_at', 'article_id', 'status', 'created_at'),
+        # 分页的顶级评论：article_id=? AND status=? AND parent_id IS NULL ORDER BY id
+        db.Index('ix_comments_article_status_parent', 'article_id', 'status', 'parent_id'),
+        # 评论的回复：parent_id=? AND status=? ORDER BY created_at
+        db.Index('ix_comments_parent_status_created_at', 'parent_id', 'status', 'created_at'),
+        # 我的评论：author_id=? ORDER BY created_at DESC
+        db.Index('ix_comments_author_created_at', 'author_id', 'created_at'),
+        # 后台评论审核：status=? ORDER BY created_at
+        db.Index('ix_comments_status_created_at', 'status', 'created_at'),
+    )
     
+    # 最大回复层级（受物化路径长度限制，顶级评论为第0层）
+    MAX_DEPTH = PATH_MAX_LENGTH // (PATH_SEGMENT_WIDTH + 1) - 1
+
+    # 批量审核操作及对应的目标状态（None 表示删除）
+    BULK_ACTIONS = {'approve': 'approved', 'reject': 'rejected', 'pending': 'pending', 'delete': None}
+
     # 主键
     id = db.Column(db.Integer, primary_key=True)
     
@@ -32,6 +57,12 @@ class Comment(db.Model):
     status = db.Column(db.Enum('approved', 'pending', 'rejected', name='comment_status'), 
                       default='approved', nullable=False, index=True)
     
+    # 物化路径（从线程根评论到本评论的ID路径，插入后由映射器事件写入）
+    path = db.Column(db.String(PATH_MAX_LENGTH))
+    
+    # 已审核回复数量（冗余计数，由下方的映射器事件在同一事务内维护）
+    reply_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
     # 时间戳
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -144,14 +175,35 @@ class Comment(db.Model):
         """
         return user.id == self.author_id or user.is_admin()
     
+    def get_cache_tags(self):
+        """
+        获取评论变更时需要失效的缓存标签
+        
+        评论数量显示在文章列表中，因此评论变更也会失效文章列表。
+        
+        Returns:
+            set: 缓存标签集合
+        """
+        from app.utils.cache import has_relevant_changes
+        
+        if not has_relevant_changes(self):
+            return set()
+        
+        tags = {'article-list', f'comment:{self.id}', f'article:{self.article_id}', f'user:{self.author_id}'}
+        if self.parent_id:
+            tags.add(f'comment:{self.parent_id}')
+        return tags
+    
     def get_reply_count(self):
         """
-        获取回复数量
+        获取已审核回复数量
+        
+        读取由回复增删和审核维护的计数列，不再执行COUNT查询。
         
         Returns:
             int: 回复数量
         """
-        return self.replies.filter_by(status='approved').count()
+        return self.reply_count or 0
     
     def get_approved_replies(self):
         """
@@ -166,9 +218,16 @@ class Comment(db.Model):
         """
         获取评论层级深度
         
+        通过 get_comment_tree 加载时直接使用预先计算的深度。
+        
         Returns:
             int: 层级深度
         """
+        if 'tree_depth' in self.__dict__:
+            return self.tree_depth
+        if self.path:
+            return self.path.count(PATH_SEPARATOR) - 1
+        
         depth = 0
         current = self
         while current.parent_id:
@@ -185,11 +244,51 @@ class Comment(db.Model):
         Returns:
             Comment: 根评论对象
         """
+        if self.path:
+            root_id = int(self.path[:PATH_SEGMENT_WIDTH], 36)
+            return self if root_id == self.id else db.session.get(Comment, root_id)
+        
         current = self
         while current.parent_id:
             current = current.parent
         return current
     
+    def get_subtree(self, status='approved'):
+        """
+        获取评论的全部后代评论
+        
+        基于物化路径的区间查询，按线程的深度优先顺序返回。
+        
+        Args:
+            status (str): 评论状态，None表示不限状态
+            
+        Returns:
+            Query: 评论查询对象
+        """
+        query = Comment.query.filter(
+            Comment.article_id == self.article_id,
+            Comment.path > self.path,
+            Comment.path < _path_upper_bound(self.path)
+        )
+        if status:
+            query = query.filter(Comment.status == status)
+        return query.order_by(Comment.path.asc())
+    
+    @staticmethod
+    def validate_reply_depth(parent):
+        """
+        验证能否回复指定评论
+        
+        Args:
+            parent: 父评论对象
+            
+        Returns:
+            tuple: (是否有效, 错误信息)
+        """
+        if parent.get_depth() >= Comment.MAX_DEPTH:
+            return False, "回复层级过深，无法继续回复"
+        return True, ""
+    
     @staticmethod
     def validate_content(content):
         """
@@ -229,6 +328,134 @@ class Comment(db.Model):
         
         return query.order_by(Comment.created_at.asc())
     
+    @staticmethod
+    def get_comment_tree(article_id, status='approved'):
+        """
+        一次查询加载文章的评论树
+        
+        用一条查询加载文章下指定状态的全部评论及作者，在内存中按 parent_id 组装成树，
+        并预先计算每条评论的深度。每条评论的子回复保存在 tree_replies 中（按时间正序），
+        父评论关系直接指向已加载的对象，渲染和序列化时不再逐层查询。
+        与逐层遍历一致，父评论不满足状态条件时其下的回复不会出现在树中。
+        
+        Args:
+            article_id (int): 文章ID
+            status (str): 评论状态
+            
+        Returns:
+            tuple: (顶级评论列表, 树中评论总数)
+        """
+        from sqlalchemy.orm import joinedload
+        
+        comments = Comment.query.options(joinedload(Comment.author))\
+                                .filter_by(article_id=article_id, status=status)\
+                                .order_by(Comment.created_at.asc(), Comment.id.asc()).all()
+        
+        return _assemble_tree(comments)
+    
+    @staticmethod
+    def get_thread_page(article_id, page=1, per_page=20, status='approved', cursor=None):
+        """
+        分页加载文章的评论线程
+        
+        先分页查询顶级评论，再用一条物化路径区间查询加载当前页所有线程的回复，
+        组装方式与 get_comment_tree 相同。尚未补充物化路径的回复（backfill_paths
+        完成之前）在同一条查询中一并加载，按 parent_id 组装。
+        
+        Args:
+            article_id (int): 文章ID
+            page (int): 页码
+            per_page (int): 每页顶级评论数量
+            status (str): 评论状态
+            cursor (str): 分页游标，不为None时使用游标分页（空字符串表示第一页）
+            
+        Returns:
+            Pagination: 顶级评论分页对象（游标分页时为 KeysetPagination），
+            评论的回复保存在 tree_replies 中
+        """
+        from sqlalchemy import and_, or_
+        from sqlalchemy.orm import joinedload
+        from app.utils.database import keyset_paginate
+        
+        query = Comment.query.options(joinedload(Comment.author))\
+                             .filter_by(article_id=article_id, status=status)
+        pagination = keyset_paginate(
+            query.filter(Comment.parent_id.is_(None)), (Comment.id,), cursor=cursor,
+            per_page=per_page if per_page > 0 else 20, descending=False,
+            page=page if cursor is None else None,
+            total_key=f'comment-roots:{article_id}:{status}', total_tags=(f'article:{article_id}',)
+        )
+        
+        roots = [comment for comment in pagination.items if comment.path]
+        replies = []
+        if pagination.items:
+            # 同一页的顶级评论按ID连续，它们的子树落在同一个路径区间内；
+            # 没有路径的回复按 parent_id 组装，父评论不在本页的被丢弃
+            condition = Comment.path.is_(None)
+            if roots:
+                condition = or_(condition, and_(
+                    Comment.path > roots[0].path,
+                    Comment.path < _path_upper_bound(roots[-1].path)
+                ))
+            replies = query.filter(Comment.parent_id.isnot(None), condition)\
+                           .order_by(Comment.path.asc()).all()
+            if any(reply.path is None for reply in replies):
+                # 同级回复的路径顺序即ID顺序
+                replies.sort(key=lambda reply: reply.id)
+        
+        _assemble_tree(pagination.items + replies)
+        return pagination
+    
+    @staticmethod
+    def backfill_paths(batch_size=1000):
+        """
+        为缺少物化路径的评论分批补充路径
+        
+        每批先处理顶级评论，再处理父评论已有路径的回复，循环直到没有可处理的行，
+        因此任意深度的线程都会逐层补齐。每批单独提交，可在线执行。
+        
+        Args:
+            batch_size (int): 每批处理的行数
+            
+        Returns:
+            int: 补充路径的行数
+        """
+        from sqlalchemy import select, bindparam
+        
+        table = Comment.__table__
+        parent = table.alias('parent')
+        update = table.update().where(table.c.id == bindparam('row_id')).values(
+            path=bindparam('value'), updated_at=table.c.updated_at
+        )
+        
+        filled = 0
+        while True:
+            roots = db.session.execute(
+                select(table.c.id)
+                .where(table.c.path.is_(None), table.c.parent_id.is_(None))
+                .order_by(table.c.id).limit(batch_size)
+            ).scalars().all()
+            children = db.session.execute(
+                select(table.c.id, parent.c.path)
+                .select_from(table.join(parent, table.c.parent_id == parent.c.id))
+                .where(table.c.path.is_(None), parent.c.path.isnot(None))
+                .order_by(table.c.id).limit(batch_size)
+            ).all()
+            
+            changes = [{'row_id': row_id, 'value': _path_segment(row_id)} for row_id in roots]
+            changes.extend(
+                {'row_id': row_id, 'value': parent_path + _path_segment(row_id)}
+                for row_id, parent_path in children
+            )
+            if not changes:
+                break
+            
+            db.session.execute(update, changes)
+            db.session.commit()
+            filled += len(changes)
+        
+        return filled
+    
     @staticmethod
     def get_user_comments(user_id, status=None):
         """
@@ -274,6 +501,124 @@ class Comment(db.Model):
             Comment.created_at.desc()
         ).limit(limit).all()
     
+    @staticmethod
+    def reconcile_counters(batch_size=1000):
+        """
+        重新计算文章评论数和评论回复数
+        
+        按主键范围分批聚合，只更新与实际数量不一致的行，
+        用于修复绕过ORM（如手工SQL、批量删除）导致的计数偏差。
+        
+        Args:
+            batch_size (int): 每批处理的主键范围大小
+            
+        Returns:
+            dict: 各计数列修正的行数
+        """
+        from app.models.article import Article
+        
+        comments = Comment.__table__
+        return {
+            'articles.comment_count': _reconcile_counter(
+                Article.__table__, 'comment_count', comments.c.article_id, batch_size=batch_size
+            ),
+            'comments.reply_count': _reconcile_counter(
+                comments, 'reply_count', comments.c.parent_id,
+                condition=comments.c.status == 'approved', batch_size=batch_size
+            ),
+        }
+
+    @staticmethod
+    def moderation_filter(ids=None, status=None, search=None, author=None, article_id=None,
+                          created_from=None, created_to=None):
+        """
+        构建评论审核的筛选条件（评论管理列表和批量审核共用）
+
+        Args:
+            ids (list): 评论ID列表
+            status (str): 评论状态，'all' 或空表示不限
+            search (str): 评论内容包含的关键词
+            author (str): 作者用户名
+            article_id (int): 文章ID
+            created_from (datetime): 发表时间下限（含）
+            created_to (datetime): 发表时间上限（不含）
+
+        Returns:
+            list: 筛选条件列表
+        """
+        from sqlalchemy import select
+        from app.models.user import User
+
+        conditions = []
+        if ids is not None:
+            conditions.append(Comment.id.in_(ids))
+        if status and status != 'all':
+            conditions.append(Comment.status == status)
+        if search:
+            conditions.append(Comment.content.contains(search))
+        if author:
+            conditions.append(Comment.author_id.in_(
+                select(User.id).where(User.username == author).scalar_subquery()
+            ))
+        if article_id is not None:
+            conditions.append(Comment.article_id == article_id)
+        if created_from is not None:
+            conditions.append(Comment.created_at >= created_from)
+        if created_to is not None:
+            conditions.append(Comment.created_at < created_to)
+        return conditions
+
+    @staticmethod
+    def bulk_moderate(action, conditions, batch_size=500, progress=None):
+        """
+        批量审核或删除符合条件的评论
+
+        按主键顺序分批处理，每批一条 UPDATE（删除时每层回复一条 DELETE），
+        不加载ORM对象。文章评论数和父评论回复数按本批的变化量原子增减，
+        每批单独提交并失效相关缓存标签，因此中途失败时之前的批次已生效。
+        删除评论时一并删除其全部回复（与逐条删除的级联行为一致）。
+
+        Args:
+            action (str): 操作，见 BULK_ACTIONS
+            conditions (list): 筛选条件，通常来自 moderation_filter
+            batch_size (int): 每批处理的评论数
+            progress (callable): 每批提交后调用，参数为累计处理的评论数
+
+        Returns:
+            int: 状态被修改或被删除的评论数（删除时包含级联删除的回复）
+        """
+        from sqlalchemy import select
+        from app.utils.cache import invalidate_tags
+
+        if action not in Comment.BULK_ACTIONS:
+            raise ValueError(f'Unknown moderation action: {action}')
+        status = Comment.BULK_ACTIONS[action]
+
+        table = Comment.__table__
+        query = select(*_moderation_columns()).where(*conditions).order_by(table.c.id).limit(batch_size)
+        if status is not None:
+            query = query.where(table.c.status != status)
+
+        affected = 0
+        last_id = 0
+        while True:
+            rows = db.session.execute(query.where(table.c.id > last_id)).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            if status is None:
+                rows = _delete_comment_rows(rows, batch_size)
+            else:
+                _set_comment_rows_status(rows, status)
+            db.session.commit()
+            invalidate_tags(*_moderation_cache_tags(rows))
+            affected += len(rows)
+            if progress is not None:
+                progress(affected)
+
+        return affected
+
     def to_dict(self, include_replies=False):
         """
         转换为字典
@@ -300,9 +645,409 @@ class Comment(db.Model):
         }
         
         if include_replies:
-            data['replies'] = [reply.to_dict() for reply in self.get_approved_replies()]
+            if 'tree_replies' in self.__dict__:
+                # 已通过 get_comment_tree 加载，递归输出整棵子树
+                data['replies'] = [reply.to_dict(include_replies=True) for reply in self.tree_replies]
+            else:
+                data['replies'] = [reply.to_dict() for reply in self.get_approved_replies()]
         
         return data
     
     def __repr__(self):
-        return f'<Comment {self.id} by {self.author.username if self.author else self.author_id}>'
\ No newline at end of file
+        return f'<Comment {self.id} by {self.author.username if self.author else self.author_id}>'
+
+
+def _path_segment(comment_id):
+    """将评论ID编码为定宽的36进制路径段"""
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    segment = ''
+    while comment_id:
+        comment_id, remainder = divmod(comment_id, 36)
+        segment = digits[remainder] + segment
+    return segment.rjust(PATH_SEGMENT_WIDTH, '0') + PATH_SEPARATOR
+
+
+def _path_upper_bound(path):
+    """子树路径区间的上界（不含）：分隔符之后的下一个字符小于任何路径段字符"""
+    return path[:-1] + chr(ord(PATH_SEPARATOR) + 1)
+
+
+def _assemble_tree(comments):
+    """
+    将评论列表按 parent_id 组装成树
+
+    子回复保存在 tree_replies 中（保持列表中的顺序），父评论关系直接指向已加载的对象，
+    父评论不在列表中的回复被丢弃。
+
+    Args:
+        comments (list): 评论列表
+
+    Returns:
+        tuple: (顶级评论列表, 树中评论总数)
+    """
+    from sqlalchemy.orm.attributes import set_committed_value
+
+    by_id = {comment.id: comment for comment in comments}
+    for comment in comments:
+        comment.tree_replies = []
+
+    roots = []
+    for comment in comments:
+        if comment.parent_id is None:
+            roots.append(comment)
+            continue
+        parent = by_id.get(comment.parent_id)
+        if parent is not None:
+            parent.tree_replies.append(comment)
+            set_committed_value(comment, 'parent', parent)
+
+    # 自顶向下计算深度，同时统计可达的评论数量
+    total = 0
+    stack = [(comment, 0) for comment in roots]
+    while stack:
+        comment, depth = stack.pop()
+        comment.tree_depth = depth
+        total += 1
+        stack.extend((reply, depth + 1) for reply in comment.tree_replies)
+
+    return roots, total
+
+
+def _parent_path(connection, target, parent_id):
+    """获取父评论的物化路径（优先使用会话中已加载的对象）"""
+    from sqlalchemy import select
+    from sqlalchemy.orm import object_session
+    from sqlalchemy.orm.util import identity_key
+
+    session = object_session(target)
+    parent = session.identity_map.get(identity_key(Comment, parent_id)) if session else None
+    if parent is not None and parent.__dict__.get('path'):
+        return parent.__dict__['path']
+
+    table = Comment.__table__
+    return connection.execute(select(table.c.path).where(table.c.id == parent_id)).scalar()
+
+
+def _reconcile_counter(table, counter, foreign_key, condition=None, batch_size=1000):
+    """
+    按主键范围分批重新计算一个计数列
+
+    Args:
+        table: 计数列所在的表
+        counter (str): 计数列名称
+        foreign_key: 子表中指向该表的外键列
+        condition: 子表行的过滤条件
+        batch_size (int): 每批处理的主键范围大小
+
+    Returns:
+        int: 修正的行数
+    """
+    from sqlalchemy import select, func, bindparam
+
+    max_id = db.session.execute(select(func.max(table.c.id))).scalar()
+    if max_id is None:
+        return 0
+
+    update = table.update().where(table.c.id == bindparam('row_id')).values({
+        counter: bindparam('value'),
+        # 计数变化不是内容修改，保留原更新时间
+        'updated_at': table.c.updated_at,
+    })
+
+    fixed = 0
+    for low in range(0, max_id + 1, batch_size):
+        high = low + batch_size
+        current = db.session.execute(
+            select(table.c.id, table.c[counter]).where(table.c.id >= low, table.c.id < high)
+        ).all()
+        if not current:
+            continue
+
+        actual_query = select(foreign_key, func.count()).where(foreign_key >= low, foreign_key < high)
+        if condition is not None:
+            actual_query = actual_query.where(condition)
+        actual = dict(db.session.execute(actual_query.group_by(foreign_key)).all())
+
+        changes = [
+            {'row_id': row_id, 'value': actual.get(row_id, 0)}
+            for row_id, value in current if value != actual.get(row_id, 0)
+        ]
+        if changes:
+            db.session.execute(update, changes)
+            fixed += len(changes)
+        db.session.commit()
+
+    return fixed
+
+
+def _adjust_counter(connection, target, model, row_id, counter, delta):
+    """
+    在当前事务内原子地增减计数列，并同步会话中已加载对象的值
+
+    Args:
+        connection: 当前flush使用的数据库连接
+        target: 触发事件的评论对象
+        model: 计数列所在的模型
+        row_id (int): 计数列所在行的主键
+        counter (str): 计数列名称
+        delta (int): 增量
+    """
+    from sqlalchemy.orm import object_session
+    from sqlalchemy.orm.attributes import set_committed_value
+    from sqlalchemy.orm.util import identity_key
+
+    if row_id is None or not delta:
+        return
+
+    table = model.__table__
+    connection.execute(
+        table.update()
+        .where(table.c.id == row_id)
+        .values({counter: table.c[counter] + delta, 'updated_at': table.c.updated_at})
+    )
+
+    session = object_session(target)
+    instance = session.identity_map.get(identity_key(model, row_id)) if session else None
+    if instance is not None and counter in instance.__dict__:
+        set_committed_value(instance, counter, (instance.__dict__[counter] or 0) + delta)
+
+
+def _apply_counter_deltas(model, counter, deltas):
+    """
+    按行批量增减计数列（一条 executemany 语句）
+
+    Args:
+        model: 计数列所在的模型
+        counter (str): 计数列名称
+        deltas (dict): 行主键 -> 增量
+    """
+    from sqlalchemy import bindparam
+
+    changes = [{'row_id': row_id, 'delta': delta} for row_id, delta in deltas.items()
+               if row_id is not None and delta]
+    if not changes:
+        return
+
+    table = model.__table__
+    db.session.execute(
+        table.update().where(table.c.id == bindparam('row_id')).values({
+            counter: table.c[counter] + bindparam('delta'),
+            'updated_at': table.c.updated_at,
+        }),
+        changes
+    )
+
+
+def _moderation_columns():
+    """批量审核需要读取的评论列"""
+    table = Comment.__table__
+    return table.c.id, table.c.article_id, table.c.parent_id, table.c.author_id, table.c.status
+
+
+def _batched(values, size):
+    """将列表按固定大小分块"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _set_comment_rows_status(rows, status):
+    """
+    以一条 UPDATE 修改一批评论的状态，并调整父评论的已审核回复数
+
+    Args:
+        rows (list): 评论行（_moderation_columns）
+        status (str): 目标状态
+    """
+    from collections import Counter
+
+    table = Comment.__table__
+    db.session.execute(
+        table.update()
+        .where(table.c.id.in_([row.id for row in rows]))
+        .values(status=status, updated_at=datetime.utcnow())
+    )
+
+    approved = status == 'approved'
+    reply_deltas = Counter()
+    for row in rows:
+        if (row.status == 'approved') != approved:
+            reply_deltas[row.parent_id] += 1 if approved else -1
+    _apply_counter_deltas(Comment, 'reply_count', reply_deltas)
+
+
+def _delete_comment_rows(rows, batch_size):
+    """
+    删除一批评论及其全部回复，并调整文章评论数、父评论回复数和作者的评论数
+
+    按 parent_id 逐层查找回复，再自底向上逐层删除，
+    使子回复先于父评论删除，满足自引用外键约束。
+
+    Args:
+        rows (list): 评论行（_moderation_columns）
+        batch_size (int): IN 列表的最大长度
+
+    Returns:
+        list: 被删除的评论行（包含回复）
+    """
+    from collections import Counter, defaultdict
+    from sqlalchemy import select
+    from app.models.article import Article
+    from app.models.user_stats import UserStats
+
+    table = Comment.__table__
+    found = {row.id: row for row in rows}
+    depth = dict.fromkeys(found, 0)
+
+    frontier, level = list(found), 0
+    while frontier:
+        level += 1
+        children = []
+        for chunk in _batched(frontier, batch_size):
+            children.extend(db.session.execute(
+                select(*_moderation_columns()).where(table.c.parent_id.in_(chunk))
+            ).all())
+        for row in children:
+            # 本批中同时被选中的回复也按其实际层级删除
+            found[row.id] = row
+            depth[row.id] = level
+        frontier = [row.id for row in children]
+
+    levels = defaultdict(list)
+    for comment_id, comment_depth in depth.items():
+        levels[comment_depth].append(comment_id)
+    for comment_depth in sorted(levels, reverse=True):
+        for chunk in _batched(levels[comment_depth], batch_size):
+            db.session.execute(table.delete().where(table.c.id.in_(chunk)))
+
+    article_deltas, reply_deltas, author_deltas = Counter(), Counter(), Counter()
+    for row in found.values():
+        article_deltas[row.article_id] -= 1
+        author_deltas[row.author_id] -= 1
+        if row.status == 'approved' and row.parent_id not in found:
+            reply_deltas[row.parent_id] -= 1
+    _apply_counter_deltas(Article, 'comment_count', article_deltas)
+    _apply_counter_deltas(Comment, 'reply_count', reply_deltas)
+    UserStats.apply_deltas({user_id: {'comment_count': delta} for user_id, delta in author_deltas.items()})
+
+    return list(found.values())
+
+
+def _moderation_cache_tags(rows):
+    """批量审核后需要失效的缓存标签（与 Comment.get_cache_tags 一致）"""
+    tags = {'article-list'}
+    for row in rows:
+        tags.update((f'comment:{row.id}', f'article:{row.article_id}', f'user:{row.author_id}'))
+        if row.parent_id:
+            tags.add(f'comment:{row.parent_id}')
+    return tags
+
+
+def _counter_state(comment, use_previous):
+    """获取评论对计数的贡献：(文章ID, 父评论ID, 是否计入父评论回复数)"""
+    from sqlalchemy import inspect
+
+    state = inspect(comment)
+    values = []
+    for name in ('article_id', 'parent_id', 'status'):
+        history = state.attrs[name].history
+        if use_previous and history.deleted:
+            values.append(history.deleted[0])
+        else:
+            values.append(getattr(comment, name))
+    article_id, parent_id, status = values
+    return article_id, parent_id, status == 'approved'
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    """空监听器：以 active_history 方式注册，使修改字段前先加载原值，供计数事件计算差值"""
+
+
+for _name in ('article_id', 'parent_id', 'status'):
+    db.event.listen(getattr(Comment, _name), 'set', _load_previous_value, active_history=True)
+
+
+@db.event.listens_for(Comment, 'after_insert')
+def _assign_path(mapper, connection, target):
+    from sqlalchemy.orm.attributes import set_committed_value
+
+    path = _path_segment(target.id)
+    if target.parent_id is not None:
+        parent_path = _parent_path(connection, target, target.parent_id)
+        if parent_path is None:
+            # 父评论尚未补充路径，留待 backfill_paths 处理
+            return
+        path = parent_path + path
+
+    table = Comment.__table__
+    connection.execute(
+        table.update().where(table.c.id == target.id).values(path=path, updated_at=table.c.updated_at)
+    )
+    set_committed_value(target, 'path', path)
+
+
+@db.event.listens_for(Comment, 'after_update')
+def _move_subtree(mapper, connection, target):
+    from sqlalchemy import func, inspect, literal, String
+    from sqlalchemy.orm.attributes import set_committed_value
+
+    history = inspect(target).attrs.parent_id.history
+    old_path = target.path
+    if not history.has_changes() or not old_path:
+        return
+
+    path = _path_segment(target.id)
+    if target.parent_id is not None:
+        parent_path = _parent_path(connection, target, target.parent_id)
+        if parent_path is None:
+            return
+        path = parent_path + path
+
+    # 以新前缀替换整棵子树的旧前缀
+    table = Comment.__table__
+    connection.execute(
+        table.update()
+        .where(table.c.path >= old_path, table.c.path < _path_upper_bound(old_path))
+        .values(
+            path=literal(path, String) + func.substr(table.c.path, len(old_path) + 1),
+            updated_at=table.c.updated_at
+        )
+    )
+    set_committed_value(target, 'path', path)
+
+
+@db.event.listens_for(Comment, 'after_insert')
+def _count_inserted_comment(mapper, connection, target):
+    from app.models.article import Article
+
+    article_id, parent_id, approved = _counter_state(target, use_previous=False)
+    _adjust_counter(connection, target, Article, article_id, 'comment_count', 1)
+    if approved:
+        _adjust_counter(connection, target, Comment, parent_id, 'reply_count', 1)
+
+
+# 在删除语句执行前调整计数，此时评论的原始字段仍可读取
+@db.event.listens_for(Comment, 'before_delete')
+def _count_deleted_comment(mapper, connection, target):
+    from app.models.article import Article
+
+    article_id, parent_id, approved = _counter_state(target, use_previous=True)
+    _adjust_counter(connection, target, Article, article_id, 'comment_count', -1)
+    if approved:
+        _adjust_counter(connection, target, Comment, parent_id, 'reply_count', -1)
+
+
+@db.event.listens_for(Comment, 'after_update')
+def _count_updated_comment(mapper, connection, target):
+    from app.models.article import Article
+
+    old_article_id, old_parent_id, was_approved = _counter_state(target, use_previous=True)
+    article_id, parent_id, approved = _counter_state(target, use_previous=False)
+
+    if old_article_id != article_id:
+        _adjust_counter(connection, target, Article, old_article_id, 'comment_count', -1)
+        _adjust_counter(connection, target, Article, article_id, 'comment_count', 1)
+    if (old_parent_id, was_approved) != (parent_id, approved):
+        if was_approved:
+            _adjust_counter(connection, target, Comment, old_parent_id, 'reply_count', -1)
+        if approved:
+            _adjust_counter(connection, target, Comment, parent_id, 'reply_count', 1)
@@ -0,0 +1,126 @@
+"""
+后台任务数据模型
+Background Job Data Model
+"""
+from datetime import datetime
+from app import db
+import json
+
+class Job(db.Model):
+    """
+    后台任务模型
+
+    请求中只写入一行任务记录，由独立的任务进程（worker.py / flask jobs work）领取执行。
+    状态流转：queued -> running -> finished，失败后按退避时间重新排队，超过最大尝试次数后为 failed。
+    """
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+    # 主键
+    id = db.Column(db.Integer, primary_key=True)
+
+    # 任务类型和参数（JSON格式）
+    type = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text)
+
+    # 去重键：同一去重键在排队或执行中时不重复入队
+    dedupe_key = db.Column(db.String(100), index=True)
+
+    # 状态管理
+    status = db.Column(db.Enum('queued', 'running', 'finished', 'failed', name='job_status'),
+                       default='queued', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    max_attempts = db.Column(db.Integer, default=5, nullable=False)
+    run_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # 最早执行时间
+    locked_by = db.Column(db.String(100))  # 领取任务的进程
+    locked_at = db.Column(db.DateTime)
+
+    # 执行结果（JSON格式）
+    progress = db.Column(db.Text)
+    result = db.Column(db.Text)
+    last_error = db.Column(db.Text)
+
+    # 时间戳
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime)
+
+    def __init__(self, type, payload=None, dedupe_key=None, run_at=None, max_attempts=5):
+        """
+        初始化任务对象
+
+        Args:
+            type (str): 任务类型
+            payload (dict): 任务参数
+            dedupe_key (str): 去重键
+            run_at (datetime): 最早执行时间
+            max_attempts (int): 最大尝试次数
+        """
+        self.type = type
+        self.payload = json.dumps(payload or {}, ensure_ascii=False)
+        self.dedupe_key = dedupe_key
+        self.status = 'queued'
+        self.attempts = 0
+        self.max_attempts = max_attempts
+        self.run_at = run_at or datetime.utcnow()
+
+    def get_payload(self):
+        """
+        获取任务参数
+
+        Returns:
+            dict: 任务参数
+        """
+        return json.loads(self.payload) if self.payload else {}
+
+    def get_progress(self):
+        """
+        获取执行进度
+
+        Returns:
+            dict: 进度信息，尚未报告时返回None
+        """
+        return json.loads(self.progress) if self.progress else None
+
+    def get_result(self):
+        """
+        获取执行结果
+
+        Returns:
+            任务处理函数的返回值，尚未完成时返回None
+        """
+        return json.loads(self.result) if self.result else None
+
+    def is_done(self):
+        """
+        检查任务是否已结束（成功或最终失败）
+
+        Returns:
+            bool: 是否已结束
+        """
+        return self.status in ('finished', 'failed')
+
+    def to_dict(self):
+        """
+        转换为字典
+
+        Returns:
+            dict: 任务信息字典
+        """
+        return {
+            'id': self.id,
+            'type': self.type,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'progress': self.get_progress(),
+            'result': self.get_result(),
+            'last_error': self.last_error,
+            'run_at': self.run_at.isoformat() if self.run_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.type} {self.status}>'
@@ -43,6 +43,7 @@ class User(UserMixin, db.Model):
     articles = db.relationship('Article', backref='author', lazy='dynamic', cascade='all, delete-orphan')
     comments = db.relationship('Comment', backref='author', lazy='dynamic', cascade='all, delete-orphan')
     admin = db.relationship('Admin', backref='user', uselist=False, cascade='all, delete-orphan')
+    stats = db.relationship('UserStats', uselist=False, cascade='all, delete-orphan')
     
     def __init__(self, username, email, password=None, **kwargs):
         """
@@ -94,6 +95,22 @@ class User(UserMixin, db.Model):
         """
         return self.admin is not None
     
+    def get_cache_tags(self):
+        """
+        获取用户变更时需要失效的缓存标签
+        
+        用户名、昵称和激活状态缓存在登录用户的身份信息中（见 app.utils.principal），
+        作者昵称也显示在缓存的文章详情页中。
+        
+        Returns:
+            set: 缓存标签集合
+        """
+        from app.utils.cache import has_relevant_changes
+        
+        if not has_relevant_changes(self, ignored=('password_hash', 'bio', 'avatar', 'email', 'updated_at')):
+            return set()
+        return {f'principal:{self.id}', f'user:{self.id}'}
+    
     def get_display_name(self):
         """
         获取显示名称
@@ -105,12 +122,13 @@ class User(UserMixin, db.Model):
     
     def get_article_count(self):
         """
-        获取用户文章数量
+        获取用户已发布文章数量
         
         Returns:
             int: 文章数量
         """
-        return self.articles.filter_by(status='published').count()
+        from app.models.user_stats import UserStats
+        return UserStats.get_for_user(self.id).published_count
     
     def get_comment_count(self):
         """
@@ -119,7 +137,8 @@ class User(UserMixin, db.Model):
         Returns:
             int: 评论数量
         """
-        return self.comments.count()
+        from app.models.user_stats import UserStats
+        return UserStats.get_for_user(self.id).comment_count
     
     @staticmethod
     def validate_username(username):
@@ -0,0 +1,336 @@
+"""
+用户统计数据模型
+User Statistics Rollup Model
+"""
+from app import db
+from app.models.article import Article
+from app.models.comment import Comment
+from app.models.user import User
+
+
+# 文章状态 -> 按状态计数的列
+STATUS_COLUMNS = {
+    'published': 'published_count',
+    'draft': 'draft_count',
+    'archived': 'archived_count',
+}
+
+# 可增减的计数列
+COUNTER_COLUMNS = ('article_count', 'published_count', 'draft_count', 'archived_count',
+                   'comment_count', 'view_count')
+
+
+class UserStats(db.Model):
+    """
+    用户统计汇总
+
+    个人中心和后台用户详情原先每次访问都对 articles、comments 执行多条 COUNT 查询，
+    耗时随用户的文章和评论数量增长。这里为每个用户保存一行汇总，按主键读取：
+    - 文章、评论的插入/删除/状态变更由下方的映射器事件在同一事务内增减
+    - 批量删除、批量审核删除和浏览次数缓冲写入时按行批量增减（apply_deltas）
+    - 浏览次数与文章的 view_count 一致，缓冲期间同样滞后
+    - 汇总行缺失（功能上线前的用户）时按实际数据即时统计，rebuild 可批量补齐和修正
+    """
+    __tablename__ = 'user_stats'
+
+    # 主键即用户ID
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+
+    # 文章数量（全部及按状态）
+    article_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    published_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    draft_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    archived_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+
+    # 发表的评论数量（全部状态）
+    comment_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+
+    # 所有文章收到的浏览次数
+    view_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+
+    def __init__(self, user_id, **counts):
+        """
+        初始化统计对象
+
+        Args:
+            user_id (int): 用户ID
+            **counts: 各计数列的值，未提供的为0
+        """
+        self.user_id = user_id
+        for name in COUNTER_COLUMNS:
+            setattr(self, name, counts.get(name, 0))
+
+    @staticmethod
+    def get_for_user(user_id):
+        """
+        获取用户的统计数据（一次主键查询）
+
+        Args:
+            user_id (int): 用户ID
+
+        Returns:
+            UserStats: 统计对象；汇总行尚未生成时返回即时统计的临时对象（不写入数据库）
+        """
+        stats = db.session.get(UserStats, user_id)
+        if stats is None:
+            stats = UserStats(user_id, **_compute_stats([user_id]).get(user_id, {}))
+        return stats
+
+    @staticmethod
+    def apply_deltas(deltas, executor=None):
+        """
+        按用户批量增减计数（一条 executemany 语句）
+
+        Args:
+            deltas (dict): 用户ID -> {计数列: 增量}
+            executor: 执行语句的连接或会话，默认为 db.session
+        """
+        from sqlalchemy import bindparam
+
+        changes = []
+        for user_id, values in deltas.items():
+            if user_id is None or not any(values.values()):
+                continue
+            change = dict.fromkeys(COUNTER_COLUMNS, 0)
+            change.update(values)
+            change['target_user_id'] = user_id
+            changes.append(change)
+        if not changes:
+            return
+
+        table = UserStats.__table__
+        statement = table.update().where(table.c.user_id == bindparam('target_user_id')).values({
+            name: table.c[name] + bindparam(name) for name in COUNTER_COLUMNS
+        })
+        (executor or db.session).execute(statement, changes)
+
+    @staticmethod
+    def rebuild(batch_size=1000):
+        """
+        按用户ID范围分批重新统计，补齐缺失的汇总行并修正不一致的行
+
+        Args:
+            batch_size (int): 每批处理的用户ID范围大小
+
+        Returns:
+            dict: 新增和修正的行数
+        """
+        from sqlalchemy import bindparam, func, select
+
+        users, table = User.__table__, UserStats.__table__
+        max_id = db.session.execute(select(func.max(users.c.id))).scalar()
+        result = {'created': 0, 'fixed': 0}
+        if max_id is None:
+            return result
+
+        update = table.update().where(table.c.user_id == bindparam('target_user_id')).values({
+            name: bindparam(name) for name in COUNTER_COLUMNS
+        })
+        for low in range(0, max_id + 1, batch_size):
+            high = low + batch_size
+            user_ids = db.session.execute(
+                select(users.c.id).where(users.c.id >= low, users.c.id < high)
+            ).scalars().all()
+            if not user_ids:
+                continue
+
+            actual = _compute_stats(user_ids, id_range=(low, high))
+            current = {
+                row.user_id: row for row in db.session.execute(
+                    select(table).where(table.c.user_id >= low, table.c.user_id < high)
+                )
+            }
+            created, fixed = [], []
+            for user_id in user_ids:
+                values = dict.fromkeys(COUNTER_COLUMNS, 0)
+                values.update(actual.get(user_id, {}))
+                row = current.get(user_id)
+                if row is None:
+                    created.append({'user_id': user_id, **values})
+                elif any(getattr(row, name) != value for name, value in values.items()):
+                    fixed.append({'target_user_id': user_id, **values})
+            if created:
+                db.session.execute(table.insert(), created)
+            if fixed:
+                db.session.execute(update, fixed)
+            db.session.commit()
+            result['created'] += len(created)
+            result['fixed'] += len(fixed)
+
+        return result
+
+    def to_dict(self):
+        """
+        转换为字典
+
+        Returns:
+            dict: 统计信息字典
+        """
+        return {name: getattr(self, name) for name in ('user_id',) + COUNTER_COLUMNS}
+
+    def __repr__(self):
+        return f'<UserStats {self.user_id}>'
+
+
+def _compute_stats(user_ids, id_range=None):
+    """
+    用分组聚合查询统计用户的实际计数
+
+    Args:
+        user_ids (list): 用户ID列表
+        id_range (tuple): 用户ID范围 [low, high)，提供时用范围条件代替 IN 列表
+
+    Returns:
+        dict: 用户ID -> {计数列: 值}，没有文章和评论的用户不在结果中
+    """
+    from collections import defaultdict
+    from sqlalchemy import func, select
+
+    articles, comments = Article.__table__, Comment.__table__
+
+    def within(column):
+        if id_range is not None:
+            return (column >= id_range[0]) & (column < id_range[1])
+        return column.in_(user_ids)
+
+    stats = defaultdict(lambda: dict.fromkeys(COUNTER_COLUMNS, 0))
+    for author_id, status, count, views in db.session.execute(
+        select(articles.c.author_id, articles.c.status, func.count(), func.coalesce(func.sum(articles.c.view_count), 0))
+        .where(within(articles.c.author_id))
+        .group_by(articles.c.author_id, articles.c.status)
+    ):
+        values = stats[author_id]
+        values['article_count'] += count
+        values[STATUS_COLUMNS[status]] += count
+        values['view_count'] += int(views)
+    for author_id, count in db.session.execute(
+        select(comments.c.author_id, func.count())
+        .where(within(comments.c.author_id))
+        .group_by(comments.c.author_id)
+    ):
+        stats[author_id]['comment_count'] = count
+    return dict(stats)
+
+
+def article_deltas(author_id, status, view_count, sign=1):
+    """
+    计算一篇文章对作者统计的贡献
+
+    Args:
+        author_id (int): 作者ID
+        status (str): 文章状态
+        view_count (int): 浏览次数
+        sign (int): 1 表示计入，-1 表示扣除
+
+    Returns:
+        dict: 用户ID -> {计数列: 增量}
+    """
+    values = {'article_count': sign, 'view_count': sign * (view_count or 0)}
+    if status in STATUS_COLUMNS:
+        values[STATUS_COLUMNS[status]] = sign
+    return {author_id: values}
+
+
+def merge_deltas(*deltas):
+    """
+    合并多组按用户的增量
+
+    Args:
+        *deltas: 用户ID -> {计数列: 增量}
+
+    Returns:
+        dict: 合并后的增量
+    """
+    merged = {}
+    for delta in deltas:
+        for user_id, values in delta.items():
+            target = merged.setdefault(user_id, {})
+            for name, value in values.items():
+                target[name] = target.get(name, 0) + value
+    return merged
+
+
+def _sync_loaded_stats(session, deltas):
+    """同步会话中已加载的统计对象（与数据库中的增量一致）"""
+    from sqlalchemy.orm.attributes import set_committed_value
+    from sqlalchemy.orm.util import identity_key
+
+    if session is None:
+        return
+    for user_id, values in deltas.items():
+        instance = session.identity_map.get(identity_key(UserStats, user_id))
+        if instance is None:
+            continue
+        for name, value in values.items():
+            if name in instance.__dict__:
+                set_committed_value(instance, name, (instance.__dict__[name] or 0) + value)
+
+
+def _adjust_stats(connection, target, deltas):
+    """在当前flush的事务内增减统计，并同步已加载的统计对象"""
+    from sqlalchemy.orm import object_session
+
+    UserStats.apply_deltas(deltas, executor=connection)
+    _sync_loaded_stats(object_session(target), deltas)
+
+
+def _previous(target, name):
+    """获取属性修改前的值（未修改时为当前值）"""
+    from sqlalchemy import inspect
+
+    history = inspect(target).attrs[name].history
+    return history.deleted[0] if history.deleted else getattr(target, name)
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    """空监听器：以 active_history 方式注册，使修改字段前先加载原值，供统计事件计算差值"""
+
+
+for _name in ('author_id', 'status', 'view_count'):
+    db.event.listen(getattr(Article, _name), 'set', _load_previous_value, active_history=True)
+db.event.listen(Comment.author_id, 'set', _load_previous_value, active_history=True)
+
+
+@db.event.listens_for(User, 'after_insert')
+def _create_user_stats(mapper, connection, target):
+    connection.execute(UserStats.__table__.insert().values(user_id=target.id))
+
+
+@db.event.listens_for(Article, 'after_insert')
+def _count_inserted_article(mapper, connection, target):
+    _adjust_stats(connection, target, article_deltas(target.author_id, target.status, target.view_count))
+
+
+# 在删除语句执行前扣除，此时文章的原始字段仍可读取
+@db.event.listens_for(Article, 'before_delete')
+def _count_deleted_article(mapper, connection, target):
+    _adjust_stats(connection, target, article_deltas(
+        _previous(target, 'author_id'), _previous(target, 'status'), _previous(target, 'view_count'), sign=-1
+    ))
+
+
+@db.event.listens_for(Article, 'after_update')
+def _count_updated_article(mapper, connection, target):
+    old = (_previous(target, 'author_id'), _previous(target, 'status'), _previous(target, 'view_count'))
+    new = (target.author_id, target.status, target.view_count)
+    if old != new:
+        _adjust_stats(connection, target, merge_deltas(article_deltas(*old, sign=-1), article_deltas(*new)))
+
+
+@db.event.listens_for(Comment, 'after_insert')
+def _count_inserted_comment(mapper, connection, target):
+    _adjust_stats(connection, target, {target.author_id: {'comment_count': 1}})
+
+
+@db.event.listens_for(Comment, 'before_delete')
+def _count_deleted_comment(mapper, connection, target):
+    _adjust_stats(connection, target, {_previous(target, 'author_id'): {'comment_count': -1}})
+
+
+@db.event.listens_for(Comment, 'after_update')
+def _count_updated_comment(mapper, connection, target):
+    old_author_id = _previous(target, 'author_id')
+    if old_author_id != target.author_id:
+        _adjust_stats(connection, target, merge_deltas(
+            {old_author_id: {'comment_count': -1}}, {target.author_id: {'comment_count': 1}}
+        ))
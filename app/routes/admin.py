@@ -24,6 +24,22 @@ def dashboard():
     """
     return render_template('admin/dashboard.html')
 
+@admin_bp.route('/performance')
+@login_required
+@admin_required
+def performance():
+    """
+    性能统计：按端点汇总的请求耗时、查询数量直方图、最慢语句和疑似 N+1 查询
+    """
+    import os
+    from app.utils.profiler import get_endpoint_stats, DURATION_BUCKETS, QUERY_COUNT_BUCKETS
+    
+    return render_template('admin/performance.html',
+                         endpoints=get_endpoint_stats(),
+                         pid=os.getpid(),
+                         duration_buckets=DURATION_BUCKETS,
+                         query_buckets=QUERY_COUNT_BUCKETS)
+
 @admin_bp.route('/users')
 @login_required
 @admin_required
@@ -35,8 +51,10 @@ def users():
     - 5.1: 管理员访问用户管理页面时显示所有用户列表和管理操作
     """
     from app.models.user import User
+    from app.utils.cache import get_cache_key
+    from app.utils.database import keyset_paginate
     
-    page = request.args.get('page', 1, type=int)
+    page = request.args.get('page', type=int)
     search = request.args.get('search', '')
     per_page = 20
     
@@ -52,9 +70,11 @@ def users():
             )
         )
     
-    # 按创建时间倒序排列并分页
-    users_pagination = query.order_by(User.created_at.desc())\
-                           .paginate(page=page, per_page=per_page, error_out=False)
+    # 按创建时间倒序排列，以 (created_at, id) 为游标分页
+    users_pagination = keyset_paginate(
+        query, (User.created_at, User.id), cursor=request.args.get('cursor'),
+        per_page=per_page, page=page, total_key=get_cache_key('users', search=search)
+    )
     
     return render_template('admin/users.html', 
                          users=users_pagination,
@@ -71,19 +91,19 @@ def user_detail(user_id):
     - 5.1: 管理员访问用户管理页面时显示所有用户列表和管理操作
     """
     from app.models.user import User
+    from app.models.user_stats import UserStats
     
     user = User.query.get_or_404(user_id)
     
-    # 获取用户统计信息
-    article_count = user.articles.count()
-    published_article_count = user.articles.filter_by(status='published').count()
-    comment_count = user.comments.count()
+    # 获取用户统计信息（统计汇总的一次主键查询）
+    stats = UserStats.get_for_user(user.id)
     
     return render_template('admin/user_detail.html',
                          user=user,
-                         article_count=article_count,
-                         published_article_count=published_article_count,
-                         comment_count=comment_count)
+                         article_count=stats.article_count,
+                         published_article_count=stats.published_count,
+                         comment_count=stats.comment_count,
+                         view_count=stats.view_count)
 
 @admin_bp.route('/users/<int:user_id>/edit', methods=['GET', 'POST'])
 @login_required
@@ -117,6 +137,26 @@ def edit_user(user_id):
     
     return render_template('admin/edit_user.html', user=user)
 
+def _flash_job(job, queued_message, done_message):
+    """
+    根据后台任务的状态提示操作结果
+    
+    任务队列关闭时任务已在本请求中执行完毕（成功或失败）。
+    
+    Args:
+        job: 任务对象
+        queued_message (str): 任务尚未完成时的提示
+        done_message (callable): 接收任务结果，返回完成时的提示
+    """
+    if job.status == 'finished':
+        flash(done_message(job.get_result()), 'success')
+    elif job.status == 'failed':
+        flash(f'操作失败，请重试: {job.last_error}', 'error')
+    elif job.last_error:
+        flash(f'操作失败，将自动重试: {job.last_error}', 'error')
+    else:
+        flash(f'{queued_message}，进度: {url_for("admin.job_status", job_id=job.id)}', 'info')
+
 @admin_bp.route('/users/<int:user_id>/delete', methods=['POST'])
 @login_required
 @admin_required
@@ -124,10 +164,13 @@ def delete_user(user_id):
     """
     删除用户
     
+    由后台任务以集合语句分批删除文章和评论。
+    
     实现需求:
     - 5.2: 管理员删除用户时移除用户及其所有相关内容
     """
     from app.models.user import User
+    from app.services.jobs import enqueue
     from flask_login import current_user
     
     user = User.query.get_or_404(user_id)
@@ -137,12 +180,12 @@ def delete_user(user_id):
         flash('不能删除自己的账号。', 'error')
         return redirect(url_for('admin.users'))
     
+    username = user.username
     try:
-        username = user.username
-        # 删除用户（级联删除相关内容）
-        db.session.delete(user)
-        db.session.commit()
-        flash(f'用户 {username} 及其所有相关内容已删除。', 'success')
+        job = enqueue('users.delete', {'user_id': user.id}, dedupe_key=f'users.delete:{user.id}')
+        _flash_job(job, f'用户 {username} 及其所有相关内容正在后台删除',
+                   lambda counts: f'用户 {username} 及其所有相关内容已删除'
+                                  f'（{counts["articles"]} 篇文章，{counts["comments"]} 条评论）。')
     except SQLAlchemyError as e:
         db.session.rollback()
         flash(f'删除用户失败: {str(e)}', 'error')
@@ -192,13 +235,17 @@ def articles():
     """
     from app.models.article import Article
     
-    page = request.args.get('page', 1, type=int)
+    page = request.args.get('page', type=int)
     status = request.args.get('status', 'all')
     search = request.args.get('search', '')
     per_page = 20
     
-    # 构建查询
-    query = Article.query
+    from app.utils.performance import optimize_article_query
+    from app.utils.cache import get_cache_key
+    from app.utils.database import keyset_paginate
+    
+    # 构建查询（预加载作者和分类）
+    query = optimize_article_query(Article.query)
     
     if status != 'all':
         query = query.filter_by(status=status)
@@ -211,9 +258,12 @@ def articles():
             )
         )
     
-    # 按创建时间倒序排列并分页
-    articles_pagination = query.order_by(Article.created_at.desc())\
-                              .paginate(page=page, per_page=per_page, error_out=False)
+    # 按创建时间倒序排列，以 (created_at, id) 为游标分页
+    articles_pagination = keyset_paginate(
+        query, (Article.created_at, Article.id), cursor=request.args.get('cursor'),
+        per_page=per_page, page=page,
+        total_key=get_cache_key('admin-articles', status=status, search=search), total_tags=('article-list',)
+    )
     
     return render_template('admin/articles.html',
                          articles=articles_pagination,
@@ -227,25 +277,45 @@ def delete_article(article_id):
     """
     删除文章
     
+    在本请求中以集合语句分批删除评论（任务记录保留执行结果）。
+    
     实现需求:
     - 5.3: 管理员管理文章时允许查看、编辑或删除任何文章
     """
     from app.models.article import Article
+    from app.services.jobs import enqueue
     
     article = Article.query.get_or_404(article_id)
     
+    title = article.title
     try:
-        title = article.title
-        # 删除文章（级联删除相关评论）
-        db.session.delete(article)
-        db.session.commit()
-        flash(f'文章《{title}》及其所有评论已删除。', 'success')
+        job = enqueue('articles.delete', {'article_ids': [article.id]},
+                      dedupe_key=f'articles.delete:{article.id}', inline=True)
+        _flash_job(job, f'文章《{title}》及其所有评论正在后台删除',
+                   lambda counts: f'文章《{title}》及其所有评论已删除。')
     except SQLAlchemyError as e:
         db.session.rollback()
         flash(f'删除文章失败: {str(e)}', 'error')
     
     return redirect(url_for('admin.articles'))
 
+@admin_bp.route('/jobs/<int:job_id>')
+@login_required
+@admin_required
+def job_status(job_id):
+    """
+    查询后台任务的状态和进度
+    
+    Returns:
+        JSON: 任务信息（status 为 queued / running / finished / failed）
+    """
+    from app.models.job import Job
+    
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': '任务不存在。'}), 404
+    return jsonify(dict(job.to_dict(), success=True))
+
 @admin_bp.route('/articles/<int:article_id>/toggle-status', methods=['POST'])
 @login_required
 @admin_required
@@ -282,6 +352,35 @@ def toggle_article_status(article_id):
     
     return redirect(url_for('admin.articles'))
 
+def _parse_comment_filters(values):
+    """
+    从请求参数解析评论筛选条件（评论管理列表和批量审核共用）
+    
+    无效的文章ID和日期被忽略。
+    
+    Args:
+        values: 请求参数（request.args 或 request.form）
+        
+    Returns:
+        tuple: (筛选参数，用于回显表单和生成链接; Comment.moderation_filter 的关键字参数)
+    """
+    from datetime import datetime, timedelta
+    
+    params = {name: (values.get(name) or '').strip()
+              for name in ('status', 'search', 'author', 'article_id', 'date_from', 'date_to')}
+    params['status'] = params['status'] or 'all'
+    
+    criteria = {'status': params['status'], 'search': params['search'], 'author': params['author']}
+    if params['article_id'].isdigit():
+        criteria['article_id'] = int(params['article_id'])
+    for name, key, offset in (('date_from', 'created_from', 0), ('date_to', 'created_to', 1)):
+        try:
+            # 结束日期包含当天
+            criteria[key] = datetime.strptime(params[name], '%Y-%m-%d') + timedelta(days=offset)
+        except ValueError:
+            pass
+    return params, criteria
+
 @admin_bp.route('/comments')
 @login_required
 @admin_required
@@ -289,33 +388,102 @@ def manage_comments():
     """
     评论管理列表
     
+    支持按状态、内容关键词、作者、文章和发表日期筛选，筛选结果可批量审核。
+    
     实现需求:
     - 5.4: 管理员管理评论时允许查看、编辑或删除任何评论
     """
+    from sqlalchemy.orm import joinedload
+    from app.models.article import Article
     from app.models.comment import Comment
+    from app.utils.cache import get_cache_key
+    from app.utils.database import keyset_paginate
     
-    page = request.args.get('page', 1, type=int)
-    status = request.args.get('status', 'all')
-    search = request.args.get('search', '')
+    page = request.args.get('page', type=int)
+    filters, criteria = _parse_comment_filters(request.args)
     per_page = 20
     
-    # 构建查询
-    query = Comment.query
+    # 构建查询（预加载每行显示的作者、文章标题和被回复者）
+    query = Comment.query.filter(*Comment.moderation_filter(**criteria)).options(
+        joinedload(Comment.author),
+        joinedload(Comment.article).load_only(Article.title),
+        joinedload(Comment.parent).joinedload(Comment.author)
+    )
+    
+    # 按创建时间倒序排列，以 (created_at, id) 为游标分页
+    # 评论的任何变更都会失效 article-list 标签，近似总数随之刷新
+    comments = keyset_paginate(
+        query, (Comment.created_at, Comment.id), cursor=request.args.get('cursor'),
+        per_page=per_page, page=page,
+        total_key=get_cache_key('admin-comments', **filters), total_tags=('article-list',)
+    )
     
-    if status != 'all':
-        query = query.filter_by(status=status)
+    return render_template('admin/comments.html', 
+                         comments=comments, 
+                         current_status=filters['status'],
+                         search=filters['search'],
+                         filters=filters)
+
+@admin_bp.route('/comments/bulk', methods=['POST'])
+@login_required
+@admin_required
+def bulk_moderate_comments():
+    """
+    批量审核、拒绝或删除评论
     
-    if search:
-        query = query.filter(Comment.content.contains(search))
+    scope=selected 处理勾选的评论（comment_ids，在本请求中执行），
+    scope=filter 处理符合当前筛选条件的全部评论（加入后台任务队列）。
+    以集合语句分批执行，评论数和缓存在每批提交时同步更新。
     
-    # 按创建时间倒序排列并分页
-    comments = query.order_by(Comment.created_at.desc())\
-                   .paginate(page=page, per_page=per_page, error_out=False)
+    实现需求:
+    - 5.4: 管理员管理评论时允许查看、编辑或删除任何评论
+    """
+    from app.models.comment import Comment
+    from app.services.jobs import enqueue
     
-    return render_template('admin/comments.html', 
-                         comments=comments, 
-                         current_status=status,
-                         search=search)
+    labels = {'approve': '审核通过', 'reject': '拒绝', 'pending': '设为待审核', 'delete': '删除'}
+    action = request.form.get('action')
+    filters, criteria = _parse_comment_filters(request.form)
+    redirect_url = url_for('admin.manage_comments', **{name: value for name, value in filters.items() if value})
+    
+    if action not in Comment.BULK_ACTIONS:
+        flash('请选择有效的批量操作。', 'error')
+        return redirect(redirect_url)
+    
+    suffix = '（含回复）' if action == 'delete' else ''
+    
+    if request.form.get('scope') == 'filter':
+        # 防止误操作全部评论：至少需要一个筛选条件
+        if not any(value for name, value in filters.items() if value != 'all'):
+            flash('按筛选条件批量操作时至少需要一个筛选条件。', 'error')
+            return redirect(redirect_url)
+        
+        # 筛选结果可能有数万条，交给后台任务执行
+        payload = {'action': action, 'criteria': {
+            name: value.isoformat() if hasattr(value, 'isoformat') else value for name, value in criteria.items()
+        }}
+        try:
+            job = enqueue('comments.moderate', payload)
+            _flash_job(job, f'正在后台{labels[action]}符合筛选条件的评论',
+                       lambda count: f'已{labels[action]} {count} 条评论{suffix}。')
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            flash(f'批量操作失败: {str(e)}', 'error')
+        return redirect(redirect_url)
+    
+    ids = request.form.getlist('comment_ids', type=int)
+    if not ids:
+        flash('请先勾选要处理的评论。', 'warning')
+        return redirect(redirect_url)
+    
+    try:
+        count = Comment.bulk_moderate(action, Comment.moderation_filter(ids=ids))
+        flash(f'已{labels[action]} {count} 条评论{suffix}。', 'success')
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        flash(f'批量操作失败，已完成的批次不会回滚: {str(e)}', 'error')
+    
+    return redirect(redirect_url)
 
 @admin_bp.route('/comments/<int:comment_id>/delete', methods=['POST'])
 @login_required
@@ -7,14 +7,22 @@ from flask_login import login_required, current_user
 from sqlalchemy.exc import SQLAlchemyError
 from app import db
 from app.models.article import Article
-from app.models.category import Category
+from app.models.comment import Comment
 from app.forms.article import ArticleForm, ArticleSearchForm, ArticleDeleteForm
 from app.utils.decorators import active_user_required
+from app.utils.performance import optimize_article_query
+from app.utils.database import keyset_paginate
+from app.services.view_counter import record_view, get_pending_views
+from app.services.category_registry import get_categories, get_category
+from app.utils.page_cache import cached_page, set_last_modified, add_page_tags, is_page_cacheable
+from app.utils.db_routing import read_from_replica
 
 # 创建文章蓝图
 article_bp = Blueprint('article', __name__)
 
 @article_bp.route('/articles')
+@cached_page(tags=('article-list', 'category-list'))
+@read_from_replica
 def list_articles():
     """
     文章列表页面
@@ -25,41 +33,41 @@ def list_articles():
     - 6.3: 用户搜索关键词时返回标题或内容包含关键词的文章
     - 6.4: 文章列表超过页面容量时提供分页导航功能
     """
-    # 获取搜索参数
-    page = request.args.get('page', 1, type=int)
+    # 获取搜索参数（未指定页码时使用游标分页）
+    page = request.args.get('page', type=int)
+    cursor = request.args.get('cursor')
     per_page = 10  # 每页显示10篇文章
     keyword = request.args.get('keyword', '').strip()
     category_id = request.args.get('category_id', 0, type=int)
     
-    # 构建查询
-    query = Article.query.filter_by(status='published')
-    
-    # 应用搜索条件
     if keyword:
-        from sqlalchemy import or_
-        search_filter = or_(
-            Article.title.contains(keyword),
-            Article.content.contains(keyword),
-            Article.summary.contains(keyword)
+        # 关键词搜索使用全文索引，按相关度排序
+        from app.services.search import search_article_page
+        articles = search_article_page(keyword, category_id=category_id if category_id > 0 else None,
+                                       page=page or 1, per_page=per_page)
+    else:
+        # 构建查询（预加载作者，分类名称从分类快照读取）
+        query = optimize_article_query(Article.query.filter_by(status='published'))
+        if category_id > 0:
+            query = query.filter_by(category_id=category_id)
+        
+        # 按发布时间倒序，以 (published_at, id) 为游标分页
+        articles = keyset_paginate(
+            query, (Article.published_at, Article.id), cursor=cursor, per_page=per_page, page=page,
+            total_key=f'articles:published:{category_id}', total_tags=('article-list',)
         )
-        query = query.filter(search_filter)
-    
-    if category_id > 0:
-        query = query.filter_by(category_id=category_id)
-    
-    # 按发布时间排序并分页
-    articles = query.order_by(Article.published_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
     
     # 获取搜索表单
     search_form = ArticleSearchForm()
     search_form.keyword.data = keyword
     search_form.category_id.data = category_id
     
-    # 获取分类信息
-    categories = Category.query.all()
-    current_category = Category.query.get(category_id) if category_id > 0 else None
+    # 获取分类信息（含已发布文章数，读取进程内分类快照）
+    categories = get_categories()
+    current_category = get_category(category_id) if category_id > 0 else None
+    set_last_modified(*(article.updated_at for article in articles.items))
+    # 页面显示作者昵称，作者修改时缓存页面随之失效
+    add_page_tags(*{f'user:{article.author_id}' for article in articles.items})
     
     return render_template('article/list.html', 
                          articles=articles, 
@@ -69,6 +77,8 @@ def list_articles():
                          keyword=keyword)
 
 @article_bp.route('/articles/<int:id>')
+@cached_page(tags=lambda id: (f'article:{id}',), on_hit=lambda id: record_view(id))
+@read_from_replica
 def article_detail(id):
     """
     文章详情页面
@@ -76,23 +86,29 @@ def article_detail(id):
     实现需求:
     - 6.5: 用户点击文章标题时显示完整的文章内容和评论
     """
-    article = Article.query.get_or_404(id)
+    from sqlalchemy.orm import undefer
+    # 同一查询中加载正文
+    article = Article.query.options(undefer(Article.content)).get_or_404(id)
     
     # 只显示已发布的文章，除非是作者或管理员
     if article.status != 'published':
         if not current_user.is_authenticated or not article.can_edit(current_user):
             abort(404)
     
-    # 增加浏览次数
+    # 页面显示作者昵称和分类名称，作者或分类修改时缓存页面随之失效
+    add_page_tags(f'user:{article.author_id}', *([f'category:{article.category_id}'] if article.category_id else []))
+    
+    # 记录浏览次数（先写入缓冲区，定期合并为批量更新）；
+    # 缓存的页面不显示浏览次数，避免显示的数字在缓存期间停止变化
+    pending_views = 0
+    show_view_count = not is_page_cacheable()
     if article.status == 'published':
-        try:
-            article.increment_view_count()
-            db.session.commit()
-        except SQLAlchemyError:
-            db.session.rollback()
+        record_view(article.id)
+        pending_views = get_pending_views(article.id)
     
-    # 获取评论
-    comments = article.get_approved_comments().all()
+    # 一次查询加载已审核评论并组装成树
+    comments, comment_total = Comment.get_comment_tree(article.id)
+    set_last_modified(article.updated_at, *_thread_timestamps(comments))
     
     # 创建评论表单
     from app.forms.comment import CommentForm
@@ -101,7 +117,16 @@ def article_detail(id):
     return render_template('article/detail.html', 
                          article=article, 
                          comments=comments,
-                         comment_form=comment_form)
+                         comment_total=comment_total,
+                         comment_form=comment_form,
+                         pending_views=pending_views,
+                         show_view_count=show_view_count)
+
+def _thread_timestamps(comments):
+    """遍历评论树，返回所有评论的更新时间"""
+    for comment in comments:
+        yield comment.updated_at
+        yield from _thread_timestamps(comment.tree_replies)
 
 @article_bp.route('/articles/create', methods=['GET', 'POST'])
 @active_user_required
@@ -154,7 +179,9 @@ def edit_article(id):
     实现需求:
     - 3.4: 用户编辑自己的文章时更新文章内容并保留修改时间
     """
-    article = Article.query.get_or_404(id)
+    from sqlalchemy.orm import undefer
+    # 编辑表单需要正文，在同一查询中加载
+    article = Article.query.options(undefer(Article.content)).get_or_404(id)
     
     # 检查权限
     if not article.can_edit(current_user):
@@ -218,12 +245,17 @@ def delete_article(id):
     form = ArticleDeleteForm()
     
     if form.validate_on_submit():
+        from app.services.jobs import enqueue
+        
         try:
-            # 删除文章（级联删除评论）
-            db.session.delete(article)
-            db.session.commit()
+            # 单篇文章在本请求中删除，评论以集合语句分批删除
+            job = enqueue('articles.delete', {'article_ids': [article.id]},
+                          dedupe_key=f'articles.delete:{article.id}', inline=True)
             
-            flash('文章删除成功！', 'success')
+            if job.status == 'failed':
+                flash('删除文章时发生错误，请重试。', 'error')
+                return redirect(url_for('article.article_detail', id=id))
+            flash('文章删除成功！' if job.status == 'finished' else '文章正在删除，稍后将从列表中移除。', 'success')
             return redirect(url_for('article.list_articles'))
             
         except SQLAlchemyError as e:
@@ -243,12 +275,15 @@ def my_articles():
     实现需求:
     - 7.4: 用户查看自己的文章时显示该用户发布的所有文章列表
     """
-    page = request.args.get('page', 1, type=int)
+    page = request.args.get('page', type=int)
     per_page = 10
     
-    articles = Article.query.filter_by(author_id=current_user.id)\
-                          .order_by(Article.created_at.desc())\
-                          .paginate(page=page, per_page=per_page, error_out=False)
+    query = optimize_article_query(Article.query.filter_by(author_id=current_user.id))
+    articles = keyset_paginate(
+        query, (Article.created_at, Article.id), cursor=request.args.get('cursor'),
+        per_page=per_page, page=page,
+        total_key=f'articles:author:{current_user.id}', total_tags=(f'user:{current_user.id}',)
+    )
     
     return render_template('article/my_articles.html', articles=articles)
 
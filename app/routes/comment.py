@@ -10,6 +10,8 @@ from app.models.comment import Comment
 from app.models.article import Article
 from app.forms.comment import CommentForm, CommentReplyForm, CommentDeleteForm, CommentModerationForm
 from app.utils.decorators import active_user_required, admin_required
+from app.utils.database import keyset_paginate
+from app.utils.db_routing import read_from_replica
 
 # 创建评论蓝图
 comment_bp = Blueprint('comment', __name__)
@@ -42,6 +44,15 @@ def create_comment(article_id):
                 flash(error_msg, 'error')
                 return redirect(url_for('article.article_detail', id=article_id))
             
+            # 回复的父评论必须属于同一篇文章，且层级不超过限制
+            if form.parent_id.data:
+                parent = Comment.query.filter_by(id=form.parent_id.data, article_id=article_id).first()
+                is_valid, error_msg = (Comment.validate_reply_depth(parent) if parent
+                                       else (False, '回复的评论不存在'))
+                if not is_valid:
+                    flash(error_msg, 'error')
+                    return redirect(url_for('article.article_detail', id=article_id))
+            
             # 创建评论对象
             comment = Comment(
                 content=form.content.data.strip(),
@@ -87,6 +98,11 @@ def reply_comment(comment_id):
         flash('无法回复此评论。', 'error')
         return redirect(url_for('article.article_detail', id=article.id))
     
+    is_valid, error_msg = Comment.validate_reply_depth(parent_comment)
+    if not is_valid:
+        flash(error_msg, 'error')
+        return redirect(url_for('article.article_detail', id=article.id))
+    
     form = CommentReplyForm()
     
     if form.validate_on_submit():
@@ -245,15 +261,19 @@ def my_comments():
     实现需求:
     - 7.5: 用户查看自己的评论时显示该用户发表的所有评论列表
     """
-    page = request.args.get('page', 1, type=int)
+    page = request.args.get('page', type=int)
     per_page = 20
     
-    comments = Comment.get_user_comments(current_user.id)\
-                     .paginate(page=page, per_page=per_page, error_out=False)
+    comments = keyset_paginate(
+        Comment.get_user_comments(current_user.id), (Comment.created_at, Comment.id),
+        cursor=request.args.get('cursor'), per_page=per_page, page=page,
+        total_key=f'comments:author:{current_user.id}', total_tags=(f'user:{current_user.id}',)
+    )
     
     return render_template('comment/my_comments.html', comments=comments)
 
 @comment_bp.route('/api/comments/<int:comment_id>')
+@read_from_replica
 def get_comment_api(comment_id):
     """
     获取评论信息API
@@ -267,6 +287,7 @@ def get_comment_api(comment_id):
     return jsonify(comment.to_dict(include_replies=True))
 
 @comment_bp.route('/api/articles/<int:article_id>/comments')
+@read_from_replica
 def get_article_comments_api(article_id):
     """
     获取文章评论API
@@ -280,14 +301,23 @@ def get_article_comments_api(article_id):
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
     include_replies = request.args.get('include_replies', 'true').lower() == 'true'
+    # 提供 cursor 参数（可为空表示第一页）时使用游标分页
+    cursor = request.args.get('cursor')
     
-    # 获取顶级评论
-    comments_query = Comment.get_article_comments(article_id, status='approved', include_replies=False)
-    comments = comments_query.paginate(page=page, per_page=per_page, error_out=False)
+    # 分页加载顶级评论，并通过物化路径一次加载这些线程的全部回复
+    comments = Comment.get_thread_page(article_id, page=page, per_page=per_page, cursor=cursor)
     
-    result = {
-        'comments': [comment.to_dict(include_replies=include_replies) for comment in comments.items],
-        'pagination': {
+    if cursor is not None:
+        pagination = {
+            'per_page': comments.per_page,
+            'total': comments.total,
+            'has_next': comments.has_next,
+            'has_prev': comments.has_prev,
+            'next_cursor': comments.next_cursor,
+            'prev_cursor': comments.prev_cursor
+        }
+    else:
+        pagination = {
             'page': comments.page,
             'pages': comments.pages,
             'per_page': comments.per_page,
@@ -295,6 +325,10 @@ def get_article_comments_api(article_id):
             'has_next': comments.has_next,
             'has_prev': comments.has_prev
         }
+    
+    result = {
+        'comments': [comment.to_dict(include_replies=include_replies) for comment in comments.items],
+        'pagination': pagination
     }
     
     return jsonify(result)
\ No newline at end of file
@@ -7,11 +7,15 @@ from flask_login import login_required, current_user
 from sqlalchemy.exc import SQLAlchemyError
 from app import db
 from app.utils.decorators import active_user_required
+from app.utils.page_cache import cached_page, set_last_modified, add_page_tags
+from app.utils.db_routing import read_from_replica
 
 # 创建主页面蓝图
 main_bp = Blueprint('main', __name__)
 
 @main_bp.route('/')
+@cached_page(tags=('article-list',))
+@read_from_replica
 def index():
     """
     首页
@@ -22,10 +26,14 @@ def index():
     from app.models.article import Article
     # 获取最新的5篇文章
     recent_articles = Article.get_recent_articles(limit=5)
+    set_last_modified(*(article.updated_at for article in recent_articles))
+    # 页面显示作者昵称，作者修改时缓存页面随之失效
+    add_page_tags(*{f'user:{article.author_id}' for article in recent_articles})
     return render_template('main/index.html', recent_articles=recent_articles)
 
 @main_bp.route('/profile')
 @active_user_required
+@read_from_replica
 def profile():
     """
     用户个人中心
@@ -34,17 +42,17 @@ def profile():
     - 2.5: 未登录用户访问受保护页面时重定向到登录页面
     - 7.1: 用户访问个人中心时显示用户的基本信息和统计数据
     """
-    # 获取用户统计信息
-    article_count = current_user.articles.count()
-    published_article_count = current_user.articles.filter_by(status='published').count()
-    draft_article_count = current_user.articles.filter_by(status='draft').count()
-    comment_count = current_user.comments.count()
+    from app.models.user_stats import UserStats
+    
+    # 获取用户统计信息（统计汇总的一次主键查询）
+    stats = UserStats.get_for_user(current_user.id)
     
     return render_template('main/profile.html',
-                         article_count=article_count,
-                         published_article_count=published_article_count,
-                         draft_article_count=draft_article_count,
-                         comment_count=comment_count)
+                         article_count=stats.article_count,
+                         published_article_count=stats.published_count,
+                         draft_article_count=stats.draft_count,
+                         comment_count=stats.comment_count,
+                         view_count=stats.view_count)
 
 @main_bp.route('/profile/edit', methods=['GET', 'POST'])
 @active_user_required
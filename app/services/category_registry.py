@@ -0,0 +1,188 @@
+"""
+分类注册表
+Category Registry
+
+分类数量少、变化少，却出现在几乎每个页面：搜索表单和文章表单的下拉选项、文章列表侧栏
+（含各分类已发布文章数）、每篇文章的分类名称。原先每个请求都要执行多次 Category.query.all()
+和 Category.query.get()，这里在每个工作进程内保存一份只读快照：
+
+- 快照包含分类的 id、名称、slug 和已发布文章数，加载时用两条查询（分类列表 + 分组计数）
+- 每次读取前比对缓存标签版本：category-list（分类增删改）和 category:{id}
+  （文章发布、撤回、换分类或删除），任一版本变化时重新加载；比对只读取标签令牌，不查询数据库；
+  模板中的 get_category 每次渲染只比对一次，逐篇文章读取分类不会重复访问缓存后端
+- 标签版本只在共享缓存后端（redis）中跨进程可见，使用进程内缓存时其他工作进程的修改
+  最多滞后 CATEGORY_REGISTRY_TIMEOUT 秒；禁用缓存（CACHE_TYPE=null）时没有标签版本，
+  包括本进程在内的修改都在快照过期后才可见
+"""
+import threading
+import time
+from flask import current_app
+from app import db
+
+
+class CategoryEntry:
+    """分类快照中的一项（只读）"""
+    __slots__ = ('id', 'name', 'slug', 'description', 'article_count')
+
+    def __init__(self, id, name, slug, description=None, article_count=0):
+        self.id = id
+        self.name = name
+        self.slug = slug
+        self.description = description
+        self.article_count = article_count
+
+    def __repr__(self):
+        return f'<CategoryEntry {self.name}>'
+
+
+class _Snapshot:
+    """某一版本的全部分类"""
+
+    def __init__(self, entries, versions):
+        self.entries = entries
+        self.by_id = {entry.id: entry for entry in entries}
+        self.versions = versions
+        self.loaded_at = time.monotonic()
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def _version_tags(ids):
+    """快照依赖的缓存标签"""
+    return ['category-list'] + [f'category:{category_id}' for category_id in ids]
+
+
+def _load():
+    """
+    加载分类和已发布文章数
+
+    每个标签的版本都在其保护的数据之前读取，加载期间发生的修改会在下次比对时发现。
+    """
+    from sqlalchemy import func, select
+    from app.models.article import Article
+    from app.models.category import Category
+    from app.utils.cache import get_tag_versions
+
+    versions = get_tag_versions('category-list')
+    categories = Category.__table__
+    rows = db.session.execute(
+        select(categories.c.id, categories.c.name, categories.c.slug, categories.c.description)
+        .order_by(categories.c.id)
+    ).all()
+
+    ids = [row.id for row in rows]
+    versions.update(get_tag_versions(*_version_tags(ids)[1:]))
+    # 按分类ID列表过滤，命中 (category_id, status) 复合索引，避免分组时额外排序
+    counts = dict(db.session.execute(
+        select(Article.category_id, func.count())
+        .where(Article.category_id.in_(ids), Article.status == 'published')
+        .group_by(Article.category_id)
+    ).all()) if ids else {}
+    entries = tuple(
+        CategoryEntry(row.id, row.name, row.slug, row.description, counts.get(row.id, 0)) for row in rows
+    )
+    return _Snapshot(entries, versions)
+
+
+def _is_current(snapshot):
+    """快照未过期且标签版本未变化时仍然有效"""
+    from app.utils.cache import get_tag_versions
+
+    timeout = current_app.config.get('CATEGORY_REGISTRY_TIMEOUT', 60)
+    if timeout and time.monotonic() - snapshot.loaded_at >= timeout:
+        return False
+    versions = get_tag_versions(*_version_tags(entry.id for entry in snapshot.entries))
+    if not versions:
+        # 禁用缓存（NullCache）时没有标签版本，只按有效期重新加载；未设置有效期时每次都重新加载
+        return bool(timeout)
+    return versions == snapshot.versions
+
+
+def get_snapshot():
+    """
+    获取当前版本的分类快照（版本变化时重新加载）
+
+    Returns:
+        _Snapshot: 分类快照
+    """
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and _is_current(snapshot):
+        return snapshot
+    with _lock:
+        if _snapshot is not snapshot and _snapshot is not None and _is_current(_snapshot):
+            # 其他线程已经完成加载
+            return _snapshot
+        _snapshot = _load()
+        return _snapshot
+
+
+def get_categories():
+    """
+    获取全部分类（按ID排序）
+
+    Returns:
+        tuple: CategoryEntry 元组
+    """
+    return get_snapshot().entries
+
+
+def get_category(category_id):
+    """
+    按ID获取分类
+
+    Args:
+        category_id (int): 分类ID
+
+    Returns:
+        CategoryEntry: 分类，不存在时返回None
+    """
+    if not category_id:
+        return None
+    return get_snapshot().by_id.get(category_id)
+
+
+def category_choices(blank_label):
+    """
+    生成下拉框选项
+
+    Args:
+        blank_label (str): 未选择分类时显示的文字（值为0）
+
+    Returns:
+        list: (分类ID, 名称) 列表
+    """
+    return [(0, blank_label)] + [(entry.id, entry.name) for entry in get_categories()]
+
+
+def reset_registry():
+    """丢弃当前快照（下次读取时重新加载）"""
+    global _snapshot
+    _snapshot = None
+
+
+def _template_context():
+    """模板中的 get_category：首次调用时获取快照，同一次渲染内复用"""
+    snapshots = []
+
+    def lookup(category_id):
+        if not category_id:
+            return None
+        if not snapshots:
+            snapshots.append(get_snapshot())
+        return snapshots[0].by_id.get(category_id)
+
+    return {'get_category': lookup}
+
+
+def init_category_registry(app):
+    """
+    注册模板上下文函数
+
+    Args:
+        app: Flask应用实例
+    """
+    reset_registry()
+    app.context_processor(_template_context)
@@ -0,0 +1,178 @@
+"""
+批量删除服务
+Bulk Deletion Service
+
+删除用户或文章时不再通过 ORM 级联把全部文章和评论加载到内存后逐行删除，
+而是按主键分批执行集合 DELETE，每批单独提交，锁只在一批之内持有：
+- 用户在他人文章下的评论：复用 Comment.bulk_moderate，同时维护评论数和回复数
+- 待删文章下的全部评论：按主键倒序分批删除（回复总是晚于父评论创建，先于父评论被删除）
+- 文章：删除后失效缓存标签，并从本进程的检索引擎中移除
+- 最后删除管理员记录、统计汇总和用户
+- 被删除的文章和评论从作者的统计汇总（user_stats）中扣除
+
+中途失败时已删除的批次不会恢复，重新执行即可继续，因此可以作为后台任务重试。
+进度通过回调报告（后台任务中写入任务记录，见 app.services.jobs）。
+"""
+from sqlalchemy import select
+from app import db
+
+
+def _new_counts():
+    return {'comments': 0, 'articles': 0, 'users': 0}
+
+
+def _delete_article_comments(article_ids, batch_size, counts, report):
+    """分批删除指定文章下的全部评论（文章随后删除，不需要维护评论数，只扣除作者的评论数）"""
+    from collections import Counter
+    from app.models.comment import Comment
+    from app.models.user_stats import UserStats
+    from app.utils.cache import invalidate_tags
+
+    table = Comment.__table__
+    while True:
+        rows = db.session.execute(
+            select(table.c.id, table.c.author_id)
+            .where(table.c.article_id.in_(article_ids))
+            .order_by(table.c.id.desc()).limit(batch_size)
+        ).all()
+        if not rows:
+            return
+
+        ids = [row.id for row in rows]
+        # 先断开本批内部的回复关系，使同一条 DELETE 语句不依赖行的删除顺序
+        db.session.execute(
+            table.update().where(table.c.id.in_(ids), table.c.parent_id.isnot(None)).values(parent_id=None)
+        )
+        db.session.execute(table.delete().where(table.c.id.in_(ids)))
+        authors = Counter(row.author_id for row in rows)
+        UserStats.apply_deltas({user_id: {'comment_count': -count} for user_id, count in authors.items()})
+        db.session.commit()
+
+        tags = {f'comment:{row.id}' for row in rows}
+        tags.update(f'user:{row.author_id}' for row in rows)
+        invalidate_tags(*tags)
+        counts['comments'] += len(rows)
+        report('comments')
+
+
+def _delete_article_batch(article_ids, batch_size, counts, report):
+    """删除一批文章及其评论"""
+    from app.models.article import Article
+    from app.models.user_stats import UserStats, article_deltas, merge_deltas
+    from app.services.search_engine import get_search_engine
+    from app.utils.cache import invalidate_tags
+
+    table = Article.__table__
+    rows = db.session.execute(
+        select(table.c.id, table.c.author_id, table.c.category_id, table.c.status, table.c.view_count)
+        .where(table.c.id.in_(article_ids))
+    ).all()
+    if not rows:
+        return
+
+    ids = [row.id for row in rows]
+    _delete_article_comments(ids, batch_size, counts, report)
+    db.session.execute(table.delete().where(table.c.id.in_(ids)))
+    UserStats.apply_deltas(merge_deltas(*(
+        article_deltas(row.author_id, row.status, row.view_count, sign=-1) for row in rows
+    )))
+    db.session.commit()
+
+    tags = {'article-list'}
+    for row in rows:
+        tags.update((f'article:{row.id}', f'user:{row.author_id}'))
+        if row.category_id:
+            tags.add(f'category:{row.category_id}')
+    invalidate_tags(*tags)
+
+    engine = get_search_engine()
+    if engine is not None:
+        for article_id in ids:
+            engine.remove(article_id)
+
+    counts['articles'] += len(rows)
+    report('articles')
+
+
+def delete_articles(article_ids, batch_size=500, progress=None):
+    """
+    批量删除文章及其全部评论
+
+    Args:
+        article_ids (list): 文章ID列表
+        batch_size (int): 每批删除的行数
+        progress (callable): 每批提交后调用，参数为 (阶段, 累计删除数量)
+
+    Returns:
+        dict: 各类数据删除的行数
+    """
+    counts = _new_counts()
+
+    def report(stage):
+        if progress is not None:
+            progress(stage, dict(counts))
+
+    article_ids = list(article_ids)
+    for start in range(0, len(article_ids), batch_size):
+        _delete_article_batch(article_ids[start:start + batch_size], batch_size, counts, report)
+    return counts
+
+
+def delete_user(user_id, batch_size=500, progress=None):
+    """
+    删除用户及其全部文章、评论和管理员记录
+
+    Args:
+        user_id (int): 用户ID
+        batch_size (int): 每批删除的行数
+        progress (callable): 每批提交后调用，参数为 (阶段, 累计删除数量)
+
+    Returns:
+        dict: 各类数据删除的行数
+    """
+    from app.models.admin import Admin
+    from app.models.article import Article
+    from app.models.comment import Comment
+    from app.models.user import User
+    from app.models.user_stats import UserStats
+    from app.utils.cache import invalidate_tags
+
+    counts = _new_counts()
+
+    def report(stage):
+        if progress is not None:
+            progress(stage, dict(counts))
+
+    # 用户在他人文章下的评论（连同回复），维护这些文章的评论数
+    own_articles = select(Article.id).where(Article.author_id == user_id)
+    deleted_before = [0]
+
+    def comment_progress(deleted):
+        counts['comments'] += deleted - deleted_before[0]
+        deleted_before[0] = deleted
+        report('comments')
+
+    Comment.bulk_moderate(
+        'delete', [Comment.author_id == user_id, Comment.article_id.notin_(own_articles)],
+        batch_size=batch_size, progress=comment_progress
+    )
+
+    # 用户的文章（连同文章下所有人的评论）
+    articles = Article.__table__
+    while True:
+        article_ids = db.session.execute(
+            select(articles.c.id).where(articles.c.author_id == user_id)
+            .order_by(articles.c.id).limit(batch_size)
+        ).scalars().all()
+        if not article_ids:
+            break
+        _delete_article_batch(article_ids, batch_size, counts, report)
+
+    db.session.execute(Admin.__table__.delete().where(Admin.__table__.c.user_id == user_id))
+    db.session.execute(UserStats.__table__.delete().where(UserStats.__table__.c.user_id == user_id))
+    users = User.__table__
+    counts['users'] = db.session.execute(users.delete().where(users.c.id == user_id)).rowcount
+    db.session.commit()
+    invalidate_tags(f'user:{user_id}', f'principal:{user_id}')
+    report('users')
+    return counts
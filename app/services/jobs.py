@@ -0,0 +1,442 @@
+"""
+后台任务队列
+Background Job Queue
+
+请求处理函数只调用 enqueue 写入一行任务记录（jobs 表），耗时的副作用——删除用户和文章、
+批量审核、重建检索索引、重新计算计数、补充评论物化路径、预热缓存——由与 gunicorn 并行运行的任务进程执行：
+
+    python worker.py        # 或 flask jobs work
+
+- 领取：查询一个到期的排队任务，再以带状态条件的 UPDATE 抢占，只有一个进程能更新成功；
+  不依赖 SELECT ... FOR UPDATE SKIP LOCKED，SQLite 和 MySQL 行为一致
+- 重试：处理函数抛出异常时按 JOB_RETRY_BACKOFF * 2^(尝试次数-1) 秒（不超过 JOB_RETRY_BACKOFF_MAX）
+  重新排队，达到最大尝试次数后标记为 failed
+- 超时回收：执行超过 JOB_LOCK_TIMEOUT 秒仍未结束的任务（任务进程被杀死）重新排队
+- 幂等：所有任务类型都可以安全地重复执行；带去重键的任务在排队或执行中时不会重复入队
+
+JOB_QUEUE_ENABLED 关闭时（测试或没有部署任务进程的开发环境），enqueue 在当前请求中直接执行任务；
+直接执行的任务失败时标记为 failed（没有任务进程会重试），调用方可以再次入队。
+任务进程对缓存的失效只有在缓存后端被所有进程共用（CACHE_TYPE=redis）时才能到达 web 工作进程，
+使用进程内缓存时队列自动关闭（见 init_jobs）。单篇文章删除这类小操作以 inline=True 始终在请求中执行。
+"""
+import json
+import os
+import signal
+import socket
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, or_, and_
+from app import db
+
+
+# 任务类型 -> 处理函数
+_handlers = {}
+
+# 当前正在执行的任务ID（供 report_progress 使用）
+_current_job = ContextVar('current_job', default=None)
+
+
+def job_handler(name):
+    """
+    注册任务处理函数的装饰器
+
+    处理函数以任务参数为关键字参数调用，返回值需可序列化为JSON，必须可以安全地重复执行。
+
+    Args:
+        name (str): 任务类型
+
+    Returns:
+        function: 装饰器函数
+    """
+    def decorator(f):
+        _handlers[name] = f
+        return f
+    return decorator
+
+
+def _worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def init_jobs(app):
+    """
+    检查任务队列的部署条件
+
+    任务进程修改数据后只能使其自身的进程内缓存失效，web 工作进程会继续返回旧数据，
+    因此缓存后端不在进程间共用时关闭队列，任务在请求中直接执行。
+
+    Args:
+        app: Flask应用实例
+    """
+    from app.utils.cache import get_cache
+
+    if app.config.get('JOB_QUEUE_ENABLED', True) and not get_cache().shared:
+        app.logger.warning('JOB_QUEUE_ENABLED requires a shared cache backend (CACHE_TYPE=redis); '
+                           'jobs will run inline in the request')
+        app.config['JOB_QUEUE_ENABLED'] = False
+
+
+def enqueue(job_type, payload=None, dedupe_key=None, delay=0, inline=False):
+    """
+    将任务加入队列（会提交当前会话）
+
+    Args:
+        job_type (str): 任务类型
+        payload (dict): 任务参数，需可序列化为JSON
+        dedupe_key (str): 去重键，相同去重键的任务在排队或执行中时直接返回该任务；
+            执行超时（JOB_LOCK_TIMEOUT）的任务不再计入，需要直接执行时排队中的任务在本请求中领取执行
+        delay (int): 延迟执行的秒数
+        inline (bool): 为True时即使队列开启也在当前请求中直接执行（耗时很短的操作）
+
+    Returns:
+        Job: 任务对象；队列关闭时任务已执行完毕
+    """
+    from app.models.job import Job
+
+    if job_type not in _handlers:
+        raise ValueError(f'Unknown job type: {job_type}')
+
+    run_inline = (inline or not current_app.config.get('JOB_QUEUE_ENABLED', True)) and not delay
+
+    if dedupe_key:
+        lock_timeout = current_app.config.get('JOB_LOCK_TIMEOUT', 1800)
+        existing = Job.query.filter(
+            Job.dedupe_key == dedupe_key,
+            or_(Job.status == 'queued',
+                and_(Job.status == 'running', Job.locked_at >= datetime.utcnow() - timedelta(seconds=lock_timeout)))
+        ).order_by(Job.id.desc()).first()
+        if existing is not None:
+            if existing.status == 'queued' and run_inline and _claim(existing.id, _worker_id()):
+                # 队列关闭时没有任务进程会领取排队中的任务
+                run_job(existing.id, retry=False)
+            return existing
+
+    job = Job(job_type, payload, dedupe_key=dedupe_key,
+              run_at=datetime.utcnow() + timedelta(seconds=delay),
+              max_attempts=current_app.config.get('JOB_MAX_ATTEMPTS', 5))
+    db.session.add(job)
+    db.session.commit()
+
+    if run_inline and _claim(job.id, _worker_id()):
+        run_job(job.id, retry=False)
+    return job
+
+
+def _claim(job_id, worker):
+    """以带状态条件的 UPDATE 抢占任务，返回是否领取成功"""
+    from app.models.job import Job
+
+    table = Job.__table__
+    result = db.session.execute(
+        table.update()
+        .where(table.c.id == job_id, table.c.status == 'queued')
+        .values(status='running', locked_by=worker, locked_at=datetime.utcnow(),
+                attempts=table.c.attempts + 1)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _requeue_stale():
+    """回收执行超时的任务：未达到最大尝试次数的重新排队，否则标记为失败"""
+    from app.models.job import Job
+
+    table = Job.__table__
+    now = datetime.utcnow()
+    stale = (table.c.status == 'running') & (
+        table.c.locked_at < now - timedelta(seconds=current_app.config.get('JOB_LOCK_TIMEOUT', 1800))
+    )
+    db.session.execute(
+        table.update().where(stale, table.c.attempts >= table.c.max_attempts)
+        .values(status='failed', locked_by=None, finished_at=now, last_error='Job timed out')
+    )
+    db.session.execute(
+        table.update().where(stale).values(status='queued', locked_by=None, run_at=now)
+    )
+    db.session.commit()
+
+
+def claim_next(worker):
+    """
+    领取下一个到期的任务
+
+    Args:
+        worker (str): 任务进程标识
+
+    Returns:
+        int: 任务ID，没有到期任务时返回None
+    """
+    from app.models.job import Job
+
+    _requeue_stale()
+    table = Job.__table__
+    while True:
+        job_id = db.session.execute(
+            select(table.c.id)
+            .where(table.c.status == 'queued', table.c.run_at <= datetime.utcnow())
+            .order_by(table.c.run_at, table.c.id).limit(1)
+        ).scalar()
+        db.session.commit()
+        if job_id is None or _claim(job_id, worker):
+            return job_id
+        # 被其他进程抢先领取，继续查找
+
+
+def retry_delay(attempts):
+    """
+    计算第 attempts 次尝试失败后的重试间隔（指数退避）
+
+    Args:
+        attempts (int): 已尝试次数
+
+    Returns:
+        int: 间隔秒数
+    """
+    config = current_app.config
+    delay = config.get('JOB_RETRY_BACKOFF', 30) * 2 ** max(attempts - 1, 0)
+    return min(delay, config.get('JOB_RETRY_BACKOFF_MAX', 3600))
+
+
+def _record_failure(job_id, error, retry=True):
+    """记录执行失败：按退避时间重新排队，或达到最大尝试次数（或不重试）时标记为失败"""
+    from app.models.job import Job
+
+    table = Job.__table__
+    row = db.session.execute(
+        select(table.c.type, table.c.attempts, table.c.max_attempts).where(table.c.id == job_id)
+    ).one()
+    message = f'{type(error).__name__}: {error}'[:2000]
+    now = datetime.utcnow()
+    if not retry:
+        values = {'status': 'failed', 'finished_at': now}
+        current_app.logger.error(f'Job {job_id} ({row.type}) failed inline: {message}', exc_info=error)
+    elif row.attempts >= row.max_attempts:
+        values = {'status': 'failed', 'finished_at': now}
+        current_app.logger.error(f'Job {job_id} ({row.type}) failed after {row.attempts} attempts: {message}',
+                                 exc_info=error)
+    else:
+        delay = retry_delay(row.attempts)
+        values = {'status': 'queued', 'run_at': now + timedelta(seconds=delay)}
+        current_app.logger.warning(f'Job {job_id} ({row.type}) failed, retrying in {delay}s: {message}',
+                                   exc_info=error)
+    db.session.execute(
+        table.update().where(table.c.id == job_id).values(locked_by=None, last_error=message, **values)
+    )
+    db.session.commit()
+
+
+def run_job(job_id, retry=True):
+    """
+    执行已领取的任务并记录结果
+
+    Args:
+        job_id (int): 任务ID
+        retry (bool): 失败时是否重新排队等待任务进程重试（在请求中直接执行时为False）
+
+    Returns:
+        bool: 是否执行成功
+    """
+    from app.models.job import Job
+
+    table = Job.__table__
+    row = db.session.execute(select(table.c.type, table.c.payload).where(table.c.id == job_id)).one()
+    token = _current_job.set(job_id)
+    started = time.monotonic()
+    try:
+        handler = _handlers.get(row.type)
+        if handler is None:
+            raise LookupError(f'Unknown job type: {row.type}')
+        result = handler(**(json.loads(row.payload) if row.payload else {}))
+    except Exception as e:
+        db.session.rollback()
+        _record_failure(job_id, e, retry=retry)
+        return False
+    finally:
+        _current_job.reset(token)
+
+    db.session.execute(
+        table.update().where(table.c.id == job_id).values(
+            status='finished', locked_by=None, finished_at=datetime.utcnow(), last_error=None,
+            result=json.dumps(result, ensure_ascii=False, default=str)
+        )
+    )
+    db.session.commit()
+    current_app.logger.info(f'Job {job_id} ({row.type}) finished in {time.monotonic() - started:.2f}s')
+    return True
+
+
+def report_progress(**progress):
+    """
+    在任务处理函数中报告进度（写入任务记录并提交）
+
+    Args:
+        **progress: 进度信息，需可序列化为JSON
+    """
+    from app.models.job import Job
+
+    job_id = _current_job.get()
+    if job_id is None:
+        return
+    table = Job.__table__
+    db.session.execute(
+        table.update().where(table.c.id == job_id).values(progress=json.dumps(progress, ensure_ascii=False))
+    )
+    db.session.commit()
+
+
+def run_worker(app, burst=False):
+    """
+    任务进程主循环
+
+    收到 SIGTERM / SIGINT 后执行完当前任务再退出。
+
+    Args:
+        app: Flask应用实例
+        burst (bool): 为True时处理完所有到期任务后退出
+
+    Returns:
+        int: 执行的任务数
+    """
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        app.logger.info(f'Job worker received signal {signum}, stopping after the current job')
+        stopping.set()
+
+    previous_handlers = {}
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            previous_handlers[signum] = signal.signal(signum, stop)
+
+    worker = _worker_id()
+    interval = app.config.get('JOB_POLL_INTERVAL', 2)
+    processed = 0
+    try:
+        with app.app_context():
+            app.logger.info(f'Job worker {worker} started')
+            while not stopping.is_set():
+                job_id = claim_next(worker)
+                if job_id is None:
+                    db.session.remove()
+                    if burst:
+                        break
+                    stopping.wait(interval)
+                    continue
+                run_job(job_id)
+                processed += 1
+                # 每个任务使用新的会话，不保留上一个任务加载的对象
+                db.session.remove()
+            app.logger.info(f'Job worker {worker} stopped after {processed} jobs')
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+    return processed
+
+
+# ---------------------------------------------------------------------------
+# 任务类型
+# ---------------------------------------------------------------------------
+
+def _deletion_progress(stage, counts):
+    report_progress(stage=stage, counts=counts)
+
+
+@job_handler('users.delete')
+def delete_user_job(user_id):
+    """删除用户及其全部内容（已删除的部分不会重复处理）"""
+    from app.services.deletion import delete_user
+
+    return delete_user(user_id, batch_size=current_app.config.get('DELETION_BATCH_SIZE', 500),
+                       progress=_deletion_progress)
+
+
+@job_handler('articles.delete')
+def delete_articles_job(article_ids):
+    """删除文章及其全部评论"""
+    from app.services.deletion import delete_articles
+
+    return delete_articles(article_ids, batch_size=current_app.config.get('DELETION_BATCH_SIZE', 500),
+                           progress=_deletion_progress)
+
+
+@job_handler('comments.moderate')
+def moderate_comments_job(action, criteria):
+    """
+    按筛选条件批量审核评论（已处于目标状态的评论不会重复修改）
+
+    criteria 为 Comment.moderation_filter 的参数，日期以ISO格式字符串传递。
+    """
+    from app.models.comment import Comment
+
+    for name in ('created_from', 'created_to'):
+        if criteria.get(name):
+            criteria[name] = datetime.fromisoformat(criteria[name])
+    return Comment.bulk_moderate(
+        action, Comment.moderation_filter(**criteria),
+        progress=lambda affected: report_progress(affected=affected)
+    )
+
+
+@job_handler('counters.reconcile')
+def reconcile_counters_job(batch_size=1000):
+    """重新计算文章评论数和评论回复数"""
+    from app.models.comment import Comment
+
+    return Comment.reconcile_counters(batch_size=batch_size)
+
+
+@job_handler('comments.backfill_paths')
+def backfill_comment_paths_job(batch_size=1000):
+    """为缺少物化路径的评论补充路径"""
+    from app.models.comment import Comment
+
+    return {'filled': Comment.backfill_paths(batch_size=batch_size)}
+
+
+@job_handler('users.rebuild_stats')
+def rebuild_user_stats_job(batch_size=1000):
+    """重新统计用户汇总（补齐缺失的行并修正偏差）"""
+    from app.models.user_stats import UserStats
+
+    return UserStats.rebuild(batch_size=batch_size)
+
+
+@job_handler('articles.backfill_stats')
+def backfill_article_stats_job(batch_size=500):
+    """补齐文章的字数、阅读时间和空摘要"""
+    from app.models.article import Article
+
+    return {'filled': Article.backfill_content_stats(batch_size=batch_size)}
+
+
+@job_handler('search.reindex')
+def reindex_search_job():
+    """
+    重建检索索引
+
+    检索后端为 engine 时重建索引文件（各工作进程重启后加载），否则重建数据库全文索引。
+    """
+    from app.services.search import rebuild_index
+    from app.services.search_engine import build_from_database
+
+    config = current_app.config
+    if config.get('SEARCH_BACKEND') == 'engine':
+        engine = build_from_database(merge_threshold=config.get('SEARCH_ENGINE_MERGE_THRESHOLD', 1000))
+        engine.save(config.get('SEARCH_ENGINE_PATH', os.path.join('instance', 'search_index')))
+        return {'backend': 'engine', 'documents': len(engine)}
+    return {'backend': 'database', 'available': rebuild_index()}
+
+
+@job_handler('cache.warm')
+def warm_cache_job(paths=None):
+    """
+    以匿名身份请求页面，预先填充整页缓存
+
+    只有共享缓存后端（redis）的预热结果对 web 工作进程可见。
+    """
+    paths = paths or current_app.config.get('CACHE_WARM_PATHS', ['/', '/articles'])
+    client = current_app.test_client()
+    return {path: client.get(path).status_code for path in paths}
@@ -0,0 +1,337 @@
+"""
+文章全文检索服务
+Article Full-Text Search Service
+
+根据数据库方言选择倒排索引实现：
+- MySQL: FULLTEXT 索引 + ngram 分词器（支持中文），按 MATCH ... AGAINST 相关度排序
+- SQLite: FTS5 外部内容表 + trigram 分词器，按 bm25 相关度排序，由触发器增量维护
+
+索引覆盖所有文章（包括草稿），发布状态在查询时过滤，
+因此发布、取消发布不需要更新索引；只有标题、摘要、正文变化时才会更新。
+关键词过短（低于分词长度）或索引不可用时退回 LIKE 匹配。
+配置 SEARCH_BACKEND=engine 时改用进程内检索引擎（见 search_engine.py）。
+"""
+from sqlalchemy import or_, text, Float, Integer
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+
+
+# 索引对象名称
+FTS_TABLE = 'articles_fts'
+FULLTEXT_INDEX = 'ft_articles_search'
+
+# 各字段的bm25权重（标题 > 摘要 > 正文）
+SQLITE_BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+# 分词最小长度：SQLite trigram 为3，MySQL ngram 默认 ngram_token_size=2
+MIN_TERM_LENGTH = {
+    'sqlite': 3,
+    'mysql': 2,
+}
+
+# 各数据库引擎的索引可用状态缓存（避免每次搜索都查询系统表）
+_index_available = {}
+
+SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, summary, content,
+        content='articles', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON articles BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON articles BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, summary, content ON articles BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, summary, content)
+        VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+]
+
+
+def get_dialect():
+    """
+    获取当前数据库方言名称
+
+    Returns:
+        str: 方言名称（sqlite / mysql / ...）
+    """
+    return db.engine.dialect.name
+
+
+def _sqlite_index_exists(connection):
+    row = connection.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': FTS_TABLE}
+    ).first()
+    return row is not None
+
+
+def _mysql_index_exists(connection):
+    row = connection.execute(
+        text(
+            "SELECT 1 FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = 'articles' "
+            "AND index_name = :name LIMIT 1"
+        ),
+        {'name': FULLTEXT_INDEX}
+    ).first()
+    return row is not None
+
+
+def is_index_available():
+    """
+    检查全文索引是否可用
+
+    Returns:
+        bool: 是否可用
+    """
+    engine = db.engine
+    key = str(engine.url)
+    if key not in _index_available:
+        dialect = engine.dialect.name
+        try:
+            with engine.connect() as connection:
+                if dialect == 'sqlite':
+                    _index_available[key] = _sqlite_index_exists(connection)
+                elif dialect == 'mysql':
+                    _index_available[key] = _mysql_index_exists(connection)
+                else:
+                    _index_available[key] = False
+        except SQLAlchemyError:
+            _index_available[key] = False
+    return _index_available[key]
+
+
+def create_index():
+    """
+    创建全文索引（已存在时不做任何事）
+
+    SQLite 会同时创建增量维护索引的触发器，并在新建索引时导入已有文章；
+    MySQL 的 FULLTEXT 索引由 InnoDB 自动维护。大表上创建 MySQL 索引耗时较长，
+    应通过 flask search-index create 命令离线执行。
+
+    Returns:
+        bool: 索引是否可用
+    """
+    engine = db.engine
+    dialect = engine.dialect.name
+    _index_available.pop(str(engine.url), None)
+
+    with engine.begin() as connection:
+        if dialect == 'sqlite':
+            existed = _sqlite_index_exists(connection)
+            for statement in SQLITE_DDL:
+                connection.execute(text(statement))
+            if not existed:
+                connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        elif dialect == 'mysql':
+            if not _mysql_index_exists(connection):
+                connection.execute(text(
+                    f"ALTER TABLE articles ADD FULLTEXT INDEX {FULLTEXT_INDEX} "
+                    f"(title, summary, content) WITH PARSER ngram"
+                ))
+        else:
+            return False
+
+    return is_index_available()
+
+
+def rebuild_index():
+    """
+    重建全文索引
+
+    SQLite 从文章表重新导入全部内容；MySQL 删除并重新创建 FULLTEXT 索引。
+
+    Returns:
+        bool: 索引是否可用
+    """
+    engine = db.engine
+    dialect = engine.dialect.name
+
+    if dialect == 'sqlite':
+        create_index()
+        with engine.begin() as connection:
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    elif dialect == 'mysql':
+        with engine.begin() as connection:
+            if _mysql_index_exists(connection):
+                connection.execute(text(f"ALTER TABLE articles DROP INDEX {FULLTEXT_INDEX}"))
+        create_index()
+
+    _index_available.pop(str(engine.url), None)
+    return is_index_available()
+
+
+def init_search(app):
+    """
+    初始化全文检索
+
+    SQLite 的 FTS5 表和触发器创建成本很低，启动时自动创建；
+    MySQL 索引只检测是否存在，不在启动时创建。
+
+    Args:
+        app: Flask应用实例
+    """
+    backend = app.config.get('SEARCH_BACKEND', 'auto')
+    if backend == 'like':
+        return
+    if backend == 'engine':
+        from app.services.search_engine import init_search_engine
+        init_search_engine(app)
+        return
+    if get_dialect() == 'sqlite':
+        try:
+            create_index()
+        except SQLAlchemyError as e:
+            # 部分SQLite编译版本不包含FTS5或trigram分词器
+            app.logger.warning(f'SQLite FTS5 search index unavailable: {e}')
+
+
+def _split_terms(keyword):
+    """将关键词按空白拆分为检索词"""
+    return [term for term in keyword.split() if term]
+
+
+def _fts5_query(terms):
+    """构造FTS5查询表达式：每个检索词作为短语，多个检索词同时匹配"""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _like_filter(model, keyword):
+    """构造LIKE匹配条件（退回方案）"""
+    return or_(
+        model.title.contains(keyword),
+        model.content.contains(keyword),
+        model.summary.contains(keyword)
+    )
+
+
+def can_use_index(keyword):
+    """
+    检查关键词能否使用全文索引
+
+    Args:
+        keyword (str): 搜索关键词
+
+    Returns:
+        bool: 是否可以使用索引
+    """
+    from flask import current_app
+
+    if current_app.config.get('SEARCH_BACKEND', 'auto') in ('like', 'engine'):
+        return False
+    terms = _split_terms(keyword)
+    min_length = MIN_TERM_LENGTH.get(get_dialect())
+    if not terms or min_length is None:
+        return False
+    if any(len(term) < min_length for term in terms):
+        return False
+    return is_index_available()
+
+
+def search_articles(keyword, category_id=None, status='published'):
+    """
+    搜索文章，结果按相关度排序
+
+    Args:
+        keyword (str): 搜索关键词
+        category_id (int): 分类ID
+        status (str): 文章状态，None表示不限状态
+
+    Returns:
+        Query: 文章查询对象
+    """
+    from app.models.article import Article
+
+    query = Article.query
+    if status:
+        query = query.filter(Article.status == status)
+    if category_id:
+        query = query.filter(Article.category_id == category_id)
+
+    keyword = (keyword or '').strip()
+    if not keyword:
+        return query.order_by(Article.created_at.desc())
+
+    if not can_use_index(keyword):
+        return query.filter(_like_filter(Article, keyword)).order_by(Article.created_at.desc())
+
+    terms = _split_terms(keyword)
+    if get_dialect() == 'sqlite':
+        weights = ', '.join(str(weight) for weight in SQLITE_BM25_WEIGHTS)
+        matches = text(
+            f"SELECT rowid AS article_id, bm25({FTS_TABLE}, {weights}) AS score "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query"
+        ).bindparams(fts_query=_fts5_query(terms)).columns(article_id=Integer, score=Float).subquery()
+        # bm25 分数越小越相关
+        return query.join(matches, Article.id == matches.c.article_id)\
+                    .order_by(matches.c.score.asc(), Article.id.desc())
+
+    from sqlalchemy.dialects.mysql import match
+    score = match(Article.title, Article.summary, Article.content, against=' '.join(terms))\
+        .in_natural_language_mode()
+    return query.filter(score > 0).order_by(score.desc(), Article.id.desc())
+
+
+def search_article_page(keyword, category_id=None, page=1, per_page=10):
+    """
+    搜索已发布文章并分页，结果附带高亮摘要片段（article.search_snippet）
+
+    启用进程内检索引擎时，匹配和排序在引擎中完成，只按命中ID回表加载当前页文章；
+    否则（或关键词包含引擎无法匹配的单个汉字时）使用数据库全文索引或 LIKE 匹配。
+
+    Args:
+        keyword (str): 搜索关键词
+        category_id (int): 分类ID
+        page (int): 页码
+        per_page (int): 每页数量
+
+    Returns:
+        Pagination: 分页对象
+    """
+    from flask import current_app
+    from sqlalchemy.orm import undefer
+    from app.models.article import Article
+    from app.services.search_engine import get_search_engine, search_article_ids, highlight_snippet, can_use_engine
+    from app.utils.database import ResultPagination
+    from app.utils.performance import optimize_article_query
+
+    page = max(page, 1)
+    if current_app.config.get('SEARCH_BACKEND') == 'engine' and get_search_engine() is not None \
+            and can_use_engine(keyword):
+        total, ids = search_article_ids(
+            current_app, keyword, category_id=category_id,
+            offset=(page - 1) * per_page, limit=per_page
+        )
+        found = {}
+        if ids:
+            rows = optimize_article_query(Article.query).options(undefer(Article.content))\
+                .filter(Article.id.in_(ids), Article.status == 'published').all()
+            found = {article.id: article for article in rows}
+        items = [found[article_id] for article_id in ids if article_id in found]
+        pagination = ResultPagination(page=page, per_page=per_page, items=items, total=total, error_out=False)
+    else:
+        query = optimize_article_query(search_articles(keyword, category_id=category_id))\
+            .options(undefer(Article.content))
+        pagination = query.paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+
+    # 命中片段从正文中截取（正文已在查询中加载）
+    for article in pagination.items:
+        article.search_snippet = highlight_snippet(article.content or article.summary, keyword)
+    return pagination
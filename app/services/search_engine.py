@@ -0,0 +1,934 @@
+"""
+进程内全文检索引擎
+In-Process Full-Text Search Engine
+
+不依赖数据库全文索引的检索引擎，作为搜索的退回方案：
+- 分词：中日韩文字按二元组（bigram）切分，字母数字按单词切分；
+  单个汉字的查询词无法匹配二元组，由调用方退回 LIKE 匹配（见 can_use_engine）
+- 排序：BM25，标题、摘要、正文按不同权重计入词频
+- 存储：已合并的段以紧凑数组保存倒排表，可持久化到磁盘并通过内存映射加载；
+  增量变更写入内存中的增量段，旧文档用墓碑标记，积累到阈值后在后台线程中合并，
+  完成后原子替换基础段
+- 摘要：为命中文档生成高亮片段
+
+索引只包含已发布的文章，并记录分类，因此匹配和分类过滤都不需要访问数据库。
+每个工作进程持有一份引擎：本进程的提交通过会话事件立即更新，
+其他进程的修改通过定期按 updated_at 增量同步追上，被删除的文章由后台线程比对已发布文章ID移除。
+"""
+from array import array
+from datetime import datetime
+from markupsafe import escape, Markup
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from app import db
+
+
+# 中日韩文字（统一汉字、扩展A、兼容汉字、假名、韩文音节）
+_CJK_CHARS = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af'
+_CJK_RE = re.compile(f'[{_CJK_CHARS}]')
+_TOKEN_RE = re.compile(f'[{_CJK_CHARS}]+|[a-z0-9]+')
+_TAG_RE = re.compile(r'<[^<>]+>')
+
+# 各字段的词频权重
+FIELD_WEIGHTS = (('title', 3), ('summary', 2), ('content', 1))
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 持久化格式版本
+INDEX_FORMAT_VERSION = 1
+
+# 数组类型：文档序号/词频/长度使用无符号32位整数，分类使用有符号整数，发布时间使用双精度浮点
+_UINT = 'I'
+_INT = 'i'
+_DOUBLE = 'd'
+
+
+def tokenize(text):
+    """
+    分词
+
+    Args:
+        text (str): 文本
+
+    Returns:
+        list: 词项列表（可重复）
+    """
+    if not text:
+        return []
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        run = match.group()
+        if _CJK_RE.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def tokenize_query(query):
+    """
+    查询分词（去重并保持顺序）
+
+    Args:
+        query (str): 查询字符串
+
+    Returns:
+        list: 词项列表
+    """
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def can_use_engine(query):
+    """
+    检查查询能否由引擎匹配
+
+    索引按二元组切分中日韩文字，单独出现的一个汉字（或假名、韩文音节）只有在文档中
+    同样单独出现时才会被索引，这样的查询需要退回 LIKE 匹配。
+
+    Args:
+        query (str): 查询字符串
+
+    Returns:
+        bool: 是否可以使用引擎
+    """
+    return not any(_CJK_RE.match(run) and len(run) == 1 for run in _TOKEN_RE.findall((query or '').lower()))
+
+
+def strip_tags(text):
+    """移除HTML标签"""
+    return _TAG_RE.sub(' ', text or '')
+
+
+def analyze_document(title, summary, content):
+    """
+    分析文档，计算加权词频和文档长度
+
+    Args:
+        title (str): 标题
+        summary (str): 摘要
+        content (str): 正文
+
+    Returns:
+        tuple: (词项 -> 加权词频, 加权文档长度)
+    """
+    fields = {'title': title, 'summary': summary, 'content': strip_tags(content)}
+    frequencies = {}
+    length = 0
+    for field, weight in FIELD_WEIGHTS:
+        tokens = tokenize(fields[field])
+        length += len(tokens) * weight
+        for token in tokens:
+            frequencies[token] = frequencies.get(token, 0) + weight
+    return frequencies, length
+
+
+def highlight_snippet(text, query, width=120):
+    """
+    生成带高亮的摘要片段
+
+    Args:
+        text (str): 原文（可包含HTML标签）
+        query (str): 查询字符串
+        width (int): 片段长度
+
+    Returns:
+        Markup: 已转义并用 <mark> 标记命中词的HTML片段
+    """
+    plain = ' '.join(strip_tags(text).split())
+    terms = sorted(
+        {term for term in query.lower().split() if term} | set(tokenize_query(query)),
+        key=len, reverse=True
+    )
+    if not plain or not terms:
+        return Markup(escape(plain[:width]))
+
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+    first = pattern.search(plain)
+    start = max(first.start() - width // 4, 0) if first else 0
+    fragment = plain[start:start + width]
+
+    parts = []
+    position = 0
+    for match in pattern.finditer(fragment):
+        parts.append(escape(fragment[position:match.start()]))
+        parts.append(Markup('<mark>') + escape(match.group()) + Markup('</mark>'))
+        position = match.end()
+    parts.append(escape(fragment[position:]))
+
+    prefix = '...' if start > 0 else ''
+    suffix = '...' if start + width < len(plain) else ''
+    return Markup(prefix) + Markup('').join(parts) + Markup(suffix)
+
+
+class Segment:
+    """
+    不可变索引段
+
+    倒排表以两个并列的无符号整数数组保存（文档序号、加权词频），
+    每个词项对应数组中连续的一段；文档属性同样以并列数组保存，
+    文档序号即数组下标。数组既可以是内存中的 array，也可以是
+    映射到文件的 memoryview。
+    """
+
+    def __init__(self, terms, postings_docs, postings_freqs, doc_ids, doc_lengths,
+                 doc_categories, doc_published, mmaps=None):
+        self.terms = terms  # 词项 -> (起始偏移, 数量)
+        self.postings_docs = postings_docs
+        self.postings_freqs = postings_freqs
+        self.doc_ids = doc_ids
+        self.doc_lengths = doc_lengths
+        self.doc_categories = doc_categories
+        self.doc_published = doc_published
+        self.total_length = sum(doc_lengths)
+        self._mmaps = mmaps or []
+        self._positions = None
+
+    @classmethod
+    def empty(cls):
+        return cls({}, array(_UINT), array(_UINT), array(_UINT), array(_UINT), array(_INT), array(_DOUBLE))
+
+    @classmethod
+    def from_documents(cls, documents):
+        """
+        由文档构建索引段
+
+        Args:
+            documents (list): (文章ID, 词频字典, 长度, 分类ID, 发布时间戳) 列表
+
+        Returns:
+            Segment: 索引段
+        """
+        documents = sorted(documents, key=lambda d: d[0])
+        inverted = {}
+        doc_ids, doc_lengths = array(_UINT), array(_UINT)
+        doc_categories, doc_published = array(_INT), array(_DOUBLE)
+        for position, (article_id, frequencies, length, category_id, published) in enumerate(documents):
+            doc_ids.append(article_id)
+            doc_lengths.append(length)
+            doc_categories.append(category_id or 0)
+            doc_published.append(published or 0.0)
+            for term, frequency in frequencies.items():
+                inverted.setdefault(term, []).append((position, frequency))
+
+        terms = {}
+        postings_docs, postings_freqs = array(_UINT), array(_UINT)
+        for term in sorted(inverted):
+            postings = inverted[term]
+            terms[term] = (len(postings_docs), len(postings))
+            for position, frequency in postings:
+                postings_docs.append(position)
+                postings_freqs.append(frequency)
+
+        return cls(terms, postings_docs, postings_freqs, doc_ids, doc_lengths, doc_categories, doc_published)
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def position_of(self, article_id):
+        """获取文章在段内的序号（不存在返回None）"""
+        if self._positions is None:
+            self._positions = {article_id: i for i, article_id in enumerate(self.doc_ids)}
+        return self._positions.get(article_id)
+
+    def postings(self, term):
+        """
+        获取词项的倒排表
+
+        Yields:
+            tuple: (文档序号, 加权词频)
+        """
+        entry = self.terms.get(term)
+        if entry is None:
+            return
+        offset, count = entry
+        docs = self.postings_docs[offset:offset + count]
+        freqs = self.postings_freqs[offset:offset + count]
+        yield from zip(docs, freqs)
+
+    def document_frequency(self, term):
+        entry = self.terms.get(term)
+        return entry[1] if entry else 0
+
+    def documents(self):
+        """
+        遍历段内文档（用于合并）
+
+        Yields:
+            tuple: (序号, 文章ID, 长度, 分类ID, 发布时间戳)
+        """
+        for position in range(len(self.doc_ids)):
+            yield (position, self.doc_ids[position], self.doc_lengths[position],
+                   self.doc_categories[position], self.doc_published[position])
+
+    def save(self, directory):
+        """
+        将索引段写入目录
+
+        Args:
+            directory (str): 目标目录
+        """
+        os.makedirs(directory, exist_ok=True)
+        arrays = {
+            'postings_docs': (self.postings_docs, _UINT),
+            'postings_freqs': (self.postings_freqs, _UINT),
+            'doc_ids': (self.doc_ids, _UINT),
+            'doc_lengths': (self.doc_lengths, _UINT),
+            'doc_categories': (self.doc_categories, _INT),
+            'doc_published': (self.doc_published, _DOUBLE),
+        }
+        for name, (values, typecode) in arrays.items():
+            with open(os.path.join(directory, f'{name}.bin'), 'wb') as f:
+                f.write(array(typecode, values).tobytes())
+        meta = {
+            'version': INDEX_FORMAT_VERSION,
+            'byteorder': sys.byteorder,
+            'terms': self.terms,
+        }
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        通过内存映射加载索引段
+
+        Args:
+            directory (str): 索引段目录
+
+        Returns:
+            Segment: 索引段
+        """
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != INDEX_FORMAT_VERSION or meta.get('byteorder') != sys.byteorder:
+            raise ValueError('索引文件格式不兼容，需要重建')
+
+        mmaps = []
+
+        def map_array(name, typecode):
+            path = os.path.join(directory, f'{name}.bin')
+            if os.path.getsize(path) == 0:
+                return array(typecode)
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            mmaps.append(mapped)
+            return memoryview(mapped).cast(typecode)
+
+        terms = {term: tuple(entry) for term, entry in meta['terms'].items()}
+        return cls(
+            terms,
+            map_array('postings_docs', _UINT),
+            map_array('postings_freqs', _UINT),
+            map_array('doc_ids', _UINT),
+            map_array('doc_lengths', _UINT),
+            map_array('doc_categories', _INT),
+            map_array('doc_published', _DOUBLE),
+            mmaps=mmaps
+        )
+
+
+class SearchEngine:
+    """
+    检索引擎
+
+    由一个不可变的基础段、一个可变的增量段和墓碑集合组成：
+    更新文章时把基础段中的旧文档标记为墓碑并写入增量段，
+    增量段超过阈值后由后台线程与基础段合并为新的基础段。
+    """
+
+    def __init__(self, base=None, merge_threshold=1000):
+        """
+        初始化检索引擎
+
+        Args:
+            base (Segment): 基础段
+            merge_threshold (int): 增量段文档数达到该值时触发合并
+        """
+        self.base = base or Segment.empty()
+        self.merge_threshold = merge_threshold
+        self.synced_at = None  # 已同步到的文章 updated_at
+        self._delta = {}  # 文章ID -> (词频字典, 长度, 分类ID, 发布时间戳)
+        self._delta_postings = {}  # 词项 -> {文章ID: 加权词频}
+        self._tombstones = set()  # 基础段中已失效的文章ID
+        self._changed = None  # 合并期间变更的文章ID（未在合并时为None）
+        self._lock = threading.RLock()
+        self._merge_lock = threading.Lock()
+        self._merge_thread = None
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def _remove_from_delta(self, article_id):
+        document = self._delta.pop(article_id, None)
+        if document is None:
+            return
+        for term in document[0]:
+            postings = self._delta_postings.get(term)
+            if postings is not None:
+                postings.pop(article_id, None)
+                if not postings:
+                    del self._delta_postings[term]
+
+    def remove(self, article_id):
+        """
+        从索引中移除文章
+
+        Args:
+            article_id (int): 文章ID
+        """
+        with self._lock:
+            self._remove_from_delta(article_id)
+            if self.base.position_of(article_id) is not None:
+                self._tombstones.add(article_id)
+            if self._changed is not None:
+                self._changed.add(article_id)
+
+    def add(self, article_id, title, summary, content, category_id=None, published_at=None):
+        """
+        添加或更新文章
+
+        Args:
+            article_id (int): 文章ID
+            title (str): 标题
+            summary (str): 摘要
+            content (str): 正文
+            category_id (int): 分类ID
+            published_at (datetime): 发布时间
+        """
+        frequencies, length = analyze_document(title, summary, content)
+        published = published_at.timestamp() if isinstance(published_at, datetime) else (published_at or 0.0)
+        with self._lock:
+            self.remove(article_id)
+            self._delta[article_id] = (frequencies, length, category_id or 0, published)
+            for term, frequency in frequencies.items():
+                self._delta_postings.setdefault(term, {})[article_id] = frequency
+            if len(self._delta) >= self.merge_threshold:
+                self._schedule_merge()
+
+    def _schedule_merge(self):
+        """启动后台合并线程（已有合并在进行时不重复启动）"""
+        with self._lock:
+            if self._merge_thread is not None and self._merge_thread.is_alive():
+                return
+            self._merge_thread = threading.Thread(target=self.merge, name='search-engine-merge', daemon=True)
+            self._merge_thread.start()
+
+    def wait_for_merge(self, timeout=None):
+        """
+        等待后台合并完成
+
+        Args:
+            timeout (float): 最长等待秒数
+        """
+        thread = self._merge_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def merge(self):
+        """
+        将增量段与基础段（去除墓碑）合并为新的基础段
+
+        锁内只复制增量段和墓碑集合，构建新段时不持有锁，检索和写入照常进行；
+        构建完成后在锁内替换基础段，合并期间变更的文章保留在新的增量段和墓碑集合中。
+
+        Returns:
+            tuple: (合并后的基础段, 合并内容对应的同步时间)
+        """
+        with self._merge_lock:
+            with self._lock:
+                if not self._delta and not self._tombstones:
+                    return self.base, self.synced_at
+                base = self.base
+                delta = dict(self._delta)
+                tombstones = set(self._tombstones)
+                synced_at = self.synced_at
+                self._changed = set()
+
+            try:
+                per_doc = {}
+                live_positions = {}
+                for position, article_id, length, category_id, published in base.documents():
+                    if article_id in tombstones or article_id in delta:
+                        continue
+                    live_positions[position] = article_id
+                    per_doc[article_id] = ({}, length, category_id, published)
+                for term, (offset, count) in base.terms.items():
+                    for position, frequency in base.postings(term):
+                        article_id = live_positions.get(position)
+                        if article_id is not None:
+                            per_doc[article_id][0][term] = frequency
+                per_doc.update(delta)
+
+                merged = Segment.from_documents(
+                    [(article_id,) + document for article_id, document in per_doc.items()]
+                )
+                merged.position_of(0)  # 在锁外建立文章ID -> 序号映射
+            except BaseException:
+                with self._lock:
+                    self._changed = None
+                raise
+
+            with self._lock:
+                changed, self._changed = self._changed, None
+                self.base = merged
+                self._delta = {article_id: self._delta[article_id] for article_id in changed if article_id in self._delta}
+                self._delta_postings = {}
+                for article_id, document in self._delta.items():
+                    for term, frequency in document[0].items():
+                        self._delta_postings.setdefault(term, {})[article_id] = frequency
+                # 合并期间变更的文章，其在新基础段中的版本已经过期
+                self._tombstones = {article_id for article_id in changed if merged.position_of(article_id) is not None}
+            return merged, synced_at
+
+    def article_ids(self):
+        """
+        获取索引中的全部文章ID
+
+        Returns:
+            set: 文章ID集合
+        """
+        with self._lock:
+            ids = set(self.base.doc_ids)
+            ids -= self._tombstones
+            ids.update(self._delta)
+            return ids
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        with self._lock:
+            return len(self.base) - len(self._tombstones) + len(self._delta)
+
+    def _term_postings(self, term):
+        """合并基础段和增量段的倒排表，返回 文章ID -> (加权词频, 长度, 分类ID, 发布时间戳)"""
+        base = self.base
+        result = {}
+        for position, frequency in base.postings(term):
+            article_id = base.doc_ids[position]
+            if article_id in self._tombstones:
+                continue
+            result[article_id] = (frequency, base.doc_lengths[position],
+                                  base.doc_categories[position], base.doc_published[position])
+        for article_id, frequency in self._delta_postings.get(term, {}).items():
+            _, length, category_id, published = self._delta[article_id]
+            result[article_id] = (frequency, length, category_id, published)
+        return result
+
+    def search(self, query, category_id=None, offset=0, limit=10):
+        """
+        检索文章
+
+        所有查询词项都必须出现（与数据库全文索引行为一致），按BM25分数排序，
+        分数相同时较新发布的文章在前。
+
+        Args:
+            query (str): 查询字符串
+            category_id (int): 分类ID
+            offset (int): 结果偏移
+            limit (int): 结果数量
+
+        Returns:
+            tuple: (命中总数, [(文章ID, 分数), ...])
+        """
+        terms = tokenize_query(query)
+        if not terms:
+            return 0, []
+
+        with self._lock:
+            doc_count = len(self)
+            if doc_count == 0:
+                return 0, []
+            total_length = self.base.total_length + sum(d[1] for d in self._delta.values())
+            avg_length = total_length / doc_count if doc_count else 1.0
+
+            # 先处理文档频率最低的词项，尽早缩小候选集合
+            term_postings = sorted((self._term_postings(term) for term in terms), key=len)
+            candidates = None
+            for postings in term_postings:
+                if candidates is None:
+                    candidates = set(postings)
+                else:
+                    candidates &= postings.keys()
+                if not candidates:
+                    return 0, []
+
+            scores = []
+            for article_id in candidates:
+                first = term_postings[0][article_id]
+                if category_id and first[2] != category_id:
+                    continue
+                score = 0.0
+                for postings in term_postings:
+                    frequency, length = postings[article_id][0], postings[article_id][1]
+                    df = len(postings)
+                    idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (avg_length or 1.0))
+                    score += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                scores.append((score, first[3], article_id))
+
+        scores.sort(key=lambda item: (-item[0], -item[1], -item[2]))
+        return len(scores), [(article_id, score) for score, _, article_id in scores[offset:offset + limit]]
+
+    # ------------------------------------------------------------------
+    # 持久化
+    # ------------------------------------------------------------------
+
+    def save(self, path):
+        """
+        合并后持久化到目录
+
+        每次保存写入新的代目录，再原子替换 CURRENT 指针，
+        正在使用旧文件映射的其他进程不受影响。
+
+        合并完成后写入的基础段不可变，写文件时不持有锁；合并期间新增的变更不在文件中，
+        记录的同步时间取合并开始时的值，加载后的增量同步会重新读取这些文章。
+
+        Args:
+            path (str): 索引根目录
+        """
+        base, synced_at = self.merge()
+        os.makedirs(path, exist_ok=True)
+        # 先写入临时目录，写完后再命名为代目录，清理时不会遇到写了一半的代
+        tmp_dir = os.path.join(path, f'tmp-{os.getpid()}-{time.time_ns()}')
+        base.save(tmp_dir)
+        generation = f'gen-{time.time_ns()}'
+        os.replace(tmp_dir, os.path.join(path, generation))
+        state = {
+            'generation': generation,
+            'synced_at': synced_at.isoformat() if synced_at else None,
+        }
+        pointer = os.path.join(path, 'CURRENT')
+        replaced = _read_generation(pointer)
+        tmp_pointer = f'{pointer}.{os.getpid()}.tmp'
+        with open(tmp_pointer, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_pointer, pointer)
+
+        # 只清理比被替换的代更早的代目录：多个进程同时保存时，
+        # 其他进程刚写完、尚未切换指针的代比被替换的代更新，不会被删除
+        # （Linux上已映射的文件在取消映射前仍然有效）
+        if replaced is None:
+            return
+        for name in os.listdir(path):
+            if (name.startswith('gen-') and name != generation
+                    and _generation_number(name) < _generation_number(replaced)):
+                shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, merge_threshold=1000):
+        """
+        从目录加载引擎
+
+        Args:
+            path (str): 索引根目录
+            merge_threshold (int): 增量段合并阈值
+
+        Returns:
+            SearchEngine: 检索引擎；索引不存在时返回None
+        """
+        pointer = os.path.join(path, 'CURRENT')
+        if not os.path.exists(pointer):
+            return None
+        with open(pointer, encoding='utf-8') as f:
+            state = json.load(f)
+        engine = cls(Segment.load(os.path.join(path, state['generation'])), merge_threshold=merge_threshold)
+        if state.get('synced_at'):
+            engine.synced_at = datetime.fromisoformat(state['synced_at'])
+        return engine
+
+
+def _generation_number(name):
+    """解析代目录名中的时间戳，无法解析时返回-1"""
+    try:
+        return int(name[len('gen-'):])
+    except ValueError:
+        return -1
+
+
+def _read_generation(pointer):
+    """
+    读取 CURRENT 指针指向的代目录名
+
+    Args:
+        pointer (str): CURRENT 文件路径
+
+    Returns:
+        str: 代目录名；指针不存在或无法解析时返回None
+    """
+    try:
+        with open(pointer, encoding='utf-8') as f:
+            return json.load(f).get('generation')
+    except (OSError, ValueError):
+        return None
+
+
+# ----------------------------------------------------------------------
+# 应用集成
+# ----------------------------------------------------------------------
+
+# 当前工作进程使用的检索引擎
+_engine = None
+_last_refresh = 0.0
+_last_reconcile = 0.0
+_reconcile_thread = None
+
+# 影响索引内容的文章字段
+_INDEXED_FIELDS = ('title', 'summary', 'content', 'status', 'category_id', 'published_at')
+
+
+def get_search_engine():
+    """
+    获取当前工作进程的检索引擎
+
+    Returns:
+        SearchEngine: 检索引擎，未启用时返回None
+    """
+    return _engine
+
+
+def _index_rows(engine, rows):
+    """将文章行写入引擎，未发布的文章从索引中移除"""
+    latest = engine.synced_at
+    for row in rows:
+        if row.status == 'published':
+            engine.add(row.id, row.title, row.summary, row.content, row.category_id, row.published_at)
+        else:
+            engine.remove(row.id)
+        if latest is None or row.updated_at > latest:
+            latest = row.updated_at
+    engine.synced_at = latest
+
+
+def _article_rows(query_filter=None, batch_size=500):
+    """按批读取建立索引所需的文章字段"""
+    from app.models.article import Article
+
+    query = db.session.query(
+        Article.id, Article.title, Article.summary, Article.content, Article.status,
+        Article.category_id, Article.published_at, Article.updated_at
+    )
+    if query_filter is not None:
+        query = query.filter(query_filter)
+    return query.order_by(Article.id).execution_options(yield_per=batch_size)
+
+
+def build_from_database(batch_size=500, merge_threshold=1000):
+    """
+    由 articles 表构建检索引擎
+
+    Args:
+        batch_size (int): 每批读取的行数
+        merge_threshold (int): 增量段合并阈值
+
+    Returns:
+        SearchEngine: 检索引擎
+    """
+    from app.models.article import Article
+
+    documents = []
+    synced_at = None
+    for row in _article_rows(Article.status == 'published', batch_size):
+        frequencies, length = analyze_document(row.title, row.summary, row.content)
+        published = row.published_at.timestamp() if row.published_at else 0.0
+        documents.append((row.id, frequencies, length, row.category_id or 0, published))
+        if synced_at is None or row.updated_at > synced_at:
+            synced_at = row.updated_at
+
+    engine = SearchEngine(Segment.from_documents(documents), merge_threshold=merge_threshold)
+    engine.synced_at = synced_at
+    return engine
+
+
+def refresh_from_database(engine):
+    """
+    增量同步其他工作进程提交的修改
+
+    只读取 updated_at 晚于上次同步时间的文章（新增、修改和撤回发布）；
+    被删除的文章不会出现在结果中，由 remove_deleted_articles 在后台定期清理。
+
+    Args:
+        engine (SearchEngine): 检索引擎
+    """
+    from app.models.article import Article
+
+    query_filter = Article.updated_at > engine.synced_at if engine.synced_at else None
+    _index_rows(engine, _article_rows(query_filter))
+
+
+def remove_deleted_articles(engine):
+    """
+    从索引中移除数据库里已不存在的文章
+
+    被删除的文章（包括以集合语句批量删除的）无法通过 updated_at 发现，
+    因此读取全部已发布文章的ID与索引比对。索引中的ID在查询之前获取，
+    本进程在比对期间新提交的文章不会被误删。
+
+    Args:
+        engine (SearchEngine): 检索引擎
+
+    Returns:
+        int: 移除的文章数
+    """
+    from app.models.article import Article
+
+    indexed = engine.article_ids()
+    published = {
+        row.id for row in db.session.query(Article.id)
+        .filter(Article.status == 'published').execution_options(yield_per=5000)
+    }
+    removed = indexed - published
+    for article_id in removed:
+        engine.remove(article_id)
+    return len(removed)
+
+
+def _reconcile_in_background(app, engine):
+    """在后台线程中清理已删除的文章，不占用搜索请求"""
+    global _reconcile_thread
+
+    from sqlalchemy.exc import SQLAlchemyError
+
+    def run():
+        with app.app_context():
+            try:
+                removed = remove_deleted_articles(engine)
+                if removed:
+                    app.logger.info(f'Removed {removed} deleted articles from search index')
+            except SQLAlchemyError as e:
+                app.logger.warning(f'Search index reconcile failed: {e}')
+            finally:
+                db.session.remove()
+
+    _reconcile_thread = threading.Thread(target=run, name='search-engine-reconcile', daemon=True)
+    _reconcile_thread.start()
+
+
+def maybe_refresh(app):
+    """
+    距上次同步超过配置的间隔时执行增量同步
+
+    增量同步只读取最近修改的文章，在当前请求中执行；
+    删除检测需要读取全部已发布文章的ID，按更长的间隔在后台线程中执行。
+
+    Args:
+        app: Flask应用实例
+    """
+    global _last_refresh, _last_reconcile
+    if _engine is None:
+        return
+    now = time.monotonic()
+    if now - _last_refresh >= app.config.get('SEARCH_ENGINE_REFRESH_INTERVAL', 30):
+        _last_refresh = now
+        refresh_from_database(_engine)
+    if (now - _last_reconcile >= app.config.get('SEARCH_ENGINE_RECONCILE_INTERVAL', 300)
+            and not (_reconcile_thread and _reconcile_thread.is_alive())):
+        _last_reconcile = now
+        _reconcile_in_background(app, _engine)
+
+
+def _collect_article_changes(session, flush_context):
+    """flush后记录文章变更的快照，等待事务提交后更新索引"""
+    from app.models.article import Article
+    from app.utils.cache import has_relevant_changes
+
+    pending = session.info.setdefault('pending_search_updates', {})
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Article) and has_relevant_changes(obj, ignored=('view_count',)):
+            pending[obj.id] = {field: getattr(obj, field) for field in _INDEXED_FIELDS}
+    for obj in session.deleted:
+        if isinstance(obj, Article):
+            pending[obj.id] = None
+
+
+def _apply_article_changes(session):
+    """事务提交后把文章变更应用到本进程的检索引擎"""
+    pending = session.info.pop('pending_search_updates', None)
+    if not pending or _engine is None:
+        return
+    for article_id, snapshot in pending.items():
+        if snapshot is None or snapshot['status'] != 'published':
+            _engine.remove(article_id)
+        else:
+            _engine.add(article_id, snapshot['title'], snapshot['summary'], snapshot['content'],
+                        snapshot['category_id'], snapshot['published_at'])
+
+
+def _discard_article_changes(session):
+    """事务回滚时丢弃记录的文章变更"""
+    session.info.pop('pending_search_updates', None)
+
+
+def init_search_engine(app):
+    """
+    工作进程启动时加载检索引擎
+
+    优先通过内存映射加载磁盘上的索引；不存在或格式不兼容时从数据库构建并保存。
+    加载后执行一次增量同步和删除检测，并注册会话事件以便本进程的提交立即生效。
+
+    Args:
+        app: Flask应用实例
+    """
+    global _engine, _last_refresh, _last_reconcile
+    from sqlalchemy import event
+    from flask_sqlalchemy.session import Session
+
+    path = app.config.get('SEARCH_ENGINE_PATH', os.path.join('instance', 'search_index'))
+    merge_threshold = app.config.get('SEARCH_ENGINE_MERGE_THRESHOLD', 1000)
+
+    engine = None
+    try:
+        engine = SearchEngine.load(path, merge_threshold=merge_threshold)
+    except (OSError, ValueError) as e:
+        app.logger.warning(f'Search index at {path} could not be loaded, rebuilding: {e}')
+
+    if engine is None:
+        engine = build_from_database(merge_threshold=merge_threshold)
+        try:
+            engine.save(path)
+        except OSError as e:
+            app.logger.warning(f'Search index could not be saved to {path}: {e}')
+    else:
+        refresh_from_database(engine)
+        remove_deleted_articles(engine)
+
+    _engine = engine
+    _last_refresh = _last_reconcile = time.monotonic()
+
+    if not event.contains(Session, 'after_flush', _collect_article_changes):
+        event.listen(Session, 'after_flush', _collect_article_changes)
+        event.listen(Session, 'after_commit', _apply_article_changes)
+        event.listen(Session, 'after_rollback', _discard_article_changes)
+
+
+def search_article_ids(app, query, category_id=None, offset=0, limit=10):
+    """
+    使用引擎检索文章ID（匹配阶段不访问数据库，仅在到达同步间隔时增量同步）
+
+    Args:
+        app: Flask应用实例
+        query (str): 查询字符串
+        category_id (int): 分类ID
+        offset (int): 结果偏移
+        limit (int): 结果数量
+
+    Returns:
+        tuple: (命中总数, 文章ID列表)
+    """
+    maybe_refresh(app)
+    total, hits = _engine.search(query, category_id=category_id, offset=offset, limit=limit)
+    return total, [article_id for article_id, _ in hits]
@@ -0,0 +1,176 @@
+"""
+文章浏览次数缓冲
+Buffered Article View Counts
+
+文章详情页的每次访问不再单独提交一次 UPDATE，而是先累加到进程内缓冲区，
+满足以下任一条件时合并写入（每篇文章一条 view_count = view_count + n）：
+- 缓冲的浏览次数达到 VIEW_COUNT_FLUSH_THRESHOLD
+- 距上次写入超过 VIEW_COUNT_FLUSH_INTERVAL 秒（在下一次记录浏览时检查）
+- 工作进程退出（atexit）或收到 INT/QUIT/ABRT 信号（gunicorn 回调）
+
+因此进程被强制杀死时最多丢失一个写入周期内的浏览次数。
+每个工作进程有独立的缓冲区，页面显示的浏览次数可能比实际值滞后一个写入周期。
+"""
+import atexit
+import threading
+import time
+from sqlalchemy import bindparam
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+
+
+# 可重入锁：gunicorn 信号回调在主线程中执行，可能打断正持有锁的代码
+_lock = threading.RLock()
+_pending = {}
+_pending_total = 0
+_last_flush = time.monotonic()
+_app = None
+_atexit_registered = False
+
+
+def _write_counts(counts):
+    """
+    将浏览次数增量写入数据库
+
+    按文章ID顺序执行，多个进程同时写入时加锁顺序一致，避免死锁。
+
+    Args:
+        counts (dict): 文章ID到浏览次数增量的映射
+    """
+    from sqlalchemy import select
+    from app.models.article import Article
+    from app.models.user_stats import UserStats
+
+    table = Article.__table__
+    statement = table.update().where(table.c.id == bindparam('article_id')).values(
+        view_count=table.c.view_count + bindparam('views'),
+        # 浏览次数变化不是内容修改，保留原更新时间
+        updated_at=table.c.updated_at
+    )
+    # 同时累加到作者的统计汇总
+    stats = UserStats.__table__
+    author = select(table.c.author_id).where(table.c.id == bindparam('article_id')).scalar_subquery()
+    stats_statement = stats.update().where(stats.c.user_id == author).values(
+        view_count=stats.c.view_count + bindparam('views')
+    )
+    params = [{'article_id': article_id, 'views': views} for article_id, views in sorted(counts.items())]
+    with db.engine.begin() as connection:
+        connection.execute(statement, params)
+        connection.execute(stats_statement, params)
+
+
+def record_view(article_id, count=1):
+    """
+    记录文章浏览
+
+    Args:
+        article_id (int): 文章ID
+        count (int): 浏览次数
+    """
+    global _pending_total
+    from flask import current_app
+
+    config = current_app.config
+    if not config.get('VIEW_COUNT_BUFFER', True):
+        # 不缓冲时直接写入，写入失败不影响页面显示（丢失本次浏览）
+        try:
+            _write_counts({article_id: count})
+        except SQLAlchemyError as e:
+            current_app.logger.error(f'Failed to record view for article {article_id}: {e}')
+        return
+
+    with _lock:
+        _pending[article_id] = _pending.get(article_id, 0) + count
+        _pending_total += count
+        due = (_pending_total >= config.get('VIEW_COUNT_FLUSH_THRESHOLD', 100) or
+               time.monotonic() - _last_flush >= config.get('VIEW_COUNT_FLUSH_INTERVAL', 10))
+
+    if due:
+        flush_view_counts()
+
+
+def get_pending_views(article_id):
+    """
+    获取尚未写入数据库的浏览次数
+
+    Args:
+        article_id (int): 文章ID
+
+    Returns:
+        int: 缓冲中的浏览次数
+    """
+    with _lock:
+        return _pending.get(article_id, 0)
+
+
+def get_pending_total():
+    """
+    获取缓冲区中尚未写入数据库的浏览次数总数
+
+    Returns:
+        int: 缓冲的浏览次数
+    """
+    with _lock:
+        return _pending_total
+
+
+def flush_view_counts():
+    """
+    将缓冲的浏览次数写入数据库
+
+    写入失败时增量放回缓冲区，下次重试。
+
+    Returns:
+        int: 写入的文章数量
+    """
+    global _pending, _pending_total, _last_flush
+    from flask import has_app_context, current_app
+
+    with _lock:
+        counts = _pending
+        _pending = {}
+        _pending_total = 0
+        _last_flush = time.monotonic()
+
+    if not counts:
+        return 0
+
+    app = current_app._get_current_object() if has_app_context() else _app
+    if app is None:
+        return 0
+
+    try:
+        with app.app_context():
+            _write_counts(counts)
+    except SQLAlchemyError as e:
+        app.logger.error(f'Failed to flush view counts: {e}')
+        with _lock:
+            for article_id, views in counts.items():
+                _pending[article_id] = _pending.get(article_id, 0) + views
+                _pending_total += views
+        return 0
+
+    return len(counts)
+
+
+def init_view_counter(app):
+    """
+    初始化浏览次数缓冲
+
+    Args:
+        app: Flask应用实例
+    """
+    global _app, _pending, _pending_total, _last_flush, _atexit_registered
+
+    # 同一进程中重新创建应用（如测试）时，先写入属于旧应用的缓冲
+    if _app is not None and _app is not app:
+        flush_view_counts()
+        with _lock:
+            _pending = {}
+            _pending_total = 0
+
+    _app = app
+    _last_flush = time.monotonic()
+    if not _atexit_registered:
+        atexit.register(flush_view_counts)
+        _atexit_registered = True
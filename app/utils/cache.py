@@ -1,26 +1,606 @@
 """
 缓存工具
 Cache Utilities
+
+提供可插拔的缓存后端：
+- MemoryCache: 进程内 LRU 缓存，支持逐条过期时间（TTL）和字节预算
+- RedisCache: 共享缓存，可由任何 Redis 兼容服务提供（多个 gunicorn 工作进程共用）
+- NullCache: 不缓存任何内容（用于禁用缓存）
+
+缓存条目可以附带依赖标签（如 article:42、category:3、article-list）。
+每个标签对应一个版本令牌，失效标签只需替换其令牌，
+读取时发现条目记录的令牌与当前令牌不一致即视为未命中，
+因此失效开销与涉及的标签数成正比，而与缓存大小无关。
+条目记录的应是计算缓存值之前读取的标签版本（get_or_set / set 的 tag_versions 参数），
+这样计算期间提交的修改会使刚写入的条目立即失效，而不会以新版本缓存旧数据。
+注意 MemoryCache 的标签版本只在当前进程内有效，多工作进程部署时
+需要使用共享后端才能跨进程失效，否则其他进程只能依赖过期时间。
 """
+from collections import OrderedDict
 from functools import wraps
 from flask import request
 import hashlib
 import json
+import pickle
+import threading
+import time
+import uuid
+
+
+# 表示缓存未命中的哨兵对象（允许缓存 None 值）
+_MISSING = object()
+
+
+class _TaggedValue:
+    """带依赖标签版本的缓存值"""
+
+    def __init__(self, tag_versions, value):
+        self.tag_versions = tag_versions
+        self.value = value
+
+
+def _new_tag_version():
+    """生成新的标签版本令牌（随机值，避免标签被淘汰后旧条目复活）"""
+    return uuid.uuid4().hex
+
+
+class BaseCache:
+    """
+    缓存后端基类
+
+    子类需实现 _get/_set/_delete/_clear 四个读写方法，
+    以及 _get_tag_versions/_create_tag_versions/_replace_tag_versions
+    三个标签版本方法；命中、未命中、淘汰等统计由基类统一维护。
+    """
+
+    # 所有工作进程和任务进程是否共用同一份缓存（失效对所有进程可见）
+    shared = False
+
+    def __init__(self, default_timeout=300):
+        """
+        初始化缓存后端
+
+        Args:
+            default_timeout (int): 默认过期时间（秒），0表示永不过期
+        """
+        self.default_timeout = default_timeout
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _incr_stat(self, name, amount=1):
+        """线程安全地累加统计计数"""
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def _normalize_timeout(self, timeout):
+        """将None转换为默认过期时间"""
+        if timeout is None:
+            timeout = self.default_timeout
+        return max(int(timeout), 0)
+
+    def get(self, key, default=None):
+        """
+        读取缓存
+
+        Args:
+            key (str): 缓存键
+            default: 未命中时返回的默认值
+
+        Returns:
+            缓存值或默认值
+        """
+        value = self._get(key)
+        if isinstance(value, _TaggedValue):
+            current = self._get_tag_versions(list(value.tag_versions))
+            if current != value.tag_versions:
+                # 依赖的标签已失效
+                self._delete(key)
+                self._incr_stat('invalidations')
+                value = _MISSING
+            else:
+                value = value.value
+        if value is _MISSING:
+            self._incr_stat('misses')
+            return default
+        self._incr_stat('hits')
+        return value
+
+    def set(self, key, value, timeout=None, tags=None, tag_versions=None):
+        """
+        写入缓存
+
+        Args:
+            key (str): 缓存键
+            value: 缓存值（必须可被pickle序列化）
+            timeout (int): 过期时间（秒），None使用默认值，0表示永不过期
+            tags (iterable): 依赖标签，任一标签失效时条目随之失效
+            tag_versions (dict): 计算缓存值之前由 get_tag_versions 读取的标签版本；
+                未提供的标签使用写入时的版本
+
+        Returns:
+            bool: 是否写入成功
+        """
+        if tags:
+            tags = set(tags)
+            versions = {tag: version for tag, version in (tag_versions or {}).items() if tag in tags}
+            missing = tags - set(versions)
+            if missing:
+                versions.update(self._ensure_tag_versions(missing))
+            value = _TaggedValue(versions, value)
+        return self._set(key, value, self._normalize_timeout(timeout))
+
+    def get_or_set(self, key, compute, timeout=None, tags=None, cache_none=True):
+        """
+        读取缓存，未命中时计算并写入
+
+        标签版本在计算之前读取，计算期间标签失效时写入的条目随即失效。
+
+        Args:
+            key (str): 缓存键
+            compute (callable): 计算缓存值的函数（无参数）
+            timeout (int): 过期时间（秒）
+            tags (iterable): 依赖标签
+            cache_none (bool): 计算结果为None时是否写入
+
+        Returns:
+            缓存值或计算结果
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        tag_versions = self.get_tag_versions(*tags) if tags else None
+        value = compute()
+        if value is not None or cache_none:
+            self.set(key, value, timeout, tags=tags, tag_versions=tag_versions)
+        return value
+
+    def invalidate_tags(self, *tags):
+        """
+        使依赖指定标签的所有条目失效
+
+        Args:
+            *tags: 标签列表
+        """
+        if tags:
+            self._replace_tag_versions(set(tags))
+
+    def get_tag_versions(self, *tags):
+        """
+        获取标签当前版本（不存在的标签会被创建）
+
+        进程内保存的数据可以记录加载时的标签版本，之后比对版本判断是否需要重新加载。
+
+        Args:
+            *tags: 标签列表
+
+        Returns:
+            dict: 标签 -> 版本令牌；禁用缓存时为空字典
+        """
+        return self._ensure_tag_versions(set(tags))
+
+    def _ensure_tag_versions(self, tags):
+        """
+        获取标签当前版本，不存在的标签会被创建
+
+        Args:
+            tags (set): 标签集合
+
+        Returns:
+            dict: 标签 -> 版本令牌
+        """
+        versions = self._get_tag_versions(list(tags))
+        missing = [tag for tag in tags if versions.get(tag) is None]
+        if missing:
+            versions.update(self._create_tag_versions(missing))
+        return versions
+
+    def delete(self, key):
+        """
+        删除缓存
+
+        Args:
+            key (str): 缓存键
+
+        Returns:
+            bool: 键是否存在
+        """
+        return self._delete(key)
+
+    def clear(self, key_prefix=None):
+        """
+        清除缓存
+
+        Args:
+            key_prefix (str): 要清除的缓存键前缀，None表示清除所有
+        """
+        self._clear(key_prefix)
+
+    def get_stats(self, local_only=False):
+        """
+        获取缓存统计信息
+
+        Args:
+            local_only (bool): 为True时只返回本进程的统计，不访问缓存服务器
+
+        Returns:
+            dict: 统计信息字典
+        """
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': self.__class__.__name__,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _get_tag_versions(self, tags):
+        raise NotImplementedError
+
+    def _create_tag_versions(self, tags):
+        raise NotImplementedError
+
+    def _replace_tag_versions(self, tags):
+        raise NotImplementedError
+
+    def _set(self, key, value, timeout):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+    def _clear(self, key_prefix):
+        raise NotImplementedError
+
+
+class NullCache(BaseCache):
+    """不做任何缓存的后端（禁用缓存时使用）"""
+
+    def _get(self, key):
+        return _MISSING
+
+    def _set(self, key, value, timeout):
+        return False
+
+    def _delete(self, key):
+        return False
+
+    def _clear(self, key_prefix):
+        pass
+
+    def _get_tag_versions(self, tags):
+        return {}
+
+    def _create_tag_versions(self, tags):
+        return {}
+
+    def _replace_tag_versions(self, tags):
+        pass
+
+
+class MemoryCache(BaseCache):
+    """
+    进程内 LRU 缓存
+
+    - 每个条目独立记录过期时间，读取时惰性清除过期条目
+    - 按最近使用顺序淘汰，同时受条目数和字节预算约束
+    - 值以pickle序列化后存储，字节预算按序列化后的大小计算，
+      且调用方修改返回值不会污染缓存
+    - 标签令牌按引用它的条目计数，最后一个条目移除时一并删除，标签数不会无限增长
+    """
+
+    def __init__(self, default_timeout=300, max_entries=10000, max_bytes=64 * 1024 * 1024, shared=False):
+        """
+        初始化内存缓存
+
+        Args:
+            default_timeout (int): 默认过期时间（秒）
+            max_entries (int): 最大条目数
+            max_bytes (int): 最大字节数
+            shared (bool): 应用只运行在当前进程中，缓存可视为共享
+        """
+        super().__init__(default_timeout)
+        self.shared = shared
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (过期时间, 序列化数据, 依赖标签)
+        self._size = 0
+        self._tags = {}  # 标签 -> 版本令牌
+        self._tag_refs = {}  # 标签 -> 引用该标签的条目数
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _entry_size(key, payload):
+        """估算条目占用的字节数"""
+        return len(key) + len(payload)
+
+    def _remove(self, key):
+        """移除条目并更新字节计数和标签引用（调用方需持有锁）"""
+        expires_at, payload, tags = self._data.pop(key)
+        self._size -= self._entry_size(key, payload)
+        for tag in tags:
+            count = self._tag_refs.get(tag, 0) - 1
+            if count > 0:
+                self._tag_refs[tag] = count
+            else:
+                # 没有条目依赖该标签，丢弃令牌（重新创建的令牌与旧令牌不同，不会使旧数据复活）
+                self._tag_refs.pop(tag, None)
+                self._tags.pop(tag, None)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, payload, tags = entry
+            if expires_at and expires_at <= time.monotonic():
+                self._remove(key)
+                self._incr_stat('expirations')
+                return _MISSING
+            self._data.move_to_end(key)
+        return pickle.loads(payload)
+
+    def _set(self, key, value, timeout):
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        size = self._entry_size(key, payload)
+        if size > self.max_bytes:
+            # 单个条目超过整个预算，不缓存
+            return False
+
+        expires_at = time.monotonic() + timeout if timeout else 0
+        tags = tuple(value.tag_versions) if isinstance(value, _TaggedValue) else ()
+        with self._lock:
+            # 先登记新条目的标签引用，替换旧条目时不会误删共用的标签令牌
+            for tag in tags:
+                self._tag_refs[tag] = self._tag_refs.get(tag, 0) + 1
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (expires_at, payload, tags)
+            self._size += size
+            self._evict()
+        return True
+
+    def _evict(self):
+        """按LRU顺序淘汰条目直到满足容量约束（调用方需持有锁）"""
+        while self._data and (len(self._data) > self.max_entries or self._size > self.max_bytes):
+            oldest_key = next(iter(self._data))
+            self._remove(oldest_key)
+            self._incr_stat('evictions')
+
+    def _delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                return True
+        return False
+
+    def _clear(self, key_prefix):
+        with self._lock:
+            if key_prefix is None:
+                self._data.clear()
+                self._size = 0
+                self._tags.clear()
+                self._tag_refs.clear()
+                return
+            for key in [k for k in self._data if k.startswith(key_prefix)]:
+                self._remove(key)
+
+    def _get_tag_versions(self, tags):
+        with self._lock:
+            return {tag: self._tags.get(tag) for tag in tags}
+
+    def _create_tag_versions(self, tags):
+        with self._lock:
+            return {tag: self._tags.setdefault(tag, _new_tag_version()) for tag in tags}
+
+    def _replace_tag_versions(self, tags):
+        with self._lock:
+            for tag in tags:
+                # 直接移除令牌：旧条目必然失效，下次写入时再创建新令牌
+                self._tags.pop(tag, None)
+
+    def get_stats(self, local_only=False):
+        stats = super().get_stats()
+        with self._lock:
+            stats.update({
+                'entries': len(self._data),
+                'tags': len(self._tags),
+                'bytes': self._size,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+            })
+        return stats
+
+
+class RedisCache(BaseCache):
+    """
+    共享缓存后端
+
+    通过 Redis 协议访问，任何 Redis 兼容的本地服务均可使用。
+    所有工作进程共享同一份缓存，工作进程回收后无需重新预热。
+    """
+
+    shared = True
+
+    def __init__(self, url='redis://localhost:6379/0', key_prefix='blog:', default_timeout=300, client=None):
+        """
+        初始化共享缓存
+
+        Args:
+            url (str): 服务地址
+            key_prefix (str): 所有键的命名空间前缀
+            default_timeout (int): 默认过期时间（秒）
+            client: 已创建的客户端对象（可选）
+        """
+        super().__init__(default_timeout)
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError('使用 RedisCache 需要安装 redis 包: pip install redis')
+            client = redis.Redis.from_url(url)
+        self._client = client
+        self.key_prefix = key_prefix
+
+    def _full_key(self, key):
+        return f'{self.key_prefix}{key}'
+
+    def _tag_key(self, tag):
+        return f'{self.key_prefix}__tag__:{tag}'
+
+    def _get(self, key):
+        payload = self._client.get(self._full_key(key))
+        if payload is None:
+            return _MISSING
+        return pickle.loads(payload)
+
+    def _set(self, key, value, timeout):
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if timeout:
+            return bool(self._client.set(self._full_key(key), payload, ex=timeout))
+        return bool(self._client.set(self._full_key(key), payload))
+
+    def _delete(self, key):
+        return bool(self._client.delete(self._full_key(key)))
+
+    def _clear(self, key_prefix):
+        pattern = self._full_key(key_prefix or '') + '*'
+        batch = []
+        for full_key in self._client.scan_iter(match=pattern, count=500):
+            batch.append(full_key)
+            if len(batch) >= 500:
+                self._client.delete(*batch)
+                batch = []
+        if batch:
+            self._client.delete(*batch)
 
+    def _get_tag_versions(self, tags):
+        if not tags:
+            return {}
+        values = self._client.mget([self._tag_key(tag) for tag in tags])
+        return {
+            tag: value.decode() if isinstance(value, bytes) else value
+            for tag, value in zip(tags, values)
+        }
 
-# 简单的内存缓存（生产环境应使用Redis）
-_cache = {}
+    def _create_tag_versions(self, tags):
+        pipe = self._client.pipeline()
+        for tag in tags:
+            pipe.set(self._tag_key(tag), _new_tag_version(), nx=True)
+        pipe.execute()
+        # 其他工作进程可能同时创建了令牌，以服务端为准
+        return self._get_tag_versions(list(tags))
+
+    def _replace_tag_versions(self, tags):
+        self._client.delete(*[self._tag_key(tag) for tag in tags])
+
+    def get_stats(self, local_only=False):
+        stats = super().get_stats()
+        if local_only:
+            return stats
+        try:
+            info = self._client.info('stats')
+            stats['server_evictions'] = info.get('evicted_keys', 0)
+            stats['server_expirations'] = info.get('expired_keys', 0)
+        except Exception:
+            pass
+        return stats
+
+
+# 当前使用的缓存后端（init_cache 会根据配置替换）
+_backend = MemoryCache()
+
+
+def create_cache_backend(config):
+    """
+    根据配置创建缓存后端
+
+    Args:
+        config: 配置字典
+
+    Returns:
+        BaseCache: 缓存后端实例
+    """
+    cache_type = (config.get('CACHE_TYPE') or 'memory').lower()
+    default_timeout = config.get('CACHE_DEFAULT_TIMEOUT', 300)
+
+    if cache_type == 'null':
+        return NullCache(default_timeout=default_timeout)
+    if cache_type == 'redis':
+        return RedisCache(
+            url=config.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'),
+            key_prefix=config.get('CACHE_KEY_PREFIX', 'blog:'),
+            default_timeout=default_timeout
+        )
+    if cache_type == 'memory':
+        return MemoryCache(
+            default_timeout=default_timeout,
+            max_entries=config.get('CACHE_MAX_ENTRIES', 10000),
+            max_bytes=config.get('CACHE_MAX_BYTES', 64 * 1024 * 1024),
+            shared=config.get('CACHE_SINGLE_PROCESS', False)
+        )
+    raise ValueError(f'未知的缓存类型: {cache_type}')
+
+
+def init_cache(app):
+    """
+    初始化缓存后端
+
+    Args:
+        app: Flask应用实例
+    """
+    global _backend
+    _backend = create_cache_backend(app.config)
+    app.extensions['cache'] = _backend
+    setup_cache_invalidation()
+
+    if app.config.get('PAGE_CACHE_ENABLED') and not _backend.shared:
+        app.logger.warning('PAGE_CACHE_ENABLED requires a shared cache backend (CACHE_TYPE=redis); '
+                           'full-page caching is disabled')
+
+
+def get_cache():
+    """
+    获取当前缓存后端
+
+    Returns:
+        BaseCache: 缓存后端实例
+    """
+    return _backend
+
+
+def get_cache_stats(local_only=False):
+    """
+    获取缓存统计信息
+
+    Args:
+        local_only (bool): 为True时只返回本进程的统计，不访问缓存服务器
+
+    Returns:
+        dict: 统计信息字典
+    """
+    return _backend.get_stats(local_only=local_only)
 
 
 def get_cache_key(prefix, *args, **kwargs):
     """
     生成缓存键
-    
+
     Args:
         prefix: 键前缀
         *args: 位置参数
         **kwargs: 关键字参数
-        
+
     Returns:
         str: 缓存键
     """
@@ -29,19 +609,20 @@ def get_cache_key(prefix, *args, **kwargs):
         'args': args,
         'kwargs': kwargs
     }
-    key_str = json.dumps(key_data, sort_keys=True)
+    key_str = json.dumps(key_data, sort_keys=True, default=str)
     key_hash = hashlib.md5(key_str.encode()).hexdigest()
     return f"{prefix}:{key_hash}"
 
 
-def cache_result(timeout=300, key_prefix='view'):
+def cache_result(timeout=300, key_prefix='view', tags=None):
     """
     缓存函数结果装饰器
-    
+
     Args:
-        timeout: 缓存超时时间（秒）
+        timeout: 缓存超时时间（秒），0表示永不过期
         key_prefix: 缓存键前缀
-        
+        tags: 依赖标签列表，或接收被装饰函数参数并返回标签列表的函数
+
     Returns:
         function: 装饰器函数
     """
@@ -50,20 +631,10 @@ def cache_result(timeout=300, key_prefix='view'):
         def decorated_function(*args, **kwargs):
             # 生成缓存键
             cache_key = get_cache_key(key_prefix, *args, **kwargs)
-            
-            # 检查缓存
-            if cache_key in _cache:
-                cached_data = _cache[cache_key]
-                # 简单的过期检查（生产环境应使用更完善的机制）
-                return cached_data
-            
-            # 执行函数
-            result = f(*args, **kwargs)
-            
-            # 存储到缓存
-            _cache[cache_key] = result
-            
-            return result
+            entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+
+            # 读取缓存，未命中时执行函数并存储结果
+            return _backend.get_or_set(cache_key, lambda: f(*args, **kwargs), timeout, tags=entry_tags)
         return decorated_function
     return decorator
 
@@ -71,26 +642,46 @@ def cache_result(timeout=300, key_prefix='view'):
 def clear_cache(key_prefix=None):
     """
     清除缓存
-    
+
     Args:
         key_prefix: 要清除的缓存键前缀，None表示清除所有
     """
-    global _cache
-    if key_prefix is None:
-        _cache = {}
-    else:
-        keys_to_delete = [k for k in _cache.keys() if k.startswith(key_prefix)]
-        for key in keys_to_delete:
-            del _cache[key]
+    _backend.clear(key_prefix)
+
+
+def invalidate_tags(*tags):
+    """
+    使依赖指定标签的缓存条目失效
+
+    Args:
+        *tags: 标签列表
+    """
+    _backend.invalidate_tags(*tags)
+
+
+def get_tag_versions(*tags):
+    """
+    获取标签当前版本（不存在的标签会被创建）
+
+    Args:
+        *tags: 标签列表
+
+    Returns:
+        dict: 标签 -> 版本令牌
+    """
+    return _backend.get_tag_versions(*tags)
 
 
-def invalidate_cache_on_change(key_prefix):
+def invalidate_cache_on_change(key_prefix=None, tags=None):
     """
     数据变更时清除缓存的装饰器
-    
+
+    优先使用标签失效；按前缀清除需要扫描所有键，仅为兼容保留。
+
     Args:
         key_prefix: 要清除的缓存键前缀
-        
+        tags: 要失效的标签列表
+
     Returns:
         function: 装饰器函数
     """
@@ -98,7 +689,108 @@ def invalidate_cache_on_change(key_prefix):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             result = f(*args, **kwargs)
-            clear_cache(key_prefix)
+            if tags:
+                invalidate_tags(*tags)
+            if key_prefix:
+                clear_cache(key_prefix)
             return result
         return decorated_function
     return decorator
+
+
+def get_attribute_values(obj, name):
+    """
+    获取模型属性在本次变更前后的所有取值
+
+    用于计算失效标签：例如文章更换分类时，新旧分类都需要失效。
+
+    Args:
+        obj: 模型实例
+        name (str): 属性名称
+
+    Returns:
+        set: 非空取值集合
+    """
+    from sqlalchemy import inspect
+
+    history = inspect(obj).attrs[name].history
+    values = set(history.added or ()) | set(history.deleted or ())
+    # 未修改的属性可能尚未加载，直接读取当前值
+    values.add(getattr(obj, name))
+    values.discard(None)
+    return values
+
+
+def has_relevant_changes(obj, ignored=()):
+    """
+    检查模型实例是否有需要失效缓存的变更
+
+    Args:
+        obj: 模型实例
+        ignored: 不影响缓存内容的属性名称
+
+    Returns:
+        bool: 是否有相关变更
+    """
+    from sqlalchemy import inspect
+
+    state = inspect(obj)
+    if state.deleted or state.was_deleted or not state.has_identity:
+        return True
+    if state.session is not None and obj in state.session.deleted:
+        return True
+    for attr in state.mapper.column_attrs:
+        if attr.key in ignored:
+            continue
+        if state.attrs[attr.key].history.has_changes():
+            return True
+    return False
+
+
+def _add_cache_tags(session, objects):
+    """登记对象的缓存标签，等待事务提交后失效"""
+    pending = session.info.setdefault('pending_cache_tags', set())
+    for obj in objects:
+        get_tags = getattr(obj, 'get_cache_tags', None)
+        if get_tags is not None:
+            pending.update(get_tags())
+
+
+def _collect_deleted_cache_tags(session, flush_context, instances):
+    """flush前收集待删除对象的缓存标签（此时行仍存在，属性可正常加载）"""
+    _add_cache_tags(session, list(session.deleted))
+
+
+def _collect_cache_tags(session, flush_context):
+    """flush后收集新增和修改对象的缓存标签（此时新对象已分配主键）"""
+    _add_cache_tags(session, list(session.new) + list(session.dirty))
+
+
+def _invalidate_committed_tags(session):
+    """事务提交后失效收集到的缓存标签"""
+    tags = session.info.pop('pending_cache_tags', None)
+    if tags:
+        invalidate_tags(*tags)
+
+
+def _discard_cache_tags(session):
+    """事务回滚时丢弃收集到的缓存标签"""
+    session.info.pop('pending_cache_tags', None)
+
+
+def setup_cache_invalidation():
+    """
+    注册SQLAlchemy会话事件，实现模型变更后自动失效缓存
+
+    定义了 get_cache_tags() 方法的模型（Article、Comment、Category）
+    在flush时登记标签，事务提交后统一失效，回滚时丢弃。
+    """
+    from sqlalchemy import event
+    from flask_sqlalchemy.session import Session
+
+    if event.contains(Session, 'after_flush', _collect_cache_tags):
+        return
+    event.listen(Session, 'before_flush', _collect_deleted_cache_tags)
+    event.listen(Session, 'after_flush', _collect_cache_tags)
+    event.listen(Session, 'after_commit', _invalidate_committed_tags)
+    event.listen(Session, 'after_rollback', _discard_cache_tags)
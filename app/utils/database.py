@@ -5,6 +5,7 @@ Database Utility Functions
 from app import db
 from sqlalchemy.exc import SQLAlchemyError
 from flask import current_app
+from flask_sqlalchemy.pagination import Pagination
 
 def safe_commit():
     """
@@ -78,4 +79,287 @@ def paginate_query(query, page=1, per_page=10):
         page=page,
         per_page=per_page,
         error_out=False
-    )
\ No newline at end of file
+    )
+
+def encode_cursor(values, backwards=False):
+    """
+    将排序键编码为分页游标
+    
+    Args:
+        values (list): 排序键的值（日期时间以ISO格式保存）
+        backwards (bool): 是否为向前翻页的游标
+        
+    Returns:
+        str: URL安全的游标字符串
+    """
+    import base64
+    import json
+    from datetime import datetime
+    
+    payload = {
+        'k': [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        'd': 'prev' if backwards else 'next'
+    }
+    data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, columns):
+    """
+    解析分页游标
+    
+    Args:
+        cursor (str): 游标字符串
+        columns (tuple): 排序列，用于还原值的类型
+        
+    Returns:
+        tuple: (排序键的值列表, 是否向前翻页)
+        
+    Raises:
+        ValueError: 游标格式无效
+    """
+    import base64
+    import binascii
+    import json
+    from datetime import datetime
+    from sqlalchemy import DateTime
+    
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(data)
+        raw_values = payload['k']
+        backwards = payload.get('d') == 'prev'
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise ValueError(f'Invalid cursor: {cursor!r}') from e
+    
+    if not isinstance(raw_values, list) or len(raw_values) != len(columns):
+        raise ValueError(f'Invalid cursor: {cursor!r}')
+    
+    values = []
+    for column, value in zip(columns, raw_values):
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        values.append(value)
+    return values, backwards
+
+def _count_rows(query):
+    """
+    统计查询结果行数
+
+    查询单个模型时子查询只选择主键列，不在 COUNT 子查询中带上正文等大字段。
+
+    Args:
+        query: SQLAlchemy查询对象
+
+    Returns:
+        int: 行数
+    """
+    from sqlalchemy import inspect
+
+    query = query.order_by(None)
+    descriptions = query.column_descriptions
+    if len(descriptions) == 1 and descriptions[0]['expr'] is descriptions[0]['entity'] is not None:
+        query = query.with_entities(*inspect(descriptions[0]['entity']).primary_key)
+    return query.count()
+
+def get_approximate_total(query, key, tags=None, timeout=300):
+    """
+    获取查询结果的近似总数
+    
+    总数缓存一段时间（并随缓存标签失效），列表翻页时不再每次执行 COUNT(*)。
+    
+    Args:
+        query: SQLAlchemy查询对象
+        key (str): 缓存键
+        tags: 缓存标签
+        timeout (int): 缓存时间（秒）
+        
+    Returns:
+        int: 总数
+    """
+    from app.utils.cache import get_cache
+    
+    return get_cache().get_or_set(f'total:{key}', lambda: _count_rows(query), timeout=timeout, tags=tags)
+
+class KeysetPagination:
+    """
+    键集（游标）分页结果
+    
+    提供与 Pagination 相近的接口（items、total、has_prev、has_next），
+    翻页通过 prev_cursor / next_cursor 进行，不支持跳转到指定页码。
+    total 为缓存的近似值。
+    """
+    
+    def __init__(self, items, per_page, total, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.total = total
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+    
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+    
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+    
+    @property
+    def pages(self):
+        """近似总页数"""
+        if not self.total or not self.per_page:
+            return 0
+        return (self.total + self.per_page - 1) // self.per_page
+    
+    def __iter__(self):
+        return iter(self.items)
+
+def _keyset_condition(columns, values, descending):
+    """构造"排在游标之后"的条件：(a, b) < (x, y) 展开为 a < x OR (a = x AND b < y)"""
+    from sqlalchemy import and_, or_
+    
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        after = column < value if descending else column > value
+        equal = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal, after) if equal else after)
+    return or_(*clauses)
+
+def keyset_paginate(query, columns, cursor=None, per_page=10, descending=True, page=None,
+                    total_key=None, total_tags=None, total_timeout=300):
+    """
+    键集（游标）分页
+    
+    按排序键定位而不是 OFFSET 扫描，任意深度翻页的代价都相同。
+    排序列的组合必须唯一且不为空（通常以主键结尾），例如 (published_at, id)。
+    无效的游标按第一页处理；提供 page 参数时退回 OFFSET 分页，兼容旧的页码链接。
+    
+    Args:
+        query: SQLAlchemy查询对象
+        columns (tuple): 排序列
+        cursor (str): 分页游标
+        per_page (int): 每页数量
+        descending (bool): 是否倒序
+        page (int): 页码（提供时使用 OFFSET 分页）
+        total_key (str): 近似总数的缓存键，为空时不统计总数
+        total_tags: 近似总数的缓存标签
+        total_timeout (int): 近似总数的缓存时间（秒）
+        
+    Returns:
+        KeysetPagination: 分页对象（提供 page 时为 Pagination）
+    """
+    ordering = [column.desc() if descending else column.asc() for column in columns]
+    query = query.order_by(None)
+    if page is not None:
+        return query.order_by(*ordering).paginate(page=page, per_page=per_page, error_out=False)
+    
+    values, backwards = None, False
+    if cursor:
+        try:
+            values, backwards = decode_cursor(cursor, columns)
+        except ValueError:
+            values, backwards = None, False
+    
+    total = None
+    if total_key:
+        total = get_approximate_total(query, total_key, tags=total_tags, timeout=total_timeout)
+    
+    # 向前翻页时反转排序方向取数，再恢复原顺序
+    scan_descending = descending != backwards
+    filtered = query
+    if values is not None:
+        filtered = filtered.filter(_keyset_condition(columns, values, scan_descending))
+    scan_ordering = [column.desc() if scan_descending else column.asc() for column in columns]
+    rows = filtered.order_by(*scan_ordering).limit(per_page + 1).all()
+    
+    has_more = len(rows) > per_page
+    items = rows[:per_page]
+    if backwards:
+        items.reverse()
+    
+    def key_of(item):
+        return [getattr(item, column.key) for column in columns]
+    
+    next_cursor = prev_cursor = None
+    if items:
+        if has_more if not backwards else True:
+            next_cursor = encode_cursor(key_of(items[-1]))
+        if has_more if backwards else values is not None:
+            prev_cursor = encode_cursor(key_of(items[0]), backwards=True)
+    
+    return KeysetPagination(items, per_page, total, next_cursor=next_cursor, prev_cursor=prev_cursor)
+
+def upgrade_schema():
+    """
+    为已有数据表补充模型中新增的列和索引
+    
+    项目不使用迁移框架，db.create_all() 只创建不存在的表；
+    此函数比对模型与数据库结构，补齐缺失的列（需可为空或带有服务端默认值）和索引。
+    多个进程同时启动时可能重复执行，单条语句失败只记录警告。
+    
+    Returns:
+        list: 新增的列，格式为 "表名.列名"
+    """
+    from sqlalchemy import inspect, text
+    from sqlalchemy.schema import CreateColumn
+    
+    engine = db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+    added_columns = []
+    
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if not column.nullable and column.server_default is None:
+                current_app.logger.warning(
+                    f'Cannot add NOT NULL column {table.name}.{column.name} without a server default'
+                )
+                continue
+            
+            column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+            try:
+                with engine.begin() as connection:
+                    connection.execute(text(
+                        f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}'
+                    ))
+                added_columns.append(f'{table.name}.{column.name}')
+                current_app.logger.info(f'Added column {table.name}.{column.name}')
+            except SQLAlchemyError as e:
+                current_app.logger.warning(f'Failed to add column {table.name}.{column.name}: {e}')
+        
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            try:
+                with engine.begin() as connection:
+                    index.create(connection, checkfirst=True)
+                current_app.logger.info(f'Created index {index.name}')
+            except SQLAlchemyError as e:
+                current_app.logger.warning(f'Failed to create index {index.name}: {e}')
+    
+    return added_columns
+
+class ResultPagination(Pagination):
+    """
+    基于已知结果的分页对象
+    
+    用于结果不是由单个查询产生的场景（例如检索引擎先给出命中ID再回表加载），
+    提供与 paginate() 返回值相同的接口，模板无需区分。
+    
+    使用方式:
+        ResultPagination(page=1, per_page=10, items=items, total=total, error_out=False)
+    """
+    
+    def _query_items(self):
+        return list(self._query_args['items'])
+    
+    def _query_count(self):
+        return self._query_args['total']
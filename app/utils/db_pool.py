@@ -0,0 +1,179 @@
+"""
+数据库连接池管理
+Database Connection Pool Management
+
+Flask-SQLAlchemy 3.0 不再读取 SQLALCHEMY_POOL_SIZE 等旧配置项，
+这里根据配置生成 SQLALCHEMY_ENGINE_OPTIONS（在初始化扩展之前调用）：
+- 连接池大小未配置时按每个工作进程的线程数确定（每个请求线程最多占用一个连接，另加一个供后台写入使用）
+- 配置 DB_MAX_CONNECTIONS 时，按 gunicorn 工作进程数分摊，保证所有进程的连接总数不超过数据库上限
+- 启用 pool_pre_ping 和 pool_recycle，避免使用被数据库或代理关闭的连接
+
+fork 出的子进程（gunicorn preload_app）会丢弃从父进程继承的连接，改为建立自己的连接；
+借出连接数达到连接池容量的 SQLALCHEMY_POOL_WARN_RATIO 时记录警告并计入指标。
+"""
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+
+
+# 连接池饱和警告的最小间隔（秒）
+SATURATION_WARNING_INTERVAL = 60
+
+_engines = weakref.WeakSet()
+_fork_hook_registered = False
+_saturation_lock = threading.Lock()
+_saturation_events = 0
+
+
+def get_worker_layout():
+    """
+    获取 gunicorn 工作进程数和每个进程的线程数（与 gunicorn_config.py 使用相同的环境变量和默认值）
+
+    Returns:
+        tuple: (工作进程数, 线程数)
+    """
+    workers = int(os.environ.get('GUNICORN_WORKERS') or multiprocessing.cpu_count() * 2 + 1)
+    threads = int(os.environ.get('GUNICORN_THREADS') or 1)
+    return max(workers, 1), max(threads, 1)
+
+
+def build_engine_options(config):
+    """
+    根据配置生成 SQLALCHEMY_ENGINE_OPTIONS
+
+    SQLite 由 Flask-SQLAlchemy 选择合适的连接池，不设置连接池参数。
+    配置中已有的 SQLALCHEMY_ENGINE_OPTIONS 优先。
+
+    Args:
+        config: 应用配置
+
+    Returns:
+        dict: 引擎参数
+    """
+    explicit = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if (config.get('SQLALCHEMY_DATABASE_URI') or '').startswith('sqlite'):
+        return explicit
+
+    workers, threads = get_worker_layout()
+    pool_size = config.get('SQLALCHEMY_POOL_SIZE') or threads + 1
+    max_overflow = config.get('SQLALCHEMY_MAX_OVERFLOW', 10)
+
+    budget = config.get('DB_MAX_CONNECTIONS')
+    if budget:
+        per_worker = max(budget // workers, 1)
+        pool_size = min(pool_size, per_worker)
+        max_overflow = min(max_overflow, per_worker - pool_size)
+
+    options = {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': config.get('SQLALCHEMY_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('SQLALCHEMY_POOL_RECYCLE', 3600),
+        'pool_pre_ping': config.get('SQLALCHEMY_POOL_PRE_PING', True),
+    }
+    options.update(explicit)
+    return options
+
+
+def get_pool_status(engine):
+    """
+    获取连接池状态
+
+    Args:
+        engine: SQLAlchemy 引擎
+
+    Returns:
+        dict: size / checked_out / overflow / capacity；连接池不支持统计时返回 None
+    """
+    pool = engine.pool
+    if not hasattr(pool, 'checkedout'):
+        return None
+    size = pool.size()
+    return {
+        'size': size,
+        'checked_out': pool.checkedout(),
+        'overflow': max(pool.overflow(), 0),
+        'capacity': size + max(pool._max_overflow, 0),
+    }
+
+
+def get_saturation_events():
+    """
+    获取借出连接时连接池已饱和的次数（当前进程）
+
+    Returns:
+        int: 次数
+    """
+    with _saturation_lock:
+        return _saturation_events
+
+
+def watch_pool(engine, app):
+    """
+    监听连接借出，连接池接近饱和时记录警告
+
+    Args:
+        engine: SQLAlchemy 引擎
+        app: Flask应用实例
+    """
+    from sqlalchemy import event
+
+    ratio = app.config.get('SQLALCHEMY_POOL_WARN_RATIO', 0.9)
+    last_warning = [0.0]
+
+    @event.listens_for(engine, 'checkout')
+    def _check_saturation(dbapi_connection, connection_record, connection_proxy):
+        global _saturation_events
+        status = get_pool_status(engine)
+        if status is None or status['checked_out'] < status['capacity'] * ratio:
+            return
+        with _saturation_lock:
+            _saturation_events += 1
+            now = time.monotonic()
+            if now - last_warning[0] < SATURATION_WARNING_INTERVAL:
+                return
+            last_warning[0] = now
+        app.logger.warning(
+            f"Database pool near saturation: {status['checked_out']}/{status['capacity']} connections "
+            f"checked out (pool_size={status['size']}, overflow={status['overflow']}, pid={os.getpid()})"
+        )
+
+
+def track_engine(engine, app):
+    """
+    登记引擎：fork 后重置连接池，并监听连接池饱和
+
+    Args:
+        engine: SQLAlchemy 引擎
+        app: Flask应用实例
+    """
+    _engines.add(engine)
+    watch_pool(engine, app)
+
+
+def _reset_pools_after_fork():
+    """子进程中丢弃从父进程继承的连接（不关闭，父进程仍在使用）"""
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+def init_engine_pool(app):
+    """
+    在应用初始化数据库扩展之后调用：登记引擎以便 fork 后重置，并监听连接池饱和
+
+    Args:
+        app: Flask应用实例
+    """
+    global _fork_hook_registered
+    from app import db
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        track_engine(engine, app)
+
+    if not _fork_hook_registered and hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_reset_pools_after_fork)
+        _fork_hook_registered = True
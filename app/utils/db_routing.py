@@ -0,0 +1,155 @@
+"""
+只读副本路由
+Read-Replica Routing
+
+配置 SQLALCHEMY_REPLICA_URIS 后，为每个副本创建引擎（名为 replica_<n>，连接池参数与主库相同）。
+副本不注册为 Flask-SQLAlchemy 绑定，因此 create_all / drop_all 不会访问副本，启动时副本不可用也不影响。
+用 read_from_replica 装饰的只读页面中，普通 SELECT 发往副本，其余语句（写入、
+SELECT ... FOR UPDATE、原生SQL、flush）始终发往主库：
+- 同一请求只使用一个副本，保证页面内读取的一致性
+- 读己之写：请求中发生写入后，本请求剩余的读取以及该会话此后 REPLICA_STICKY_SECONDS 秒内的请求都读主库
+- 故障回退：副本连接失败时记录警告，REPLICA_RETRY_SECONDS 秒内不再使用该副本，读取回退到主库；
+  每个副本最多每 REPLICA_HEALTH_CHECK_INTERVAL 秒检测一次连接
+
+副本的复制延迟不在这里处理，依赖读己之写的粘滞时间覆盖。
+"""
+import random
+import threading
+import time
+from functools import wraps
+from flask import g, session, has_request_context, current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import Select, CompoundSelect
+
+
+REPLICA_PREFIX = 'replica_'
+
+# 副本状态（按数据库URL记录）
+_lock = threading.Lock()
+_down_until = {}
+_checked_at = {}
+
+
+def _mark_down(key, engine, error):
+    retry = current_app.config.get('REPLICA_RETRY_SECONDS', 30)
+    with _lock:
+        _down_until[engine.url] = time.monotonic() + retry
+        _checked_at.pop(engine.url, None)
+    current_app.logger.warning(f'Read replica {key} unavailable, using primary for {retry}s: {error}')
+
+
+def _is_available(key, engine):
+    """副本是否可用：已标记故障时不可用，超过检测间隔时重新检测连接"""
+    now = time.monotonic()
+    with _lock:
+        if _down_until.get(engine.url, 0) > now:
+            return False
+        checked = _checked_at.get(engine.url)
+    if checked is not None and now - checked < current_app.config.get('REPLICA_HEALTH_CHECK_INTERVAL', 10):
+        return True
+    try:
+        with engine.connect():
+            pass
+    except SQLAlchemyError as e:
+        _mark_down(key, engine, e)
+        return False
+    with _lock:
+        _checked_at[engine.url] = now
+        _down_until.pop(engine.url, None)
+    return True
+
+
+def _pick_replica(engines):
+    """随机选择一个可用副本，没有可用副本时返回 None"""
+    keys = list(engines)
+    random.shuffle(keys)
+    for key in keys:
+        if _is_available(key, engines[key]):
+            return engines[key]
+    return None
+
+
+def _is_plain_select(clause):
+    return isinstance(clause, (Select, CompoundSelect)) and clause._for_update_arg is None
+
+
+class RoutingSession(Session):
+    """在只读请求中把普通 SELECT 路由到副本的会话"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and _is_plain_select(clause)
+                and has_request_context() and g.get('db_read_only') and not g.get('db_wrote')):
+            if 'db_replica' not in g:
+                g.db_replica = _pick_replica(current_app.extensions.get('db_replicas') or {})
+            if g.db_replica is not None:
+                return g.db_replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _record_write(session_, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+def read_from_replica(f):
+    """
+    只读视图装饰器：视图中的普通查询发往只读副本
+
+    会话最近写入过（读己之写粘滞期内）时仍读主库。
+
+    Args:
+        f: 被装饰的函数
+
+    Returns:
+        装饰后的函数
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if current_app.config.get('SQLALCHEMY_REPLICA_URIS'):
+            g.db_read_only = session.get('db_primary_until', 0) <= time.time()
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def init_replica_routing(app):
+    """
+    初始化副本路由：创建副本引擎，设置读己之写粘滞期，副本连接断开时标记故障
+
+    Args:
+        app: Flask应用实例
+    """
+    from sqlalchemy import create_engine
+    from app.utils.db_pool import track_engine
+
+    uris = app.config.get('SQLALCHEMY_REPLICA_URIS') or []
+    if not uris:
+        return
+
+    options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    replicas = {}
+    for index, uri in enumerate(uris):
+        key = f'{REPLICA_PREFIX}{index}'
+        engine = replicas[key] = create_engine(uri, **options)
+        track_engine(engine, app)
+
+        @event.listens_for(engine, 'handle_error')
+        def _replica_error(context, key=key, engine=engine):
+            if context.is_disconnect and has_request_context():
+                _mark_down(key, engine, context.original_exception)
+    app.extensions['db_replicas'] = replicas
+
+    @app.before_request
+    def reset_replica_routing():
+        """每个请求重新选择副本（应用上下文可能跨请求复用）"""
+        for name in ('db_read_only', 'db_wrote', 'db_replica'):
+            g.pop(name, None)
+
+    @app.after_request
+    def stick_to_primary(response):
+        """请求中发生写入后，该会话在粘滞期内读主库"""
+        if g.get('db_wrote'):
+            session['db_primary_until'] = time.time() + app.config.get('REPLICA_STICKY_SECONDS', 5)
+        return response
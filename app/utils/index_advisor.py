@@ -0,0 +1,159 @@
+"""
+索引检查工具
+Index Advisor
+
+用 EXPLAIN 重放应用中热点查询的形态（与路由和模型方法构造的查询一致），
+报告没有命中索引的全表扫描和需要额外排序的查询：
+
+- SQLite: EXPLAIN QUERY PLAN，"SCAN 表名" 为全表扫描，"USE TEMP B-TREE" 为额外排序/分组
+- MySQL: EXPLAIN，type=ALL 为全表扫描，Extra 中的 Using filesort / Using temporary 为额外排序/临时表
+
+执行计划取决于当前数据库的统计信息，应在数据量接近生产的库上运行：
+    flask indexes advise
+"""
+from datetime import datetime
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from app import db
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN 语句（参数绑定与原语句相同）"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    prefix = 'EXPLAIN QUERY PLAN ' if compiler.dialect.name == 'sqlite' else 'EXPLAIN '
+    return prefix + compiler.process(element.statement, **kw)
+
+
+def get_query_shapes():
+    """
+    获取需要检查的查询形态
+
+    参数取代表性的值，只影响执行计划中的常量，不影响索引选择。
+
+    Returns:
+        list: (名称, 语句) 列表
+    """
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import joinedload
+    from app.models.article import Article
+    from app.models.comment import Comment
+    from app.models.job import Job
+    from app.utils.database import _keyset_condition
+    from app.utils.performance import optimize_article_query
+
+    now = datetime.utcnow()
+    published = optimize_article_query(Article.query.filter_by(status='published'))
+    thread = Comment.query.options(joinedload(Comment.author)).filter_by(article_id=1, status='approved')
+    page = 11  # 每页数量 + 1（keyset_paginate 多取一行判断是否还有下一页）
+
+    shapes = [
+        ('article.list', published.order_by(Article.published_at.desc(), Article.id.desc()).limit(page)),
+        ('article.list (cursor)', published.filter(
+            _keyset_condition((Article.published_at, Article.id), (now, 1000), True)
+        ).order_by(Article.published_at.desc(), Article.id.desc()).limit(page)),
+        ('article.list (category)', published.filter_by(category_id=1)
+            .order_by(Article.published_at.desc(), Article.id.desc()).limit(page)),
+        ('category_registry.counts', select(Article.category_id, func.count())
+            .where(Article.category_id.in_([1, 2, 3]), Article.status == 'published')
+            .group_by(Article.category_id)),
+        ('article.my_articles', optimize_article_query(Article.query.filter_by(author_id=1))
+            .order_by(Article.created_at.desc(), Article.id.desc()).limit(page)),
+        ('admin.manage_articles (status)', optimize_article_query(Article.query.filter_by(status='draft'))
+            .order_by(Article.created_at.desc(), Article.id.desc()).limit(page)),
+        ('comment.tree', thread.order_by(Comment.created_at.asc(), Comment.id.asc())),
+        ('comment.thread_roots', thread.filter(Comment.parent_id.is_(None))
+            .order_by(Comment.id.asc()).limit(21)),
+        ('comment.thread_replies', thread.filter(
+            Comment.parent_id.isnot(None), Comment.path > '0000000001', Comment.path < '0000000009'
+        ).order_by(Comment.path.asc())),
+        ('comment.replies', Comment.query.filter_by(parent_id=1, status='approved')
+            .order_by(Comment.created_at.asc())),
+        ('comment.my_comments', Comment.get_user_comments(1)
+            .order_by(None).order_by(Comment.created_at.desc(), Comment.id.desc()).limit(21)),
+        ('admin.manage_comments (pending)', Comment.query.filter_by(status='pending')
+            .order_by(Comment.created_at.desc(), Comment.id.desc()).limit(21)),
+        ('jobs.claim_next', select(Job.id).where(Job.status == 'queued', Job.run_at <= now)
+            .order_by(Job.run_at, Job.id).limit(1)),
+    ]
+    return [(name, getattr(query, 'statement', query)) for name, query in shapes]
+
+
+def _sqlite_plan(rows, tables):
+    """解析 SQLite 执行计划，返回 (计划行, 问题列表)"""
+    plan, issues = [], []
+    for row in rows:
+        detail = row[-1]
+        plan.append(detail)
+        words = detail.split()
+        if words[0] == 'SCAN' and len(words) > 1 and words[1] in tables and 'USING' not in words:
+            issues.append(f'full scan: {words[1]}')
+        elif detail.startswith('USE TEMP B-TREE'):
+            issues.append('filesort: ' + detail[len('USE TEMP B-TREE FOR '):])
+    return plan, issues
+
+
+def _mysql_plan(rows, tables):
+    """解析 MySQL 执行计划，返回 (计划行, 问题列表)"""
+    plan, issues = [], []
+    for row in rows:
+        row = row._mapping
+        table, extra = row.get('table'), row.get('Extra') or ''
+        plan.append(f"{table}: type={row.get('type')} key={row.get('key')} rows={row.get('rows')} {extra}".strip())
+        if row.get('type') == 'ALL' and table in tables:
+            issues.append(f'full scan: {table}')
+        if 'Using filesort' in extra:
+            issues.append(f'filesort: {table}')
+        if 'Using temporary' in extra:
+            issues.append(f'temporary table: {table}')
+    return plan, issues
+
+
+def explain(statement):
+    """
+    获取语句的执行计划并检查问题
+
+    Args:
+        statement: SQLAlchemy 查询语句
+
+    Returns:
+        tuple: (计划行列表, 问题列表)
+
+    Raises:
+        NotImplementedError: 数据库类型不支持
+    """
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        parse = _sqlite_plan
+    elif dialect in ('mysql', 'mariadb'):
+        parse = _mysql_plan
+    else:
+        raise NotImplementedError(f'Unsupported database for EXPLAIN: {dialect}')
+
+    rows = db.session.execute(Explain(statement)).all()
+    return parse(rows, set(db.metadata.tables))
+
+
+def advise():
+    """
+    检查所有查询形态的执行计划
+
+    Returns:
+        list: 每个查询形态的检查结果字典（name、sql、plan、issues）
+    """
+    results = []
+    for name, statement in get_query_shapes():
+        plan, issues = explain(statement)
+        results.append({
+            'name': name,
+            'sql': str(statement.compile(dialect=db.engine.dialect)),
+            'plan': plan,
+            'issues': issues
+        })
+    return results
@@ -0,0 +1,434 @@
+"""
+Prometheus 指标导出
+Prometheus-Style Metrics Exporter
+
+/metrics 以 Prometheus 文本格式输出：
+- blog_http_requests_total / blog_http_request_duration_seconds：按端点统计的请求数和延迟直方图
+- blog_http_requests_in_flight：正在处理的请求数
+- blog_db_pool_*：SQLAlchemy 连接池大小、容量、已借出连接数、溢出连接数和饱和次数
+- blog_cache_*：缓存命中、未命中、淘汰次数和命中率
+- blog_view_count_pending：尚未写入数据库的缓冲浏览次数
+
+多进程汇总：配置 METRICS_DIR 后，每个工作进程把指标值写入该目录下以进程号命名的
+内存映射文件（计数器/直方图一个文件，仪表值一个文件），任一工作进程响应抓取时读取
+目录中的全部文件合并输出。计数器保留已退出进程的值，仪表值只统计存活进程。
+未配置 METRICS_DIR 时只输出当前进程的指标。连接池、缓存和浏览次数缓冲等进程状态只读取本进程的
+数据（不访问 Redis），每个工作进程在请求结束时最多每 METRICS_SNAPSHOT_INTERVAL 秒写入一次，
+响应抓取的进程在输出前再写入一次。
+
+访问控制：配置 METRICS_TOKEN 时抓取请求需要携带 Bearer 令牌；未配置时只接受直接来自
+本机或内网地址、且未经反向代理转发（不带 X-Forwarded-For / X-Real-IP）的请求。
+"""
+import glob
+import ipaddress
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from flask import g, request, current_app, Response, abort
+
+
+# 请求延迟直方图的桶上限（秒）
+REQUEST_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 指标名称 -> (类型, 说明)
+METRICS = {
+    'blog_http_requests_total': ('counter', 'HTTP requests by endpoint, method and status'),
+    'blog_http_request_duration_seconds': ('histogram', 'HTTP request latency by endpoint'),
+    'blog_http_requests_in_flight': ('gauge', 'HTTP requests currently being processed'),
+    'blog_db_pool_size': ('gauge', 'Configured size of the database connection pool'),
+    'blog_db_pool_checked_out': ('gauge', 'Database connections currently checked out'),
+    'blog_db_pool_overflow': ('gauge', 'Database connections opened beyond the pool size'),
+    'blog_db_pool_capacity': ('gauge', 'Maximum database connections (pool size plus max overflow)'),
+    'blog_db_pool_saturated_total': ('counter', 'Connection checkouts made while the pool was near saturation'),
+    'blog_cache_hits_total': ('counter', 'Cache lookups that returned a value'),
+    'blog_cache_misses_total': ('counter', 'Cache lookups that missed'),
+    'blog_cache_evictions_total': ('counter', 'Cache entries evicted to stay within limits'),
+    'blog_cache_hit_ratio': ('gauge', 'Cache hits divided by lookups across all workers'),
+    'blog_view_count_pending': ('gauge', 'Article views buffered but not yet written'),
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_lock = threading.Lock()
+_stores = {}
+_pid = None
+_last_snapshot = 0.0
+
+
+class MmapValues:
+    """
+    内存映射文件中的 键 -> 浮点数 映射
+
+    文件头8字节记录已使用长度；每个条目依次为键长度（4字节）、键（UTF-8，补齐到8字节边界）
+    和值（8字节双精度浮点数）。只由所属进程写入：新条目写完后才更新已使用长度，
+    因此其他进程随时读取都能得到完整的条目。
+    """
+
+    INITIAL_SIZE = 64 * 1024
+
+    def __init__(self, path):
+        self._path = path
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size < self.INITIAL_SIZE:
+            self._file.truncate(self.INITIAL_SIZE)
+        self._capacity = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), self._capacity)
+        self._used = struct.unpack_from('i', self._mmap, 0)[0] or 8
+        self._offsets = {key: offset for key, _, offset in _read_entries(self._mmap, self._used)}
+
+    def _grow(self, needed):
+        while self._capacity < needed:
+            self._capacity *= 2
+        self._mmap.close()
+        self._file.truncate(self._capacity)
+        self._mmap = mmap.mmap(self._file.fileno(), self._capacity)
+
+    def _offset(self, key):
+        offset = self._offsets.get(key)
+        if offset is None:
+            encoded = key.encode('utf-8')
+            padding = (8 - (4 + len(encoded)) % 8) % 8
+            entry = struct.pack(f'i{len(encoded)}s{padding}xd', len(encoded), encoded, 0.0)
+            if self._used + len(entry) > self._capacity:
+                self._grow(self._used + len(entry))
+            self._mmap[self._used:self._used + len(entry)] = entry
+            offset = self._used + len(entry) - 8
+            self._used += len(entry)
+            struct.pack_into('i', self._mmap, 0, self._used)
+            self._offsets[key] = offset
+        return offset
+
+    def get(self, key):
+        offset = self._offsets.get(key)
+        return struct.unpack_from('d', self._mmap, offset)[0] if offset is not None else 0.0
+
+    def set(self, key, value):
+        struct.pack_into('d', self._mmap, self._offset(key), value)
+
+    def inc(self, key, amount=1.0):
+        offset = self._offset(key)
+        struct.pack_into('d', self._mmap, offset, struct.unpack_from('d', self._mmap, offset)[0] + amount)
+
+    def items(self):
+        return [(key, self.get(key)) for key in self._offsets]
+
+
+class DictValues:
+    """进程内的 键 -> 浮点数 映射（未配置 METRICS_DIR 时使用）"""
+
+    def __init__(self):
+        self._values = {}
+
+    def get(self, key):
+        return self._values.get(key, 0.0)
+
+    def set(self, key, value):
+        self._values[key] = value
+
+    def inc(self, key, amount=1.0):
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def items(self):
+        return list(self._values.items())
+
+
+def _read_entries(buffer, used):
+    """解析内存映射文件中的条目，返回 (键, 值, 值偏移) 列表"""
+    entries = []
+    position = 8
+    while position < used:
+        length = struct.unpack_from('i', buffer, position)[0]
+        key = bytes(buffer[position + 4:position + 4 + length]).decode('utf-8')
+        position += 4 + length
+        position += (8 - position % 8) % 8
+        entries.append((key, struct.unpack_from('d', buffer, position)[0], position))
+        position += 8
+    return entries
+
+
+def _read_file(path):
+    """读取其他进程的指标文件"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < 8:
+        return []
+    used = struct.unpack_from('i', data, 0)[0]
+    return [(key, value) for key, value, _ in _read_entries(data, min(used, len(data)))]
+
+
+def _get_directory():
+    from flask import has_app_context
+
+    if has_app_context():
+        return current_app.config.get('METRICS_DIR')
+    return os.environ.get('METRICS_DIR')
+
+
+def _store(kind):
+    """
+    获取当前进程的指标存储（fork 后的子进程自动改用自己的文件）
+
+    Args:
+        kind (str): counter（计数器和直方图）或 gauge（仪表值）
+    """
+    global _pid
+    pid = os.getpid()
+    if _pid != pid:
+        _stores.clear()
+        _pid = pid
+    store = _stores.get(kind)
+    if store is None:
+        directory = _get_directory()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            store = MmapValues(os.path.join(directory, f'{kind}_{pid}.db'))
+        else:
+            store = DictValues()
+        _stores[kind] = store
+    return store
+
+
+def _key(name, labels=None):
+    return json.dumps([name, sorted((labels or {}).items())], ensure_ascii=False, separators=(',', ':'))
+
+
+def inc_counter(name, labels=None, amount=1):
+    """累加计数器"""
+    with _lock:
+        _store('counter').inc(_key(name, labels), amount)
+
+
+def set_counter(name, labels=None, value=0):
+    """设置当前进程的计数器累计值（用于导出进程内已有的累计统计）"""
+    with _lock:
+        _store('counter').set(_key(name, labels), value)
+
+
+def set_gauge(name, labels=None, value=0):
+    """设置当前进程的仪表值"""
+    with _lock:
+        _store('gauge').set(_key(name, labels), value)
+
+
+def inc_gauge(name, labels=None, amount=1):
+    """增减当前进程的仪表值"""
+    with _lock:
+        _store('gauge').inc(_key(name, labels), amount)
+
+
+def observe(name, value, labels=None, buckets=REQUEST_DURATION_BUCKETS):
+    """
+    记录直方图观测值
+
+    Args:
+        name (str): 指标名称
+        value (float): 观测值
+        labels (dict): 标签
+        buckets (tuple): 桶上限
+    """
+    bound = next((str(b) for b in buckets if value <= b), '+Inf')
+    with _lock:
+        store = _store('counter')
+        store.inc(_key(f'{name}_bucket', dict(labels or {}, le=bound)))
+        store.inc(_key(f'{name}_sum', labels), value)
+        store.inc(_key(f'{name}_count', labels))
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def mark_process_dead(pid, directory=None):
+    """
+    删除已退出工作进程的仪表值文件（gunicorn child_exit 回调中调用）
+
+    Args:
+        pid (int): 进程号
+        directory (str): 指标目录
+    """
+    directory = directory or os.environ.get('METRICS_DIR')
+    if directory:
+        path = os.path.join(directory, f'gauge_{pid}.db')
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _collect_values():
+    """合并所有进程的指标值，返回 {(名称, 标签元组): 值}"""
+    directory = _get_directory()
+    values = {}
+
+    def merge(entries):
+        for key, value in entries:
+            name, labels = json.loads(key)
+            item = (name, tuple(tuple(label) for label in labels))
+            values[item] = values.get(item, 0.0) + value
+
+    if directory:
+        for path in glob.glob(os.path.join(directory, '*.db')):
+            kind, _, pid = os.path.basename(path)[:-3].partition('_')
+            if kind == 'gauge' and pid.isdigit() and not _pid_alive(int(pid)):
+                continue
+            merge(_read_file(path))
+    else:
+        with _lock:
+            for store in _stores.values():
+                merge(store.items())
+    return values
+
+
+def _format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = ('{}="{}"'.format(
+        name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    ) for name, value in labels)
+    return '{' + ','.join(escaped) + '}'
+
+
+def generate_metrics():
+    """
+    生成 Prometheus 文本格式的指标
+
+    Returns:
+        str: 指标文本
+    """
+    values = _collect_values()
+
+    hits = sum(v for (name, _), v in values.items() if name == 'blog_cache_hits_total')
+    misses = sum(v for (name, _), v in values.items() if name == 'blog_cache_misses_total')
+    values[('blog_cache_hit_ratio', ())] = hits / (hits + misses) if hits + misses else 0.0
+
+    lines = []
+    for family, (kind, description) in METRICS.items():
+        lines.append(f'# HELP {family} {description}')
+        lines.append(f'# TYPE {family} {kind}')
+        if kind == 'histogram':
+            lines.extend(_format_histogram(family, values))
+            continue
+        for (name, labels), value in sorted(values.items()):
+            if name == family:
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _format_histogram(family, values):
+    """输出直方图（按桶上限累加为 Prometheus 的累积桶）"""
+    series = {}
+    for (name, labels), value in values.items():
+        if name == f'{family}_bucket':
+            base = tuple(label for label in labels if label[0] != 'le')
+            le = dict(labels)['le']
+            series.setdefault(base, {})[le] = value
+    lines = []
+    for base in sorted(series):
+        cumulative = 0.0
+        for bound in [str(b) for b in REQUEST_DURATION_BUCKETS] + ['+Inf']:
+            cumulative += series[base].get(bound, 0.0)
+            lines.append(f'{family}_bucket{_format_labels(base + (("le", bound),))} {_format_value(cumulative)}')
+        lines.append(f'{family}_sum{_format_labels(base)} {_format_value(values.get((f"{family}_sum", base), 0.0))}')
+        lines.append(f'{family}_count{_format_labels(base)} {_format_value(values.get((f"{family}_count", base), 0.0))}')
+    return lines
+
+
+def _snapshot_process_state():
+    """把当前进程的连接池、缓存和浏览次数缓冲状态写入指标（只读取本进程内的数据）"""
+    from app import db
+    from app.utils.cache import get_cache_stats
+    from app.utils.db_pool import get_pool_status, get_saturation_events
+    from app.services.view_counter import get_pending_total
+
+    pool = get_pool_status(db.engine)
+    if pool is not None:
+        set_gauge('blog_db_pool_size', value=pool['size'])
+        set_gauge('blog_db_pool_checked_out', value=pool['checked_out'])
+        set_gauge('blog_db_pool_overflow', value=pool['overflow'])
+        set_gauge('blog_db_pool_capacity', value=pool['capacity'])
+    set_counter('blog_db_pool_saturated_total', value=get_saturation_events())
+
+    stats = get_cache_stats(local_only=True)
+    set_counter('blog_cache_hits_total', value=stats['hits'])
+    set_counter('blog_cache_misses_total', value=stats['misses'])
+    set_counter('blog_cache_evictions_total', value=stats['evictions'])
+
+    set_gauge('blog_view_count_pending', value=get_pending_total())
+
+
+def _is_internal_request():
+    """请求是否直接来自本机或内网地址（经反向代理转发的外部请求带有转发头）"""
+    if request.headers.get('X-Forwarded-For') or request.headers.get('X-Real-IP'):
+        return False
+    try:
+        address = ipaddress.ip_address(request.remote_addr or '')
+    except ValueError:
+        return False
+    return address.is_loopback or address.is_private
+
+
+def metrics_view():
+    """/metrics 端点（配置 METRICS_TOKEN 时需要 Bearer 令牌，否则只允许内部访问）"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            abort(403)
+    elif not _is_internal_request():
+        abort(403)
+    _snapshot_process_state()
+    return Response(generate_metrics(), content_type=CONTENT_TYPE)
+
+
+def init_metrics(app):
+    """
+    初始化指标采集并注册 /metrics 端点
+
+    Args:
+        app: Flask应用实例
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+
+    @app.before_request
+    def start_request_metrics():
+        """请求开始时计入正在处理的请求"""
+        g.metrics_start = time.perf_counter()
+        inc_gauge('blog_http_requests_in_flight')
+
+    @app.after_request
+    def record_request_metrics(response):
+        """请求结束时记录请求数和延迟，并按间隔更新进程状态"""
+        global _last_snapshot
+        start = g.get('metrics_start')
+        if start is not None:
+            endpoint = request.endpoint or 'unmatched'
+            inc_counter('blog_http_requests_total', {
+                'endpoint': endpoint, 'method': request.method, 'status': str(response.status_code)
+            })
+            observe('blog_http_request_duration_seconds', time.perf_counter() - start, {'endpoint': endpoint})
+            now = time.monotonic()
+            if now - _last_snapshot >= app.config.get('METRICS_SNAPSHOT_INTERVAL', 1):
+                _last_snapshot = now
+                _snapshot_process_state()
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc=None):
+        """请求结束（包括异常）时减去正在处理的请求"""
+        if g.pop('metrics_start', None) is not None:
+            inc_gauge('blog_http_requests_in_flight', amount=-1)
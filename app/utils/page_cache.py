@@ -0,0 +1,156 @@
+"""
+匿名访问整页缓存
+Full-Page Response Cache for Anonymous Readers
+
+匿名读者访问首页、文章列表和文章详情时，直接返回缓存的渲染结果：
+- 缓存键为请求路径加查询参数，只对未登录、没有待显示闪现消息的 GET/HEAD 请求生效
+- 响应带强 ETag（页面内容的哈希）和 Last-Modified（视图通过 set_last_modified 报告的内容修改时间）
+- 命中缓存时按 If-None-Match / If-Modified-Since 直接返回 304，不执行视图也不渲染模板
+- 缓存条目带有缓存标签，文章、评论、分类提交后随标签失效（见 app/utils/cache.py），
+  视图可以用 add_page_tags 补充只有加载数据后才知道的标签（如作者、分类）
+
+只在共享缓存后端上启用：进程内缓存的标签失效只对提交修改的进程可见，
+其他工作进程会在过期前继续返回旧页面。
+渲染过程中修改了会话（例如生成CSRF令牌）或设置了Cookie的响应不会被缓存。
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+from flask import request, session, g, current_app, make_response
+from flask_login import current_user
+
+
+def set_last_modified(*timestamps):
+    """
+    报告页面内容的修改时间，cached_page 取其中最大值作为 Last-Modified
+
+    Args:
+        *timestamps: 修改时间（None 会被忽略）
+    """
+    values = [timestamp for timestamp in timestamps if timestamp is not None]
+    if not values:
+        return
+    latest = max(values)
+    current = g.get('page_last_modified')
+    g.page_last_modified = latest if current is None else max(current, latest)
+
+
+def add_page_tags(*tags):
+    """
+    为当前页面补充缓存标签（在读取这些标签对应的数据之前调用）
+
+    Args:
+        *tags: 标签列表
+    """
+    if not g.get('page_cache_active'):
+        return
+    from app.utils.cache import get_cache
+
+    versions = get_cache().get_tag_versions(*tags)
+    g.page_tag_versions = dict(g.get('page_tag_versions') or {}, **versions)
+
+
+def is_page_cacheable():
+    """
+    当前请求的响应是否会写入整页缓存
+
+    页面中随每次访问变化的内容（如浏览次数）在可缓存时不应渲染。
+
+    Returns:
+        bool: 是否可缓存
+    """
+    return bool(g.get('page_cache_active'))
+
+
+def _is_cacheable_request():
+    """只缓存匿名读者的 GET/HEAD 请求；有待显示的闪现消息时页面内容因人而异"""
+    from app.utils.cache import get_cache
+
+    return (
+        current_app.config.get('PAGE_CACHE_ENABLED', False)
+        and get_cache().shared
+        and request.method in ('GET', 'HEAD')
+        and not current_user.is_authenticated
+        and '_flashes' not in session
+    )
+
+
+def _page_cache_key():
+    """缓存键：请求路径加排序后的查询参数"""
+    from app.utils.cache import get_cache_key
+
+    return get_cache_key('page', request.path, sorted(request.args.items(multi=True)))
+
+
+def _cached_response(entry):
+    """由缓存条目构造响应，并处理条件请求"""
+    response = make_response(entry['body'], entry['status'])
+    response.content_type = entry['content_type']
+    response.set_etag(entry['etag'])
+    response.last_modified = entry['last_modified']
+    response.headers['X-Page-Cache'] = 'HIT'
+    return response.make_conditional(request)
+
+
+def cached_page(tags=None, timeout=None, on_hit=None):
+    """
+    匿名访问整页缓存装饰器
+
+    Args:
+        tags: 缓存标签，或接收视图参数并返回标签的函数
+        timeout (int): 缓存时间（秒），默认使用 PAGE_CACHE_TIMEOUT
+        on_hit: 命中缓存时调用的函数（接收视图参数），用于保留浏览计数等副作用
+
+    Returns:
+        function: 装饰器函数
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            g.page_cache_active = False
+            if not _is_cacheable_request():
+                return f(*args, **kwargs)
+
+            from app.utils.cache import get_cache
+
+            cache = get_cache()
+            key = _page_cache_key()
+            entry = cache.get(key)
+            if entry is not None:
+                if on_hit is not None:
+                    on_hit(*args, **kwargs)
+                return _cached_response(entry)
+
+            # 在渲染之前读取标签版本，渲染期间提交的修改会使写入的条目失效
+            cache_tags = tags(*args, **kwargs) if callable(tags) else tags
+            tag_versions = cache.get_tag_versions(*cache_tags) if cache_tags else {}
+            g.page_cache_active = True
+            g.page_tag_versions = {}
+            g.page_last_modified = None
+            try:
+                response = make_response(f(*args, **kwargs))
+            finally:
+                g.page_cache_active = False
+            tag_versions.update(g.page_tag_versions)
+            cache_tags = set(cache_tags or ()) | set(tag_versions)
+            if (response.status_code != 200 or response.direct_passthrough
+                    or session.modified or 'Set-Cookie' in response.headers):
+                return response
+
+            body = response.get_data()
+            entry = {
+                'body': body,
+                'status': response.status_code,
+                'content_type': response.content_type,
+                'etag': hashlib.sha256(body).hexdigest(),
+                'last_modified': g.get('page_last_modified') or datetime.utcnow(),
+            }
+            cache.set(key, entry, timeout=timeout or current_app.config.get('PAGE_CACHE_TIMEOUT', 300),
+                      tags=cache_tags, tag_versions=tag_versions)
+
+            response.set_etag(entry['etag'])
+            response.last_modified = entry['last_modified']
+            response.headers['X-Page-Cache'] = 'MISS'
+            return response.make_conditional(request)
+        return decorated_function
+    return decorator
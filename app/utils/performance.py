@@ -111,6 +111,14 @@ def setup_performance_monitoring(app):
     Args:
         app: Flask应用实例
     """
+    # 请求级SQL查询统计（Server-Timing、N+1 检测、端点汇总）
+    from app.utils.profiler import init_query_profiler
+    init_query_profiler(app)
+    
+    # Prometheus 指标（/metrics）
+    from app.utils.metrics import init_metrics
+    init_metrics(app)
+    
     @app.before_request
     def before_request():
         """请求开始时记录时间"""
@@ -169,11 +177,8 @@ def optimize_article_query(query):
     from sqlalchemy.orm import joinedload
     from app.models.article import Article
     
-    # 预加载作者和分类信息
-    query = query.options(
-        joinedload(Article.author),
-        joinedload(Article.category)
-    )
+    # 预加载作者信息（分类名称从分类快照读取，不再连接 categories 表）
+    query = query.options(joinedload(Article.author))
     
     return query
 
@@ -0,0 +1,176 @@
+"""
+登录用户身份缓存
+Logged-in Principal Cache
+
+每个请求的 user_loader 都要加载当前用户，而页面模板、admin_required 和每条评论的
+can_edit / can_delete 又会调用 is_admin()，原先每次都会惰性加载 admin 关系并重新解析权限JSON。
+这里用一条查询（用户 LEFT JOIN 管理员）取出身份相关的字段，解析好的权限集合一并缓存：
+
+- 缓存条目带 principal:{用户ID} 标签，用户或管理员记录变更提交后失效（见 get_cache_tags）
+- 过期时间 PRINCIPAL_CACHE_TIMEOUT 秒，限制进程内缓存在多工作进程部署下的滞后时间
+- 访问身份以外的属性（简介、文章列表、修改密码等）时才按主键加载完整的 User 对象，
+  对这些属性的赋值同样转发给 User，随会话一起提交
+"""
+from flask import current_app
+from flask_login import UserMixin
+from sqlalchemy import select
+from app import db
+
+
+class Principal(UserMixin):
+    """
+    当前登录用户的身份信息
+
+    与 User 对象接口兼容：is_admin()、get_display_name() 等直接使用缓存的字段，
+    其他属性和方法转发给按需加载的 User 对象。
+    """
+    _FIELDS = ('id', 'username', 'nickname', 'is_active', 'role', 'permissions')
+    __slots__ = _FIELDS + ('_user',)
+
+    def __init__(self, id, username, nickname, is_active, role=None, permissions=frozenset()):
+        """
+        初始化身份对象
+
+        Args:
+            id (int): 用户ID
+            username (str): 用户名
+            nickname (str): 昵称
+            is_active (bool): 是否激活
+            role (str): 管理员角色，非管理员为None
+            permissions (frozenset): 已授予的权限，元素为 "模块.操作"
+        """
+        for name, value in zip(self._FIELDS, (id, username, nickname, is_active, role, permissions)):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, '_user', None)
+
+    @property
+    def user(self):
+        """
+        完整的用户对象（首次访问时加载）
+
+        Returns:
+            User: 用户对象
+        """
+        if self._user is None:
+            from app.models.user import User
+            object.__setattr__(self, '_user', db.session.get(User, self.id))
+        return self._user
+
+    def __getattr__(self, name):
+        # 只在常规属性查找失败时调用；私有属性不转发，避免pickle等探测触发数据库查询
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.user, name, value)
+        if name in self._FIELDS:
+            object.__setattr__(self, name, value)
+
+    def is_admin(self):
+        """
+        检查用户是否为管理员
+
+        Returns:
+            bool: 是否为管理员
+        """
+        return self.role is not None
+
+    def is_super_admin(self):
+        """
+        检查用户是否为超级管理员
+
+        Returns:
+            bool: 是否为超级管理员
+        """
+        return self.role == 'super_admin'
+
+    def has_permission(self, module, action):
+        """
+        检查是否有特定管理权限
+
+        Args:
+            module (str): 模块名称
+            action (str): 操作名称
+
+        Returns:
+            bool: 是否有权限
+        """
+        return f'{module}.{action}' in self.permissions
+
+    def get_display_name(self):
+        """
+        获取显示名称
+
+        Returns:
+            str: 昵称或用户名
+        """
+        return self.nickname or self.username
+
+    def __repr__(self):
+        return f'<Principal {self.username}>'
+
+
+def principal_cache_key(user_id):
+    """
+    获取用户身份的缓存键
+
+    Args:
+        user_id (int): 用户ID
+
+    Returns:
+        str: 缓存键
+    """
+    return f'principal:{user_id}'
+
+
+def _query_principal(user_id):
+    """用一条查询加载身份字段，返回可缓存的字典；用户不存在时返回None"""
+    from app.models.admin import Admin
+    from app.models.user import User
+
+    row = db.session.execute(
+        select(User.id, User.username, User.nickname, User.is_active, Admin.role, Admin.permissions)
+        .outerjoin(Admin, Admin.user_id == User.id)
+        .where(User.id == user_id)
+    ).first()
+    if row is None:
+        return None
+
+    permissions = frozenset()
+    if row.role is not None:
+        permissions = frozenset(
+            f'{module}.{action}'
+            for module, actions in Admin.parse_permissions(row.permissions).items()
+            for action, granted in actions.items() if granted
+        )
+    return {
+        'id': row.id,
+        'username': row.username,
+        'nickname': row.nickname,
+        'is_active': row.is_active,
+        'role': row.role,
+        'permissions': permissions
+    }
+
+
+def load_principal(user_id):
+    """
+    加载登录用户的身份（优先读取缓存）
+
+    Args:
+        user_id (int): 用户ID
+
+    Returns:
+        Principal: 身份对象，用户不存在时返回None
+    """
+    from app.utils.cache import get_cache
+
+    key = principal_cache_key(user_id)
+    data = get_cache().get_or_set(
+        key, lambda: _query_principal(user_id), current_app.config.get('PRINCIPAL_CACHE_TIMEOUT', 60),
+        tags=[key], cache_none=False
+    )
+    if data is None:
+        return None
+    return Principal(**data)
@@ -0,0 +1,262 @@
+"""
+请求级SQL查询分析
+Request-Scoped Query Profiler
+
+通过 SQLAlchemy 的 before_cursor_execute / after_cursor_execute 事件统计每个请求的：
+- 查询数量和数据库总耗时，以 Server-Timing 响应头返回（浏览器开发者工具可直接查看）；
+  响应头会暴露查询数量和耗时，只在调试模式或对登录的管理员输出
+- 最慢的若干条语句
+- 疑似 N+1 查询：同一语句形态（参数占位符和 IN 列表归一化后）在一个请求中重复超过阈值时记录警告
+
+同时按端点汇总请求耗时和查询数量的直方图，在管理后台的性能统计页面查看。
+汇总数据保存在进程内，每个工作进程独立统计，进程重启后清零。
+"""
+import heapq
+import re
+import threading
+import time
+from flask import g, request, has_request_context
+
+
+# 请求耗时直方图的桶上限（毫秒），最后一个桶收集超出部分
+DURATION_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# 每请求查询数量直方图的桶上限
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+# 语句文本的最大保存长度
+STATEMENT_MAX_LENGTH = 500
+
+_IN_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_WHITESPACE = re.compile(r'\s+')
+
+_lock = threading.Lock()
+_endpoint_stats = {}
+_listening = False
+
+
+def normalize_statement(statement):
+    """
+    将SQL语句归一化为语句形态：合并空白，IN 列表折叠为单个占位符，字面量替换为占位符
+
+    Args:
+        statement (str): SQL语句
+
+    Returns:
+        str: 语句形态
+    """
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _IN_LIST.sub('(?)', shape)
+    return _LITERAL.sub('?', shape)
+
+
+def _bucket_index(value, bounds):
+    """返回数值所在直方图桶的下标"""
+    for index, bound in enumerate(bounds):
+        if value <= bound:
+            return index
+    return len(bounds)
+
+
+class RequestProfile:
+    """单个请求的查询统计"""
+
+    def __init__(self, slow_limit=5):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes = {}
+        self.slowest = []
+        self._slow_limit = slow_limit
+
+    def record(self, statement, duration):
+        """
+        记录一条已执行的语句
+
+        Args:
+            statement (str): SQL语句
+            duration (float): 执行耗时（秒）
+        """
+        self.count += 1
+        self.db_time += duration
+        shape = normalize_statement(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+        item = (duration, self.count, shape[:STATEMENT_MAX_LENGTH])
+        if len(self.slowest) < self._slow_limit:
+            heapq.heappush(self.slowest, item)
+        elif item > self.slowest[0]:
+            heapq.heapreplace(self.slowest, item)
+
+    def repeated_shapes(self, threshold):
+        """
+        获取重复次数超过阈值的语句形态（疑似 N+1 查询）
+
+        Args:
+            threshold (int): 重复次数阈值
+
+        Returns:
+            list: (语句形态, 次数) 列表，按次数倒序
+        """
+        repeated = [(shape, count) for shape, count in self.shapes.items() if count > threshold]
+        return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+    def server_timing(self, total):
+        """
+        生成 Server-Timing 响应头
+
+        Args:
+            total (float): 请求总耗时（秒）
+
+        Returns:
+            str: 响应头的值
+        """
+        return (f'db;dur={self.db_time * 1000:.1f};desc="{self.count} queries", '
+                f'app;dur={max(total - self.db_time, 0) * 1000:.1f}, '
+                f'total;dur={total * 1000:.1f}')
+
+
+def _empty_stats():
+    return {
+        'requests': 0,
+        'queries': 0,
+        'db_time': 0.0,
+        'total_time': 0.0,
+        'max_queries': 0,
+        'duration_buckets': [0] * (len(DURATION_BUCKETS) + 1),
+        'query_buckets': [0] * (len(QUERY_COUNT_BUCKETS) + 1),
+        'slowest': {},
+        'n_plus_one': {},
+    }
+
+
+def _aggregate(endpoint, profile, total, repeated, slow_limit):
+    """将请求统计合并到端点汇总"""
+    with _lock:
+        stats = _endpoint_stats.setdefault(endpoint, _empty_stats())
+        stats['requests'] += 1
+        stats['queries'] += profile.count
+        stats['db_time'] += profile.db_time
+        stats['total_time'] += total
+        stats['max_queries'] = max(stats['max_queries'], profile.count)
+        stats['duration_buckets'][_bucket_index(total * 1000, DURATION_BUCKETS)] += 1
+        stats['query_buckets'][_bucket_index(profile.count, QUERY_COUNT_BUCKETS)] += 1
+
+        # 每种语句形态保留最大耗时，只保留最慢的若干种
+        slowest = stats['slowest']
+        for duration, _, shape in profile.slowest:
+            if duration > slowest.get(shape, 0):
+                slowest[shape] = duration
+        if len(slowest) > slow_limit:
+            stats['slowest'] = dict(heapq.nlargest(slow_limit, slowest.items(), key=lambda item: item[1]))
+
+        for shape, count in repeated:
+            stats['n_plus_one'][shape] = max(stats['n_plus_one'].get(shape, 0), count)
+
+
+def get_endpoint_stats():
+    """
+    获取按端点汇总的查询统计（当前工作进程）
+
+    Returns:
+        list: 每个端点的统计字典，按数据库总耗时倒序
+    """
+    with _lock:
+        snapshot = []
+        for endpoint, stats in _endpoint_stats.items():
+            requests = stats['requests']
+            snapshot.append({
+                'endpoint': endpoint,
+                'requests': requests,
+                'avg_queries': stats['queries'] / requests,
+                'max_queries': stats['max_queries'],
+                'avg_db_ms': stats['db_time'] * 1000 / requests,
+                'avg_total_ms': stats['total_time'] * 1000 / requests,
+                'db_time': stats['db_time'],
+                'duration_buckets': list(stats['duration_buckets']),
+                'query_buckets': list(stats['query_buckets']),
+                'slowest': sorted(((duration * 1000, shape) for shape, duration in stats['slowest'].items()), reverse=True),
+                'n_plus_one': sorted(stats['n_plus_one'].items(), key=lambda item: item[1], reverse=True),
+            })
+    return sorted(snapshot, key=lambda item: item['db_time'], reverse=True)
+
+
+def reset_endpoint_stats():
+    """清空端点汇总统计"""
+    with _lock:
+        _endpoint_stats.clear()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and g.get('query_profile') is not None:
+        conn.info.setdefault('query_profile_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_profile_start')
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    if has_request_context():
+        profile = g.get('query_profile')
+        if profile is not None:
+            profile.record(statement, duration)
+
+
+def _may_expose_timing(app):
+    """当前请求是否可以输出 Server-Timing（调试模式或登录的管理员）"""
+    from flask_login import current_user
+
+    if app.debug:
+        return True
+    return current_user.is_authenticated and current_user.is_admin()
+
+
+def init_query_profiler(app):
+    """
+    初始化请求级查询分析
+
+    Args:
+        app: Flask应用实例
+    """
+    global _listening
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    if not app.config.get('QUERY_PROFILER_ENABLED', True):
+        return
+
+    # 监听所有引擎（包括之后创建的），只在请求中计时
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listening = True
+
+    @app.before_request
+    def start_query_profile():
+        """请求开始时创建查询统计"""
+        g.query_profile = RequestProfile(slow_limit=app.config.get('QUERY_PROFILER_SLOW_STATEMENTS', 5))
+
+    @app.after_request
+    def finish_query_profile(response):
+        """请求结束时输出 Server-Timing，检查 N+1 查询并汇总到端点统计"""
+        profile = g.pop('query_profile', None)
+        if profile is None:
+            return response
+
+        total = time.perf_counter() - profile.started
+        if _may_expose_timing(app):
+            response.headers['Server-Timing'] = profile.server_timing(total)
+
+        endpoint = request.endpoint or 'unmatched'
+        repeated = profile.repeated_shapes(app.config.get('QUERY_PROFILER_N_PLUS_ONE_THRESHOLD', 10))
+        for shape, count in repeated:
+            app.logger.warning(
+                f'Possible N+1 query: {request.method} {request.path} ({endpoint}) '
+                f'executed {count} times: {shape[:200]}'
+            )
+
+        if endpoint != 'static':
+            _aggregate(endpoint, profile, total, repeated, app.config.get('QUERY_PROFILER_SLOW_STATEMENTS', 5))
+        return response
@@ -25,10 +25,91 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False  # 生产环境不输出SQL语句
-    SQLALCHEMY_POOL_SIZE = 10  # 连接池大小
+    # 连接池配置（由 app/utils/db_pool.py 转换为 SQLALCHEMY_ENGINE_OPTIONS）
+    SQLALCHEMY_POOL_SIZE = int(os.environ.get('SQLALCHEMY_POOL_SIZE') or 0) or None  # 每个工作进程的连接池大小，未设置时为线程数+1
     SQLALCHEMY_POOL_TIMEOUT = 30  # 连接池超时时间
     SQLALCHEMY_POOL_RECYCLE = 3600  # 连接回收时间
-    SQLALCHEMY_MAX_OVERFLOW = 20  # 连接池最大溢出
+    SQLALCHEMY_MAX_OVERFLOW = int(os.environ.get('SQLALCHEMY_MAX_OVERFLOW') or 20)  # 连接池最大溢出
+    SQLALCHEMY_POOL_PRE_PING = True  # 借出连接前检测连接是否可用
+    SQLALCHEMY_POOL_WARN_RATIO = 0.9  # 借出连接数达到容量的该比例时记录警告
+    DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS') or 0) or None  # 所有工作进程的连接总数上限
+    
+    # 只读副本（逗号分隔的数据库URI），只读页面的普通查询发往副本，见 app/utils/db_routing.py
+    SQLALCHEMY_REPLICA_URIS = [uri.strip() for uri in (os.environ.get('DATABASE_REPLICA_URLS') or '').split(',')
+                               if uri.strip()]
+    REPLICA_STICKY_SECONDS = 5  # 写入后该会话读主库的时间（秒）
+    REPLICA_RETRY_SECONDS = 30  # 副本故障后回退到主库的时间（秒）
+    REPLICA_HEALTH_CHECK_INTERVAL = 10  # 副本连接检测间隔（秒）
+    
+    # 缓存配置
+    # memory: 进程内LRU缓存（每个工作进程独立）
+    # redis: 共享缓存（任何Redis兼容服务，所有工作进程共用）
+    # null: 禁用缓存
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'memory'
+    CACHE_DEFAULT_TIMEOUT = int(os.environ.get('CACHE_DEFAULT_TIMEOUT') or 300)  # 默认过期时间（秒）
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES') or 10000)  # 内存缓存最大条目数
+    CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES') or 64 * 1024 * 1024)  # 内存缓存字节预算
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    CACHE_KEY_PREFIX = os.environ.get('CACHE_KEY_PREFIX') or 'blog:'
+    # 应用只运行在单个进程中（flask run、测试）时，进程内缓存也能看到所有失效，可视为共享缓存
+    CACHE_SINGLE_PROCESS = (os.environ.get('CACHE_SINGLE_PROCESS') or 'false').lower() == 'true'
+    
+    # 登录用户身份（用户名、昵称、管理员角色和权限）的缓存时间（秒），用户或权限变更时立即失效
+    PRINCIPAL_CACHE_TIMEOUT = int(os.environ.get('PRINCIPAL_CACHE_TIMEOUT') or 60)
+    
+    # 匿名访问整页缓存（首页、文章列表、文章详情），内容随缓存标签失效，
+    # 列表页上的浏览次数最多滞后 PAGE_CACHE_TIMEOUT 秒，缓存的详情页不显示浏览次数。
+    # 需要共享缓存后端（redis 或 CACHE_SINGLE_PROCESS），否则其他工作进程和任务进程的修改
+    # 无法使本进程的缓存页面失效，此时整页缓存不会启用
+    PAGE_CACHE_ENABLED = (os.environ.get('PAGE_CACHE_ENABLED') or 'false').lower() == 'true'
+    PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT') or 300)  # 缓存时间（秒）
+    
+    # 请求级SQL查询统计（Server-Timing 响应头、N+1 查询警告、管理后台端点统计），默认只在开发环境开启；
+    # Server-Timing 只在调试模式或对登录的管理员输出
+    QUERY_PROFILER_ENABLED = (os.environ.get('QUERY_PROFILER_ENABLED') or 'false').lower() == 'true'
+    QUERY_PROFILER_SLOW_STATEMENTS = 5  # 每个请求/端点保留的最慢语句数量
+    QUERY_PROFILER_N_PLUS_ONE_THRESHOLD = 10  # 同一语句形态在一个请求中重复超过该次数时记录警告
+    
+    # Prometheus 指标导出（/metrics）
+    # METRICS_DIR: 多进程部署时各工作进程共享的指标目录（每次启动前应清空），未设置时只导出当前进程
+    # METRICS_TOKEN: 设置后抓取请求需要携带 Authorization: Bearer <token>；
+    # 未设置时只接受本机或内网直接发起、未经反向代理转发的请求
+    METRICS_ENABLED = (os.environ.get('METRICS_ENABLED') or 'true').lower() == 'true'
+    METRICS_DIR = os.environ.get('METRICS_DIR')
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_SNAPSHOT_INTERVAL = 1  # 各工作进程写入连接池、缓存和浏览次数缓冲状态的最短间隔（秒）
+    
+    # 全文检索配置
+    # auto: 使用数据库全文索引（MySQL FULLTEXT ngram / SQLite FTS5），不可用时退回LIKE
+    # engine: 使用进程内检索引擎（中文二元分词 + BM25，索引文件内存映射加载）
+    # like: 始终使用LIKE匹配
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND') or 'auto'
+    SEARCH_ENGINE_PATH = os.environ.get('SEARCH_ENGINE_PATH') or os.path.join('instance', 'search_index')
+    SEARCH_ENGINE_REFRESH_INTERVAL = 30  # 同步其他工作进程修改的间隔（秒）
+    SEARCH_ENGINE_RECONCILE_INTERVAL = 300  # 后台检测已删除文章的间隔（秒，需读取全部已发布文章ID）
+    SEARCH_ENGINE_MERGE_THRESHOLD = 1000  # 增量段合并阈值（文档数）
+    
+    # 浏览次数缓冲配置（关闭时每次浏览直接写入数据库）
+    VIEW_COUNT_BUFFER = (os.environ.get('VIEW_COUNT_BUFFER') or 'true').lower() == 'true'
+    VIEW_COUNT_FLUSH_INTERVAL = int(os.environ.get('VIEW_COUNT_FLUSH_INTERVAL') or 10)  # 最长写入间隔（秒）
+    VIEW_COUNT_FLUSH_THRESHOLD = int(os.environ.get('VIEW_COUNT_FLUSH_THRESHOLD') or 100)  # 缓冲的浏览次数上限
+    
+    # 进程内分类快照的最长有效期（秒），使用进程内缓存时其他工作进程的分类修改最多滞后这么久
+    CATEGORY_REGISTRY_TIMEOUT = int(os.environ.get('CATEGORY_REGISTRY_TIMEOUT') or 60)
+    
+    # 后台任务队列（jobs 表，由 python worker.py 或 flask jobs work 执行）
+    # 关闭时任务在入队的请求中直接执行，适用于测试和没有部署任务进程的开发环境；
+    # 需要所有进程共用缓存后端（CACHE_TYPE=redis），否则启动时自动关闭
+    JOB_QUEUE_ENABLED = (os.environ.get('JOB_QUEUE_ENABLED') or 'true').lower() == 'true'
+    JOB_POLL_INTERVAL = int(os.environ.get('JOB_POLL_INTERVAL') or 2)  # 队列为空时的轮询间隔（秒）
+    JOB_MAX_ATTEMPTS = 5  # 最大尝试次数
+    JOB_RETRY_BACKOFF = 30  # 首次重试间隔（秒），之后每次翻倍
+    JOB_RETRY_BACKOFF_MAX = 3600  # 最长重试间隔（秒）
+    JOB_LOCK_TIMEOUT = 1800  # 执行超过该时间（秒）的任务视为任务进程已退出，重新排队
+    CACHE_WARM_PATHS = ['/', '/articles']  # cache.warm 任务预热的页面
+    
+    # 删除用户和文章时每批删除的行数
+    DELETION_BATCH_SIZE = int(os.environ.get('DELETION_BATCH_SIZE') or 500)
     
     # 分页配置
     POSTS_PER_PAGE = 10
@@ -52,6 +133,7 @@ class Config:
 class DevelopmentConfig(Config):
     """开发环境配置"""
     DEBUG = True
+    QUERY_PROFILER_ENABLED = (os.environ.get('QUERY_PROFILER_ENABLED') or 'true').lower() == 'true'
     # 使用 SQLite 进行快速开发（如果 MySQL 不可用）
     USE_SQLITE = os.environ.get('USE_SQLITE', 'false').lower() == 'true'
     
@@ -68,7 +150,12 @@ class TestingConfig(Config):
     """测试环境配置"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_REPLICA_URIS = []
+    JOB_QUEUE_ENABLED = False
     WTF_CSRF_ENABLED = False
+    CACHE_SINGLE_PROCESS = True
+    PAGE_CACHE_ENABLED = True
+    QUERY_PROFILER_ENABLED = True
 
 class ProductionConfig(Config):
     """生产环境配置"""
@@ -60,7 +60,8 @@ pidfile = os.getenv('GUNICORN_PID_FILE', '/var/run/blog-system/gunicorn.pid')
 # tmp_upload_dir = '/tmp'
 
 # 预加载应用（可以减少内存使用，但重启时会中断服务）
-preload_app = False
+# 工作进程 fork 后会丢弃继承的数据库连接并重新建立（见 app/utils/db_pool.py），可以安全启用
+preload_app = os.getenv('GUNICORN_PRELOAD_APP', 'false').lower() == 'true'
 
 # 工作进程重启前的最大请求数
 # worker_connections = 1000
@@ -73,6 +74,12 @@ preload_app = False
 def on_starting(server):
     """服务器启动时的回调"""
     print("Gunicorn server is starting...")
+    # 清空上次运行留下的多进程指标文件
+    metrics_dir = os.getenv('METRICS_DIR')
+    if metrics_dir and os.path.isdir(metrics_dir):
+        for name in os.listdir(metrics_dir):
+            if name.endswith('.db'):
+                os.remove(os.path.join(metrics_dir, name))
 
 def on_reload(server):
     """服务器重载时的回调"""
@@ -94,10 +101,27 @@ def pre_exec(server):
     """执行前的回调"""
     print("Forked child, re-executing.")
 
+def _flush_view_counts(worker):
+    """将工作进程缓冲的文章浏览次数写入数据库，限制进程退出时的数据丢失"""
+    try:
+        from app.services.view_counter import flush_view_counts
+        flushed = flush_view_counts()
+        if flushed:
+            print(f"Flushed buffered view counts for {flushed} articles (pid: {worker.pid})")
+    except Exception as e:
+        print(f"Failed to flush view counts (pid: {worker.pid}): {e}")
+
 def worker_int(worker):
     """工作进程接收到 INT 或 QUIT 信号时的回调"""
     print(f"Worker received INT or QUIT signal (pid: {worker.pid})")
+    _flush_view_counts(worker)
+
+def child_exit(server, worker):
+    """工作进程退出后的回调（在主进程中执行）：移除该进程的仪表值指标"""
+    from app.utils.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
 
 def worker_abort(worker):
     """工作进程异常退出时的回调"""
     print(f"Worker received SIGABRT signal (pid: {worker.pid})")
+    _flush_view_counts(worker)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+文章摘要与字数统计基准测试
+Article Summary and Word Count Benchmark
+
+对比保存文章时旧的摘要生成方式（re.sub 去除全部标签后截取）与
+extract_summary / count_words 的耗时：
+    python scripts/benchmark_summary.py
+    python scripts/benchmark_summary.py --size 262144 --repeat 10
+
+旧实现在正文包含未闭合的 "<" 时耗时随长度平方增长，该用例默认只测试 64KB（--unclosed-size）。
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.article import extract_summary, count_words  # noqa: E402
+
+
+def legacy_summary(content, length=200):
+    """旧的摘要生成方式（Article.generate_summary）"""
+    clean_content = re.sub(r'<[^>]+>', '', content)
+    return clean_content[:length] + ('...' if len(clean_content) > length else '')
+
+
+def build_inputs(size, unclosed_size):
+    """
+    生成测试正文
+
+    Args:
+        size (int): 正文长度（字符数）
+        unclosed_size (int): 未闭合 "<" 用例的长度
+
+    Returns:
+        list: (名称, 正文) 列表
+    """
+    def repeat_to(unit, length):
+        return (unit * (length // len(unit) + 1))[:length]
+
+    return [
+        ('markup-heavy', repeat_to('<p><b>加粗</b><a href="/x">链接</a>text</p>', size)),
+        ('plain CJK', repeat_to('全文检索的性能优化', size)),
+        ('plain English', repeat_to('the quick brown fox jumps over ', size)),
+        ('unclosed "<" text', repeat_to('a < b ', unclosed_size)),
+    ]
+
+
+def best_ms(func, content, repeat):
+    """多次执行取最快一次的耗时（毫秒）"""
+    return min(timeit.repeat(lambda: func(content), number=1, repeat=repeat)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文章摘要与字数统计基准测试')
+    parser.add_argument('--size', type=int, default=1024 * 1024, help='正文长度（字符数）')
+    parser.add_argument('--unclosed-size', type=int, default=64 * 1024,
+                        help='未闭合 "<" 用例的长度（旧实现为平方复杂度）')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数')
+    args = parser.parse_args()
+
+    print(f'{"input":<20}{"length":>10}{"legacy summary":>18}{"extract_summary":>18}{"count_words":>14}')
+    for name, content in build_inputs(args.size, args.unclosed_size):
+        legacy = best_ms(legacy_summary, content, args.repeat)
+        current = best_ms(extract_summary, content, args.repeat)
+        words = best_ms(count_words, content, args.repeat)
+        print(f'{name:<20}{len(content):>10}{legacy:>15.2f} ms{current:>15.2f} ms{words:>11.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -55,4 +55,32 @@ class AuthActions:
 @pytest.fixture
 def auth(client):
     """认证操作fixture"""
-    return AuthActions(client)
\ No newline at end of file
+    return AuthActions(client)
+
+class QueryCounter:
+    """SQL查询计数器，统计代码块内执行的SQL语句数量"""
+    def __init__(self, engine):
+        self._engine = engine
+        self.statements = []
+    
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+    
+    @property
+    def count(self):
+        return len(self.statements)
+    
+    def __enter__(self):
+        from sqlalchemy import event
+        self.statements = []
+        event.listen(self._engine, 'before_cursor_execute', self._record)
+        return self
+    
+    def __exit__(self, *exc_info):
+        from sqlalchemy import event
+        event.remove(self._engine, 'before_cursor_execute', self._record)
+
+@pytest.fixture
+def count_queries(app):
+    """SQL查询计数fixture，用法: with count_queries() as counter: ..."""
+    return lambda: QueryCounter(db.engine)
@@ -0,0 +1,80 @@
+"""
+文章摘要与字数统计测试
+Article Summary and Word Count Tests
+"""
+from app import db
+from app.models import User, Article
+from app.models import article as article_module
+
+
+def _create_article(content):
+    """创建已发布的测试文章"""
+    user = User.query.filter_by(username='testuser').first()
+    article = Article(title='统计测试', content=content, author_id=user.id)
+    article.publish()
+    db.session.add(article)
+    db.session.commit()
+    return article
+
+
+def test_stats_recomputed_only_when_content_changes(app, monkeypatch):
+    """测试字数在保存时统计，只有正文变化时才重新统计"""
+    article = _create_article('第一行\n第二行')
+    assert article.word_count == 6
+
+    calls = []
+    original = article_module.count_words
+    monkeypatch.setattr(article_module, 'count_words', lambda content: calls.append(content) or original(content))
+
+    article.title = '新标题'
+    article.archive()
+    db.session.commit()
+    assert calls == []
+
+    article.content = '修改后的正文'
+    db.session.commit()
+    assert calls == ['修改后的正文']
+    assert article.word_count == 6
+
+
+def test_detail_page_outputs_content_unchanged(app, client):
+    """测试详情页原样输出文章正文"""
+    article = _create_article('<p>段落一</p>\n<p>段落二</p>')
+    response = client.get(f'/articles/{article.id}')
+    assert '<p>段落一</p>\n<p>段落二</p>'.encode('utf-8') in response.data
+
+
+def test_summary_and_word_count_extraction():
+    """测试摘要逐段去除标签并在凑满长度后停止，字数按中文字和英文单词统计"""
+    body = '<p>第一段<b>加粗</b></p>' + '<div>' + 'x' * (1024 * 1024) + '</div>'
+    assert article_module.extract_summary(body, length=5) == '第一段加粗...'
+    assert article_module.extract_summary(body, length=8) == '第一段加粗xxx...'
+    assert article_module.extract_summary('<p>短文</p>', length=5) == '短文'
+    assert article_module.extract_summary('a < b <i>c</i>', length=20) == 'a < b c'
+
+    assert article_module.count_words("<p>你好，世界</p> It's a <b>test</b> 2024") == (8, 1)
+    assert article_module.count_words('字' * 2000 + ' word' * 400) == (2400, 7)
+    assert article_module.count_words('') == (0, 1)
+
+
+def test_stats_computed_on_save_and_backfilled(app, runner, client):
+    """测试字数和阅读时间在保存时计算，回填补齐旧文章的统计和空摘要"""
+    article = _create_article('<p>' + '正文' * 500 + '</p>')
+    fresh = _create_article('已统计')
+    assert (article.word_count, article.reading_time) == (1000, 3)
+    assert article.summary == '正文' * 100 + '...'
+    assert '约 3 分钟'.encode('utf-8') in client.get(f'/articles/{article.id}').data
+
+    table = Article.__table__
+    db.session.execute(table.update().where(table.c.id == article.id).values(
+        summary=None, word_count=None, reading_time=None
+    ))
+    db.session.commit()
+    result = runner.invoke(args=['articles', 'backfill-stats'])
+    assert '共 1 篇' in result.output
+    db.session.expire_all()
+    article = db.session.get(Article, article.id)
+    assert (article.word_count, article.reading_time) == (1000, 3)
+    assert article.summary == '正文' * 100 + '...'
+    assert Article.backfill_content_stats(batch_size=1) == 0
+    assert db.session.get(Article, fresh.id).word_count == 3
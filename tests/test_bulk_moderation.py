@@ -0,0 +1,114 @@
+"""
+评论批量审核测试
+Bulk Comment Moderation Tests
+"""
+from datetime import datetime, timedelta
+from app import db
+from app.models import User, Admin, Article, Comment
+
+
+def _setup():
+    """创建管理员、垃圾评论作者和一篇文章"""
+    admin = User.query.filter_by(username='testuser').first()
+    db.session.add(Admin(user_id=admin.id))
+    spammer = User(username='spammer', email='spam@example.com', password='testpass')
+    db.session.add(spammer)
+    article = Article(title='批量审核', content='内容', author_id=admin.id)
+    article.publish()
+    db.session.add(article)
+    db.session.commit()
+    return admin, spammer, article
+
+
+def _comment(article, author, parent=None, status='approved', content='评论'):
+    """创建评论"""
+    comment = Comment(content=content, author_id=author.id, article_id=article.id,
+                      parent_id=parent.id if parent else None, status=status)
+    db.session.add(comment)
+    db.session.commit()
+    return comment
+
+
+def _assert_counters_consistent():
+    """计数列与实际数量一致（重新计算时无需修正任何行）"""
+    assert Comment.reconcile_counters() == {'articles.comment_count': 0, 'comments.reply_count': 0}
+
+
+def test_bulk_moderate_by_filter_keeps_counters(app, count_queries):
+    """测试按筛选条件分批审核和删除，计数与实际一致且语句数与评论数无关"""
+    admin, spammer, article = _setup()
+    root = _comment(article, admin)
+    spam = [_comment(article, spammer, parent=root, content=f'spam {i}') for i in range(7)]
+    _comment(article, admin, parent=spam[0])  # 垃圾评论下的正常回复随之删除
+    assert db.session.get(Comment, root.id).reply_count == 7
+
+    conditions = Comment.moderation_filter(author='spammer')
+    with count_queries() as counter:
+        assert Comment.bulk_moderate('reject', conditions, batch_size=5) == 7
+    # 两批，每批查询、UPDATE、回复数调整各一条语句，外加末尾的空查询
+    assert counter.count <= 2 * 3 + 1
+    db.session.expire_all()
+    assert db.session.get(Comment, root.id).reply_count == 0
+    _assert_counters_consistent()
+
+    assert Comment.bulk_moderate('reject', conditions) == 0  # 已拒绝的评论不再修改
+    assert Comment.bulk_moderate('delete', conditions, batch_size=5) == 8
+    db.session.expire_all()
+    assert db.session.get(Article, article.id).comment_count == 1
+    assert Comment.query.count() == 1
+    _assert_counters_consistent()
+
+
+def test_bulk_delete_selected_parent_and_reply(app):
+    """测试同时选中父评论和其回复时按层级删除，不重复计数"""
+    admin, spammer, article = _setup()
+    root = _comment(article, spammer)
+    reply = _comment(article, spammer, parent=root)
+    _comment(article, spammer, parent=reply)
+    keep = _comment(article, admin)
+
+    conditions = Comment.moderation_filter(ids=[root.id, reply.id])
+    assert Comment.bulk_moderate('delete', conditions) == 3
+    db.session.expire_all()
+    assert [comment.id for comment in Comment.query.all()] == [keep.id]
+    _assert_counters_consistent()
+
+
+def test_moderation_filter_date_range(app):
+    """测试按发表日期筛选"""
+    admin, spammer, article = _setup()
+    old = _comment(article, spammer)
+    old.created_at = datetime.utcnow() - timedelta(days=10)
+    recent = _comment(article, spammer)
+    db.session.commit()
+
+    conditions = Comment.moderation_filter(created_from=datetime.utcnow() - timedelta(days=1))
+    assert [comment.id for comment in Comment.query.filter(*conditions)] == [recent.id]
+
+
+def test_bulk_route_selected_and_filter(app, client, auth):
+    """测试批量审核路由：按勾选的评论和按筛选条件"""
+    admin, spammer, article = _setup()
+    pending = [_comment(article, spammer, status='pending') for _ in range(3)]
+    auth.login()
+
+    response = client.post('/admin/comments/bulk', data={
+        'action': 'approve', 'scope': 'selected', 'status': 'pending',
+        'comment_ids': [pending[0].id, pending[1].id],
+    })
+    assert response.status_code == 302
+    assert 'status=pending' in response.headers['Location']
+    db.session.expire_all()
+    assert [comment.status for comment in pending] == ['approved', 'approved', 'pending']
+
+    response = client.get(f'/admin/comments?author=spammer&article_id={article.id}')
+    assert response.data.count(b'name="comment_ids"') == 3
+
+    # 没有任何筛选条件时拒绝按筛选结果操作
+    client.post('/admin/comments/bulk', data={'action': 'delete', 'scope': 'filter', 'status': 'all'})
+    assert Comment.query.count() == 3
+
+    client.post('/admin/comments/bulk', data={'action': 'delete', 'scope': 'filter', 'author': 'spammer',
+                                              'article_id': str(article.id)})
+    assert Comment.query.count() == 0
+    assert db.session.get(Article, article.id).comment_count == 0
@@ -0,0 +1,219 @@
+"""
+缓存后端测试
+Cache Backend Tests
+"""
+import pytest
+from app.utils import cache as cache_module
+from app.utils.cache import MemoryCache, NullCache, cache_result, clear_cache, get_cache
+
+
+class FakeClock:
+    """可手动推进的时钟"""
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """替换缓存模块使用的单调时钟"""
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, 'monotonic', fake)
+    return fake
+
+
+def test_memory_cache_expires_entries(clock):
+    """测试条目按TTL过期"""
+    backend = MemoryCache(default_timeout=10)
+    backend.set('a', 1)
+    backend.set('b', 2, timeout=0)  # 永不过期
+
+    clock.now += 11
+    assert backend.get('a') is None
+    assert backend.get('b') == 2
+
+    stats = backend.get_stats()
+    assert stats['expirations'] == 1
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+
+
+def test_memory_cache_evicts_least_recently_used(clock):
+    """测试按LRU顺序淘汰"""
+    backend = MemoryCache(max_entries=2)
+    backend.set('a', 1)
+    backend.set('b', 2)
+    backend.get('a')  # a 变为最近使用
+    backend.set('c', 3)
+
+    assert backend.get('b') is None
+    assert backend.get('a') == 1
+    assert backend.get('c') == 3
+    assert backend.get_stats()['evictions'] == 1
+
+
+def test_memory_cache_respects_byte_budget(clock):
+    """测试字节预算"""
+    backend = MemoryCache(max_bytes=2048)
+    for i in range(10):
+        backend.set(f'k{i}', 'x' * 500)
+
+    stats = backend.get_stats()
+    assert stats['bytes'] <= 2048
+    assert stats['evictions'] > 0
+    # 超过整个预算的条目不会被缓存
+    assert backend.set('huge', 'x' * 4096) is False
+
+
+def test_memory_cache_clear_by_prefix(clock):
+    """测试按前缀清除"""
+    backend = MemoryCache()
+    backend.set('view:1', 1)
+    backend.set('view:2', 2)
+    backend.set('other:1', 3)
+
+    backend.clear('view:')
+    assert backend.get('view:1') is None
+    assert backend.get('other:1') == 3
+    assert backend.get_stats()['entries'] == 1
+
+
+def test_null_cache_never_stores():
+    """测试NullCache不缓存"""
+    backend = NullCache()
+    backend.set('a', 1)
+    assert backend.get('a') is None
+
+
+def test_cache_result_honors_timeout(app, clock):
+    """测试cache_result装饰器遵守过期时间"""
+    calls = []
+
+    @cache_result(timeout=5, key_prefix='test')
+    def compute(x):
+        calls.append(x)
+        return x * 2
+
+    assert compute(2) == 4
+    assert compute(2) == 4
+    assert len(calls) == 1
+
+    clock.now += 6
+    assert compute(2) == 4
+    assert len(calls) == 2
+
+    clear_cache('test')
+    assert compute(2) == 4
+    assert len(calls) == 3
+    assert get_cache().get_stats()['hits'] == 1
+
+
+def test_tagged_entries_invalidate_by_tag(clock):
+    """测试按标签失效"""
+    backend = MemoryCache()
+    backend.set('list', [1, 2], tags=['article-list'])
+    backend.set('detail', {'id': 1}, tags=['article:1', 'category:3'])
+    backend.set('other', 'x', tags=['article:2'])
+
+    backend.invalidate_tags('article:1')
+    assert backend.get('detail') is None
+    assert backend.get('list') == [1, 2]
+    assert backend.get('other') == 'x'
+
+    # 重新写入后使用新的标签版本
+    backend.set('detail', {'id': 1}, tags=['article:1'])
+    assert backend.get('detail') == {'id': 1}
+    assert backend.get_stats()['invalidations'] == 1
+
+
+def test_model_commit_invalidates_tags(app, clock):
+    """测试模型提交后自动失效相关标签"""
+    from app import db
+    from app.models.article import Article
+    from app.models.category import Category
+    from app.models.user import User
+
+    user = User.query.filter_by(username='testuser').first()
+    category = Category(name='技术')
+    other_category = Category(name='生活')
+    db.session.add_all([category, other_category])
+    db.session.commit()
+
+    article = Article(title='标题', content='内容', author_id=user.id, category_id=category.id)
+    db.session.add(article)
+    db.session.commit()
+
+    backend = get_cache()
+    backend.set('list', 'cached-list', tags=['article-list'])
+    backend.set('category', 'cached-category', tags=[f'category:{category.id}'])
+    backend.set('detail', 'cached-detail', tags=[f'article:{article.id}'])
+    backend.set('other', 'cached-other', tags=[f'category:{other_category.id}'])
+
+    # 只修改浏览次数不失效缓存
+    article.view_count += 1
+    db.session.commit()
+    assert backend.get('detail') == 'cached-detail'
+
+    # 回滚的修改不失效缓存
+    article.title = '未提交'
+    db.session.flush()
+    db.session.rollback()
+    assert backend.get('detail') == 'cached-detail'
+
+    article.title = '新标题'
+    db.session.commit()
+    assert backend.get('detail') is None
+    assert backend.get('list') is None
+    assert backend.get('category') is None
+    assert backend.get('other') == 'cached-other'
+
+    # 评论变更失效所属文章
+    from app.models.comment import Comment
+    backend.set('detail', 'cached-detail', tags=[f'article:{article.id}'])
+    comment = Comment(content='评论', author_id=user.id, article_id=article.id)
+    db.session.add(comment)
+    db.session.commit()
+    assert backend.get('detail') is None
+
+    # 删除文章失效分类
+    backend.set('category', 'cached-category', tags=[f'category:{category.id}'])
+    db.session.delete(article)
+    db.session.commit()
+    assert backend.get('category') is None
+    assert backend.get('other') == 'cached-other'
+
+
+def test_tag_versions_captured_before_computing(clock):
+    """测试计算期间标签失效时，以计算前的版本写入的条目立即失效"""
+    backend = MemoryCache()
+    versions = backend.get_tag_versions('article:1')
+    backend.invalidate_tags('article:1')  # 计算期间其他请求提交了修改
+    backend.set('page', 'stale', tags=['article:1'], tag_versions=versions)
+    assert backend.get('page') is None
+
+    def compute():
+        backend.invalidate_tags('article:1')
+        return 'stale'
+
+    assert backend.get_or_set('page', compute, tags=['article:1']) == 'stale'
+    assert backend.get('page') is None
+    assert backend.get_or_set('page', lambda: 'fresh', tags=['article:1']) == 'fresh'
+    assert backend.get('page') == 'fresh'
+
+
+def test_memory_cache_prunes_unreferenced_tags(clock):
+    """测试没有条目引用的标签令牌随条目一起移除"""
+    backend = MemoryCache(max_entries=5)
+    for i in range(50):
+        backend.set(f'article:{i}', i, tags=[f'article:{i}', 'article-list'])
+    assert backend.get_stats()['tags'] == 6
+
+    backend.set('article:49', 'new', tags=['article:49'])
+    backend.delete('article:48')
+    assert backend.get('article:49') == 'new'
+    assert backend.get_stats()['tags'] == 5
+
+    backend.clear()
+    assert backend.get_stats()['tags'] == 0
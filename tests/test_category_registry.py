@@ -0,0 +1,93 @@
+"""
+分类注册表测试
+Category Registry Tests
+"""
+from app import db
+from app.models import Article, Category, User
+from app.services.category_registry import get_categories, get_category, get_snapshot
+
+
+def test_registry_reloads_on_category_and_article_changes(app, count_queries):
+    """测试分类增改和文章发布、删除后快照重新加载，版本未变时不查询数据库"""
+    news = Category(name='新闻', slug='news')
+    db.session.add(news)
+    db.session.commit()
+    news_id = news.id
+    assert [entry.name for entry in get_categories()] == ['新闻']
+
+    with count_queries() as counter:
+        assert get_category(news_id).article_count == 0
+    assert counter.count == 0
+
+    news.name = '要闻'
+    db.session.commit()
+    assert get_category(news_id).name == '要闻'
+
+    user = User.query.filter_by(username='testuser').first()
+    article = Article(title='标题', content='内容', author_id=user.id, category_id=news_id)
+    db.session.add(article)
+    db.session.commit()
+    assert get_category(news_id).article_count == 0
+    article.publish()
+    db.session.commit()
+    assert get_category(news_id).article_count == 1
+
+    db.session.delete(article)
+    db.session.commit()
+    assert get_category(news_id).article_count == 0
+    assert get_category(news_id + 1) is None
+
+
+def test_registry_expires_after_timeout(app):
+    """测试快照超过有效期后重新加载（其他工作进程的修改不会使本进程的标签失效）"""
+    snapshot = get_snapshot()
+    assert get_snapshot() is snapshot
+
+    app.config['CATEGORY_REGISTRY_TIMEOUT'] = 0.01
+    snapshot.loaded_at -= 1
+    assert get_snapshot() is not snapshot
+
+
+def test_registry_without_tag_versions_uses_timeout(app, monkeypatch, count_queries):
+    """测试禁用缓存（没有标签版本）时按有效期复用快照，而不是每次读取都重新加载"""
+    from app.utils import cache
+    from app.services.category_registry import reset_registry
+
+    monkeypatch.setattr(cache, '_backend', cache.NullCache())
+    reset_registry()
+    snapshot = get_snapshot()
+    with count_queries() as counter:
+        assert get_snapshot() is snapshot
+    assert counter.count == 0
+
+    snapshot.loaded_at -= app.config['CATEGORY_REGISTRY_TIMEOUT']
+    assert get_snapshot() is not snapshot
+
+    app.config['CATEGORY_REGISTRY_TIMEOUT'] = 0
+    snapshot = get_snapshot()
+    assert get_snapshot() is not snapshot
+
+
+def test_article_pages_read_categories_from_registry(app, client, auth, count_queries):
+    """测试文章列表和表单不再查询 categories 表，分类名称和文章数来自快照"""
+    db.session.add_all([Category(name='技术', slug='tech'), Category(name='生活', slug='life')])
+    db.session.commit()
+    user = User.query.filter_by(username='testuser').first()
+    article = Article(title='文章', content='内容', author_id=user.id, category_id=1)
+    article.publish()
+    db.session.add(article)
+    db.session.commit()
+    auth.login()
+
+    get_snapshot()
+    for url in ('/articles', '/articles?category_id=1', '/articles/create'):
+        with app.app_context(), count_queries() as counter:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert not any('FROM categories' in statement for statement in counter.statements), url
+    assert '技术' in response.get_data(as_text=True)
+
+    response = client.post('/articles/create', data={
+        'title': '新文章', 'content': '内容', 'category_id': 99, 'status': 'draft'
+    })
+    assert '选择的分类不存在' in response.get_data(as_text=True)
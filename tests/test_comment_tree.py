@@ -0,0 +1,146 @@
+"""
+评论树加载测试
+Comment Tree Loader Tests
+"""
+from app import db
+from app.models import User, Article, Comment
+
+
+def _create_article():
+    """创建测试文章"""
+    user = User.query.filter_by(username='testuser').first()
+    article = Article(title='评论树测试', content='内容', author_id=user.id)
+    article.publish()
+    db.session.add(article)
+    db.session.commit()
+    return article
+
+
+def _reply(article, parent=None, status='approved', content='评论'):
+    """创建评论或回复"""
+    comment = Comment(content=content, author_id=article.author_id, article_id=article.id,
+                      parent_id=parent.id if parent else None, status=status)
+    db.session.add(comment)
+    db.session.commit()
+    return comment
+
+
+def _build_thread(article, width):
+    """创建 width 条顶级评论，每条带两层回复"""
+    for _ in range(width):
+        root = _reply(article)
+        child = _reply(article, parent=root)
+        _reply(article, parent=child)
+
+
+def test_comment_tree_loads_in_one_query(app, count_queries):
+    """测试一次查询组装评论树并计算深度"""
+    article = _create_article()
+    root = _reply(article, content='根评论')
+    child = _reply(article, parent=root)
+    grandchild = _reply(article, parent=child)
+    hidden = _reply(article, parent=root, status='pending')
+    _reply(article, parent=hidden)  # 父评论未审核，不出现在树中
+    db.session.expire_all()
+
+    with count_queries() as counter:
+        roots, total = Comment.get_comment_tree(article.id)
+        data = [comment.to_dict(include_replies=True) for comment in roots]
+    assert counter.count == 2  # 评论树 + 文章标题
+
+    assert total == 3
+    assert [c.id for c in roots] == [root.id]
+    assert data[0]['replies'][0]['replies'][0]['id'] == grandchild.id
+    assert data[0]['replies'][0]['replies'][0]['depth'] == 2
+
+
+def test_article_detail_query_count_is_constant(app, client, count_queries):
+    """测试文章详情页的查询数量不随评论数量增长"""
+    article = _create_article()
+    url = f'/articles/{article.id}'
+
+    _build_thread(article, 1)
+    with app.app_context(), count_queries() as few:
+        response = client.get(url)
+    assert response.status_code == 200
+
+    _build_thread(article, 10)
+    with app.app_context(), count_queries() as many:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert response.data.count(b'class="comment-item"') == 33
+
+    assert many.count == few.count, many.statements
+
+
+def test_article_comments_api_returns_nested_tree(app, client):
+    """测试评论API返回完整嵌套的评论树并对顶级评论分页"""
+    article = _create_article()
+    _build_thread(article, 3)
+
+    response = client.get(f'/api/articles/{article.id}/comments?per_page=2')
+    data = response.get_json()
+    assert data['pagination']['total'] == 3
+    assert len(data['comments']) == 2
+    assert len(data['comments'][0]['replies'][0]['replies']) == 1
+
+
+def test_materialized_path_subtree_and_root(app):
+    """测试插入时写入物化路径，子树、深度和根评论基于路径计算"""
+    article = _create_article()
+    root = _reply(article)
+    child = _reply(article, parent=root)
+    grandchild = _reply(article, parent=child)
+    other = _reply(article)
+
+    assert child.path.startswith(root.path) and len(child.path) == 2 * len(root.path)
+    assert grandchild.path.startswith(child.path)
+    assert grandchild.get_depth() == 2
+    assert grandchild.get_thread_root() is root
+    assert [c.id for c in root.get_subtree()] == [child.id, grandchild.id]
+    assert other.get_subtree().all() == []
+
+
+def test_thread_page_loads_replies_of_page_roots(app, client):
+    """测试分页加载的线程只包含当前页顶级评论的回复"""
+    article = _create_article()
+    _build_thread(article, 3)
+
+    data = client.get(f'/api/articles/{article.id}/comments?per_page=2&page=2').get_json()
+    assert len(data['comments']) == 1
+    reply = data['comments'][0]['replies'][0]
+    assert reply['parent_id'] == data['comments'][0]['id']
+    assert reply['replies'][0]['depth'] == 2
+
+
+def test_thread_page_without_paths(app, client):
+    """测试补充物化路径之前，没有路径的回复按 parent_id 组装"""
+    article = _create_article()
+    _build_thread(article, 3)
+    db.session.execute(db.text('UPDATE comments SET path = NULL WHERE parent_id IS NOT NULL'))
+    db.session.commit()
+
+    data = client.get(f'/api/articles/{article.id}/comments?per_page=2&page=2').get_json()
+    assert len(data['comments']) == 1
+    reply = data['comments'][0]['replies'][0]
+    assert reply['parent_id'] == data['comments'][0]['id']
+    assert reply['replies'][0]['depth'] == 2
+
+    from app.services.jobs import enqueue
+    job = enqueue('comments.backfill_paths', dedupe_key='comments.backfill_paths')
+    assert job.get_result() == {'filled': 6}
+
+
+def test_backfill_paths_command(app, runner):
+    """测试分批补充已有评论的物化路径"""
+    article = _create_article()
+    _build_thread(article, 2)
+    expected = {c.id: c.path for c in Comment.query.all()}
+
+    db.session.execute(db.text('UPDATE comments SET path = NULL'))
+    db.session.commit()
+
+    result = runner.invoke(args=['comments', 'backfill-paths', '--batch-size', '2'])
+    assert '共 6 条' in result.output
+    db.session.expire_all()
+    assert {c.id: c.path for c in Comment.query.all()} == expected
@@ -0,0 +1,88 @@
+"""
+评论计数测试
+Comment Counter Tests
+"""
+from app import db
+from app.models import User, Admin, Article, Comment
+from app.utils.database import upgrade_schema
+
+
+def _create_article():
+    """创建测试文章"""
+    user = User.query.filter_by(username='testuser').first()
+    article = Article(title='计数测试', content='内容', author_id=user.id)
+    article.publish()
+    db.session.add(article)
+    db.session.commit()
+    return article
+
+
+def _comment(article, parent=None, status='approved'):
+    """创建评论"""
+    comment = Comment(content='评论', author_id=article.author_id, article_id=article.id,
+                      parent_id=parent.id if parent else None, status=status)
+    db.session.add(comment)
+    db.session.commit()
+    return comment
+
+
+def test_counters_follow_create_moderate_and_delete(app):
+    """测试评论创建、审核和删除时计数在同一事务内更新"""
+    article = _create_article()
+    updated_at = article.updated_at
+    root = _comment(article)
+    reply = _comment(article, parent=root)
+    pending = _comment(article, parent=root, status='pending')
+
+    assert article.get_comment_count() == 3
+    assert root.get_reply_count() == 1
+    assert article.updated_at == updated_at  # 计数变化不视为内容修改
+
+    pending.approve()
+    db.session.commit()
+    assert root.get_reply_count() == 2
+
+    reply.reject()
+    db.session.commit()
+    assert root.get_reply_count() == 1
+
+    # 删除根评论时级联删除回复
+    db.session.delete(root)
+    db.session.commit()
+    assert article.get_comment_count() == 0
+    assert Comment.query.count() == 0
+
+
+def test_admin_delete_route_updates_counters(app, client, auth):
+    """测试管理员删除评论后文章评论数同步减少"""
+    user = User.query.filter_by(username='testuser').first()
+    db.session.add(Admin(user_id=user.id))
+    article = _create_article()
+    root = _comment(article)
+    _comment(article, parent=root)
+    auth.login()
+
+    response = client.post(f'/admin/comments/{root.id}/delete')
+    assert response.status_code == 302
+
+    db.session.expire_all()
+    assert db.session.get(Article, article.id).comment_count == 0
+
+
+def test_reconcile_fixes_drift_and_backfills_new_columns(app, runner):
+    """测试重新计算命令修正计数偏差，升级结构后自动补充列"""
+    article = _create_article()
+    root = _comment(article)
+    _comment(article, parent=root)
+
+    db.session.execute(db.text('UPDATE articles SET comment_count = 7'))
+    db.session.execute(db.text('ALTER TABLE comments DROP COLUMN reply_count'))
+    db.session.commit()
+
+    assert upgrade_schema() == ['comments.reply_count']
+    result = runner.invoke(args=['counters', 'reconcile'])
+    assert 'articles.comment_count: 修正 1 行' in result.output
+
+    db.session.expire_all()
+    assert db.session.get(Article, article.id).comment_count == 2
+    assert db.session.get(Comment, root.id).reply_count == 1
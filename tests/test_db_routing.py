@@ -0,0 +1,91 @@
+"""
+只读副本路由测试
+Read-Replica Routing Tests
+"""
+import logging
+import pytest
+from config import config as config_module
+from config.config import TestingConfig
+from app import create_app, db
+from app.models import User, Article
+
+
+def _create_app(monkeypatch, replica_uri):
+    """创建配置了一个只读副本的测试应用"""
+    replica_config = type('ReplicaTestingConfig', (TestingConfig,), {'SQLALCHEMY_REPLICA_URIS': [replica_uri]})
+    monkeypatch.setitem(config_module.config, 'replica-testing', replica_config)
+    return create_app('replica-testing')
+
+
+def _seed(replica_engine=None):
+    """在主库创建用户和已发布文章，并复制到副本（副本中的标题不同，以区分读取来源）"""
+    user = User(username='testuser', email='test@example.com', password='testpass')
+    db.session.add(user)
+    db.session.flush()
+    article = Article(title='主库中的标题', content='内容', author_id=user.id)
+    article.publish()
+    db.session.add(article)
+    db.session.commit()
+
+    if replica_engine is not None:
+        db.metadata.create_all(replica_engine)
+        with db.engine.connect() as primary, replica_engine.begin() as replica:
+            for table in (User.__table__, Article.__table__):
+                rows = [dict(row._mapping) for row in primary.execute(table.select())]
+                replica.execute(table.insert(), rows)
+            replica.execute(Article.__table__.update().values(title='副本中的标题'))
+    return article
+
+
+def _get(app, client, url):
+    """在新的应用上下文中请求页面，使请求拥有独立的会话（与线上一致）"""
+    with app.app_context():
+        return client.get(url)
+
+
+@pytest.fixture
+def replica_app(monkeypatch, tmp_path):
+    """配置了可用副本的应用"""
+    app = _create_app(monkeypatch, f'sqlite:///{tmp_path}/replica.db')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+def test_read_only_views_use_replica_until_session_writes(replica_app):
+    """测试只读页面读副本，会话写入后在粘滞期内读主库"""
+    client = replica_app.test_client()
+    article = _seed(replica_app.extensions['db_replicas']['replica_0'])
+
+    response = _get(replica_app, client, f'/articles/{article.id}')
+    assert '副本中的标题'.encode('utf-8') in response.data
+
+    client.post('/auth/login', data={'username': 'testuser', 'password': 'testpass'})
+    client.post(f'/articles/{article.id}/comments', data={'content': '刚发表的评论', 'article_id': article.id})
+
+    response = _get(replica_app, client, f'/articles/{article.id}')
+    assert '主库中的标题'.encode('utf-8') in response.data
+    assert '刚发表的评论'.encode('utf-8') in response.data
+
+    with client.session_transaction() as session:
+        session['db_primary_until'] = 0
+    response = _get(replica_app, client, f'/api/articles/{article.id}/comments')
+    assert response.status_code == 200
+    assert response.get_json()['comments'] == []  # 副本中还没有这条评论
+
+
+def test_falls_back_to_primary_when_replica_down(monkeypatch, tmp_path, caplog):
+    """测试副本不可用时读取回退到主库"""
+    app = _create_app(monkeypatch, f'sqlite:///{tmp_path}/missing/replica.db')
+    with app.app_context():
+        db.create_all()
+        article = _seed()
+        client = app.test_client()
+
+        with caplog.at_level(logging.WARNING):
+            response = _get(app, client, f'/articles/{article.id}')
+        assert response.status_code == 200
+        assert '主库中的标题'.encode('utf-8') in response.data
+        assert 'Read replica replica_0 unavailable' in caplog.text
+        db.drop_all()
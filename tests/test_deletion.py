@@ -0,0 +1,117 @@
+"""
+批量删除服务测试
+Bulk Deletion Service Tests
+"""
+from app import db
+from app.models import User, Admin, Article, Comment, Job
+from app.services.deletion import delete_user, delete_articles
+from app.services.jobs import run_worker
+
+
+def _article(author, title='文章'):
+    """创建已发布文章"""
+    article = Article(title=title, content='内容', author_id=author.id)
+    article.publish()
+    db.session.add(article)
+    db.session.commit()
+    return article
+
+
+def _comment(article, author, parent=None):
+    """创建评论"""
+    comment = Comment(content='评论', author_id=author.id, article_id=article.id,
+                      parent_id=parent.id if parent else None)
+    db.session.add(comment)
+    db.session.commit()
+    return comment
+
+
+def _setup():
+    """创建管理员 testuser、待删除的用户和其他用户的文章"""
+    admin = User.query.filter_by(username='testuser').first()
+    db.session.add(Admin(user_id=admin.id))
+    author = User(username='prolific', email='prolific@example.com', password='testpass')
+    db.session.add(author)
+    db.session.commit()
+    return admin, author, _article(admin, '其他人的文章')
+
+
+def test_delete_user_removes_content_in_batches(app):
+    """测试删除用户时分批删除文章、评论和管理员记录，并维护其他文章的评论数"""
+    admin, author, other_article = _setup()
+    db.session.add(Admin(user_id=author.id))
+    for i in range(3):
+        article = _article(author, f'文章{i}')
+        root = _comment(article, admin)
+        _comment(article, author, parent=root)
+    kept = _comment(other_article, admin)
+    spam = _comment(other_article, author, parent=kept)
+    _comment(other_article, admin, parent=spam)  # 回复随被删除的评论一起删除
+    author_id = author.id
+
+    stages = []
+    counts = delete_user(author_id, batch_size=2, progress=lambda stage, counts: stages.append(stage))
+    assert counts == {'comments': 8, 'articles': 3, 'users': 1}
+    assert stages[-1] == 'users' and 'articles' in stages
+
+    db.session.expire_all()
+    assert db.session.get(User, author_id) is None
+    assert Admin.query.filter_by(user_id=author_id).count() == 0
+    assert Article.query.count() == 1
+    assert [comment.id for comment in Comment.query.all()] == [kept.id]
+    assert db.session.get(Article, other_article.id).comment_count == 1
+    assert db.session.get(Comment, kept.id).reply_count == 0
+    assert Comment.reconcile_counters() == {'articles.comment_count': 0, 'comments.reply_count': 0}
+
+
+def test_delete_articles_with_reply_threads(app):
+    """测试删除文章时回复链跨批次删除"""
+    admin, author, other_article = _setup()
+    parent = None
+    for _ in range(5):
+        parent = _comment(other_article, author, parent=parent)
+
+    assert delete_articles([other_article.id], batch_size=2) == {'comments': 5, 'articles': 1, 'users': 0}
+    assert Comment.query.count() == 0
+    assert Article.query.count() == 0
+
+
+def test_admin_delete_routes(app, client, auth):
+    """测试管理员删除文章（队列关闭时直接执行）和删除用户（加入队列，由任务进程执行）"""
+    admin, author, other_article = _setup()
+    article = _article(author)
+    _comment(article, admin)
+    article_id, author_id = other_article.id, author.id
+    auth.login()
+
+    response = client.post(f'/admin/articles/{article_id}/delete')
+    assert response.status_code == 302
+    assert db.session.get(Article, article_id) is None
+
+    app.config['JOB_QUEUE_ENABLED'] = True
+    response = client.post(f'/admin/users/{author_id}/delete', follow_redirects=True)
+    assert '用户 prolific 及其所有相关内容正在后台删除'.encode('utf-8') in response.data
+    job = Job.query.filter_by(type='users.delete').one()
+    assert client.get(f'/admin/jobs/{job.id}').get_json()['status'] == 'queued'
+    assert db.session.get(User, author_id) is not None
+
+    assert run_worker(app, burst=True) == 1
+    db.session.expire_all()
+    status = client.get(f'/admin/jobs/{job.id}').get_json()
+    assert status['status'] == 'finished'
+    assert status['result'] == {'comments': 1, 'articles': 1, 'users': 1}
+    assert status['progress']['stage'] == 'users'
+    assert client.get('/admin/jobs/999').status_code == 404
+
+
+def test_author_deletes_own_article(app, client, auth):
+    """测试作者删除自己的文章时评论随之删除"""
+    admin, author, article = _setup()
+    _comment(article, author)
+    article_id = article.id
+    auth.login()
+
+    response = client.post(f'/articles/{article_id}/delete', data={'article_id': article_id})
+    assert response.status_code == 302
+    assert db.session.get(Article, article_id) is None
+    assert Comment.query.count() == 0
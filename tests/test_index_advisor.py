@@ -0,0 +1,34 @@
+"""
+索引检查工具测试
+Index Advisor Tests
+"""
+from sqlalchemy import text
+from app import db
+from app.utils.index_advisor import advise
+
+
+def test_query_shapes_use_composite_indexes(app):
+    """测试所有热点查询形态都命中索引，没有全表扫描和额外排序"""
+    results = advise()
+    assert {result['name'] for result in results} >= {'article.list', 'comment.tree', 'comment.replies'}
+    assert [(result['name'], result['issues']) for result in results if result['issues']] == []
+
+    plans = {result['name']: ' '.join(result['plan']) for result in results}
+    assert 'ix_articles_status_published_at' in plans['article.list']
+    assert 'ix_comments_article_status_created_at' in plans['comment.tree']
+
+
+def test_advisor_reports_missing_index(app, runner):
+    """测试缺少索引时报告额外排序，--strict 以非零状态码退出"""
+    db.session.execute(text('DROP INDEX ix_comments_author_created_at'))
+    db.session.commit()
+
+    result = runner.invoke(args=['indexes', 'advise', '--strict'])
+    assert result.exit_code == 1
+    assert '!! comment.my_comments' in result.output
+    assert 'filesort: ORDER BY' in result.output
+    assert 'article.list' not in result.output
+
+    result = runner.invoke(args=['indexes', 'advise', '--verbose'])
+    assert result.exit_code == 0
+    assert 'OK article.list' in result.output and 'SEARCH articles USING INDEX' in result.output
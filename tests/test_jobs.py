@@ -0,0 +1,144 @@
+"""
+后台任务队列测试
+Background Job Queue Tests
+"""
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models import Job
+from app.services import jobs
+
+
+@pytest.fixture
+def queue(app):
+    """启用任务队列并注册测试用的任务类型"""
+    app.config['JOB_QUEUE_ENABLED'] = True
+    calls = []
+
+    @jobs.job_handler('test.flaky')
+    def flaky(fail_times=0):
+        calls.append(fail_times)
+        jobs.report_progress(attempt=len(calls))
+        if len(calls) <= fail_times:
+            raise RuntimeError('temporary failure')
+        return {'calls': len(calls)}
+
+    yield calls
+    jobs._handlers.pop('test.flaky', None)
+
+
+def _make_due(job):
+    """把任务的执行时间提前到现在（跳过退避等待）"""
+    job.run_at = datetime.utcnow()
+    db.session.commit()
+
+
+def test_retry_with_backoff_then_fail(app, queue):
+    """测试失败后按指数退避重试，达到最大尝试次数后标记为失败"""
+    app.config['JOB_MAX_ATTEMPTS'] = 2
+    job = jobs.enqueue('test.flaky', {'fail_times': 5})
+    assert job.status == 'queued'
+
+    assert jobs.run_worker(app, burst=True) == 1
+    db.session.expire_all()
+    assert job.status == 'queued' and job.attempts == 1
+    assert 'RuntimeError: temporary failure' in job.last_error
+    assert job.run_at > datetime.utcnow() + timedelta(seconds=25)  # JOB_RETRY_BACKOFF=30
+    assert jobs.retry_delay(3) == 120
+
+    assert jobs.run_worker(app, burst=True) == 0  # 尚未到重试时间
+    _make_due(job)
+    jobs.run_worker(app, burst=True)
+    db.session.expire_all()
+    assert job.status == 'failed' and job.attempts == 2
+    assert job.get_progress() == {'attempt': 2}
+
+
+def test_retry_succeeds_and_dedupe(app, queue):
+    """测试重试成功后记录结果，相同去重键的任务不重复入队"""
+    job = jobs.enqueue('test.flaky', {'fail_times': 1}, dedupe_key='flaky')
+    assert jobs.enqueue('test.flaky', {'fail_times': 1}, dedupe_key='flaky').id == job.id
+
+    jobs.run_worker(app, burst=True)
+    db.session.expire_all()
+    _make_due(job)
+    jobs.run_worker(app, burst=True)
+    db.session.expire_all()
+    assert job.status == 'finished'
+    assert job.get_result() == {'calls': 2}
+    assert job.last_error is None
+    assert jobs.enqueue('test.flaky', dedupe_key='flaky').id != job.id  # 已完成的任务不再占用去重键
+
+
+def test_stale_running_job_is_requeued(app, queue):
+    """测试执行超时的任务（任务进程被杀死）重新排队"""
+    job = jobs.enqueue('test.flaky')
+    assert jobs._claim(job.id, 'dead-worker')
+    job.locked_at = datetime.utcnow() - timedelta(hours=1)
+    db.session.commit()
+
+    assert jobs.claim_next('live-worker') == job.id
+    db.session.expire_all()
+    assert job.status == 'running' and job.locked_by == 'live-worker' and job.attempts == 2
+
+
+def test_inline_execution_when_queue_disabled(app):
+    """测试关闭队列时任务在入队时直接执行，未知任务类型被拒绝"""
+    job = jobs.enqueue('counters.reconcile')
+    assert job.status == 'finished'
+    assert job.get_result() == {'articles.comment_count': 0, 'comments.reply_count': 0}
+
+    with pytest.raises(ValueError):
+        jobs.enqueue('no.such.job')
+
+
+def test_inline_failure_is_final_and_dedupe_skips_unclaimable(app, queue):
+    """测试直接执行失败的任务标记为失败，可以再次入队；排队中和执行超时的任务不阻塞直接执行"""
+    app.config['JOB_QUEUE_ENABLED'] = False
+    failed = jobs.enqueue('test.flaky', {'fail_times': 1}, dedupe_key='flaky')
+    assert failed.status == 'failed' and 'temporary failure' in failed.last_error
+
+    retried = jobs.enqueue('test.flaky', {'fail_times': 1}, dedupe_key='flaky')
+    assert retried.id != failed.id and retried.status == 'finished'
+    assert queue == [1, 1]
+
+    # 队列开启时入队、之后关闭队列：排队中的任务在下次入队时直接执行
+    app.config['JOB_QUEUE_ENABLED'] = True
+    waiting = jobs.enqueue('test.flaky', dedupe_key='waiting')
+    app.config['JOB_QUEUE_ENABLED'] = False
+    assert jobs.enqueue('test.flaky', dedupe_key='waiting').id == waiting.id
+    assert waiting.status == 'finished'
+
+    # 执行超时的任务不再计入去重
+    stale = jobs.enqueue('test.flaky', dedupe_key='stale')
+    stale.status = 'running'
+    stale.locked_at = datetime.utcnow() - timedelta(seconds=app.config.get('JOB_LOCK_TIMEOUT', 1800) + 1)
+    db.session.commit()
+    fresh = jobs.enqueue('test.flaky', dedupe_key='stale')
+    assert fresh.id != stale.id and fresh.status == 'finished'
+
+
+def test_queue_requires_shared_cache(app, queue):
+    """测试缓存后端不在进程间共用时队列自动关闭，inline 任务在队列开启时也直接执行"""
+    from app.utils.cache import get_cache
+
+    job = jobs.enqueue('test.flaky', inline=True)
+    assert job.status == 'finished'
+    assert jobs.enqueue('test.flaky').status == 'queued'
+
+    jobs.init_jobs(app)
+    assert app.config['JOB_QUEUE_ENABLED'] is True
+    get_cache().shared = False
+    jobs.init_jobs(app)
+    assert app.config['JOB_QUEUE_ENABLED'] is False
+
+
+def test_jobs_cli(app, runner):
+    """测试通过命令行入队和执行任务"""
+    app.config['JOB_QUEUE_ENABLED'] = True
+    result = runner.invoke(args=['jobs', 'enqueue', 'counters.reconcile'])
+    assert 'counters.reconcile' in result.output and 'queued' in result.output
+
+    result = runner.invoke(args=['jobs', 'work', '--burst'])
+    assert '共执行 1 个任务' in result.output
+    assert Job.query.one().status == 'finished'
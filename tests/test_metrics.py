@@ -0,0 +1,98 @@
+"""
+Prometheus 指标导出测试
+Metrics Exporter Tests
+"""
+import json
+import os
+from app.utils import metrics
+from app.utils.metrics import MmapValues
+
+
+def _sample(text, line_prefix):
+    """从指标文本中取出指定序列的值"""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+def test_mmap_values_grow_and_are_readable(tmp_path):
+    """测试内存映射存储扩容后仍可被其他进程读取"""
+    path = str(tmp_path / 'counter_1.db')
+    store = MmapValues(path)
+    for i in range(3000):
+        store.inc(f'key-{i}', i)
+    store.inc('key-7', 0.5)
+
+    entries = dict(metrics._read_file(path))
+    assert len(entries) == 3000
+    assert entries['key-7'] == 7.5
+    assert dict(MmapValues(path).items())['key-2999'] == 2999
+
+
+def test_metrics_endpoint_aggregates_worker_files(app, client, tmp_path, monkeypatch):
+    """测试 /metrics 合并目录中所有进程的计数器，并忽略已退出进程的仪表值"""
+    monkeypatch.setattr(metrics, '_stores', {})
+    app.config['METRICS_DIR'] = str(tmp_path)
+
+    # 模拟另一个已退出的工作进程留下的文件
+    dead_pid = 2 ** 22 + 1
+    key = json.dumps(['blog_http_requests_total', [['endpoint', 'main.index'], ['method', 'GET'], ['status', '200']]],
+                     separators=(',', ':'))
+    MmapValues(str(tmp_path / f'counter_{dead_pid}.db')).set(key, 5)
+    MmapValues(str(tmp_path / f'gauge_{dead_pid}.db')).set(
+        json.dumps(['blog_http_requests_in_flight', []], separators=(',', ':')), 3)
+
+    client.get('/')
+    client.get('/')
+    text = client.get('/metrics').get_data(as_text=True)
+
+    index = '{endpoint="main.index",method="GET",status="200"}'
+    assert _sample(text, f'blog_http_requests_total{index}') == 7
+    assert _sample(text, 'blog_http_request_duration_seconds_count{endpoint="main.index"}') == 2
+    assert _sample(text, 'blog_http_request_duration_seconds_bucket{endpoint="main.index",le="+Inf"}') == 2
+    assert _sample(text, 'blog_http_requests_in_flight') == 1  # 只有当前的抓取请求
+    assert _sample(text, 'blog_view_count_pending') == 0
+    assert '# TYPE blog_cache_hit_ratio gauge' in text
+    assert os.path.exists(tmp_path / f'counter_{os.getpid()}.db')
+
+    metrics.mark_process_dead(dead_pid, str(tmp_path))
+    assert not os.path.exists(tmp_path / f'gauge_{dead_pid}.db')
+
+
+def test_metrics_token_required(app, client):
+    """测试配置令牌后抓取需要携带 Bearer 令牌"""
+    app.config['METRICS_TOKEN'] = 'secret'
+    assert client.get('/metrics').status_code == 403
+    response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+
+
+def test_metrics_internal_only_without_token(app, client):
+    """测试未配置令牌时拒绝经反向代理转发或来自外网地址的抓取"""
+    app.config['METRICS_TOKEN'] = None
+    assert client.get('/metrics').status_code == 200
+    assert client.get('/metrics', headers={'X-Forwarded-For': '203.0.113.5'}).status_code == 403
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '8.8.8.8'}).status_code == 403
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '10.0.0.8'}).status_code == 200
+
+
+def test_request_updates_process_state_without_scrape(app, client, tmp_path, monkeypatch):
+    """测试工作进程在请求结束时按间隔写入进程状态，不需要由本进程响应抓取"""
+    monkeypatch.setattr(metrics, '_stores', {})
+    monkeypatch.setattr(metrics, '_last_snapshot', 0.0)
+    app.config['METRICS_DIR'] = str(tmp_path)
+    app.config['METRICS_SNAPSHOT_INTERVAL'] = 3600
+
+    client.get('/')
+    counters = dict(metrics._read_file(str(tmp_path / f'counter_{os.getpid()}.db')))
+    gauges = dict(metrics._read_file(str(tmp_path / f'gauge_{os.getpid()}.db')))
+    assert json.dumps(['blog_cache_misses_total', []], separators=(',', ':')) in counters
+    assert gauges[json.dumps(['blog_view_count_pending', []], separators=(',', ':'))] == 0
+
+    # 间隔内的请求不再写入
+    calls = []
+    monkeypatch.setattr(metrics, '_snapshot_process_state', lambda: calls.append(1))
+    client.get('/')
+    assert calls == []
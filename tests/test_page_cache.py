@@ -0,0 +1,139 @@
+"""
+匿名访问整页缓存测试
+Anonymous Full-Page Cache Tests
+"""
+from app import db
+from app.models import User, Article, Comment
+
+
+def _create_article(title='缓存测试'):
+    """创建已发布的测试文章"""
+    user = User.query.filter_by(username='testuser').first()
+    article = Article(title=title, content='内容', author_id=user.id)
+    article.publish()
+    db.session.add(article)
+    db.session.commit()
+    return article
+
+
+def test_cached_page_served_without_queries(app, client, count_queries):
+    """测试匿名访问命中缓存时不执行查询，条件请求返回304"""
+    app.config['VIEW_COUNT_FLUSH_INTERVAL'] = 3600
+    article = _create_article()
+    url = f'/articles/{article.id}'
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.headers['X-Page-Cache'] == 'MISS'
+    assert first.headers['ETag'] and first.headers['Last-Modified']
+
+    with app.app_context(), count_queries() as counter:
+        second = client.get(url)
+    assert second.headers['X-Page-Cache'] == 'HIT'
+    assert second.data == first.data
+    assert counter.count == 0
+
+    not_modified = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+
+    since = client.get(url, headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert since.status_code == 304
+
+    # 命中缓存的浏览同样计入浏览次数
+    from app.services.view_counter import get_pending_views
+    assert get_pending_views(article.id) == 4
+
+
+def test_cached_page_invalidated_on_change(app, client):
+    """测试文章和评论提交后缓存页面失效"""
+    article = _create_article()
+    url = f'/articles/{article.id}'
+    etag = client.get(url).headers['ETag']
+    assert client.get('/articles').status_code == 200
+
+    user = User.query.filter_by(username='testuser').first()
+    comment = Comment(content='新的评论内容', article_id=article.id, author_id=user.id, status='approved')
+    db.session.add(comment)
+    db.session.commit()
+
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['X-Page-Cache'] == 'MISS'
+    assert '新的评论内容'.encode('utf-8') in response.data
+
+    _create_article('另一篇新文章')
+    response = client.get('/articles')
+    assert response.headers['X-Page-Cache'] == 'MISS'
+    assert '另一篇新文章'.encode('utf-8') in response.data
+
+
+def test_authenticated_pages_not_cached(app, client, auth):
+    """测试登录用户的页面不使用缓存"""
+    article = _create_article()
+    client.get(f'/articles/{article.id}')
+
+    auth.login()
+    response = client.get(f'/articles/{article.id}')
+    assert response.status_code == 200
+    assert 'X-Page-Cache' not in response.headers
+    assert 'ETag' not in response.headers
+
+
+def test_detail_page_invalidated_by_author_and_category(app, client):
+    """测试作者昵称或分类名称修改后详情页缓存失效，缓存页面不显示浏览次数"""
+    from app.models import Category
+
+    category = Category(name='旧分类', slug='old')
+    db.session.add(category)
+    db.session.commit()
+    article = _create_article()
+    article.category_id = category.id
+    db.session.commit()
+    url = f'/articles/{article.id}'
+
+    response = client.get(url)
+    assert response.headers['X-Page-Cache'] == 'MISS'
+    assert b'fa-eye' not in response.data
+    assert client.get(url).headers['X-Page-Cache'] == 'HIT'
+
+    category.name = '新分类'
+    db.session.commit()
+    response = client.get(url)
+    assert response.headers['X-Page-Cache'] == 'MISS'
+    assert '新分类'.encode('utf-8') in response.data
+
+    author = User.query.filter_by(username='testuser').first()
+    author.nickname = '新昵称'
+    db.session.commit()
+    response = client.get(url)
+    assert response.headers['X-Page-Cache'] == 'MISS'
+    assert '新昵称'.encode('utf-8') in response.data
+
+
+def test_page_cache_requires_shared_backend(app, client):
+    """测试缓存后端不在进程间共享时不启用整页缓存"""
+    from app.utils.cache import get_cache
+
+    article = _create_article()
+    get_cache().shared = False
+    response = client.get(f'/articles/{article.id}')
+    assert response.status_code == 200
+    assert 'X-Page-Cache' not in response.headers
+    assert b'fa-eye' in response.data
+
+
+def test_list_pages_invalidated_by_author_nickname(app, client):
+    """测试首页和文章列表的缓存在作者昵称修改后失效"""
+    _create_article()
+    for url in ('/', '/articles'):
+        assert client.get(url).headers['X-Page-Cache'] == 'MISS'
+        assert client.get(url).headers['X-Page-Cache'] == 'HIT'
+
+    author = User.query.filter_by(username='testuser').first()
+    author.nickname = '改名的作者'
+    db.session.commit()
+    for url in ('/', '/articles'):
+        response = client.get(url)
+        assert response.headers['X-Page-Cache'] == 'MISS'
+        assert '改名的作者'.encode('utf-8') in response.data
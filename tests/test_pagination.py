@@ -0,0 +1,88 @@
+"""
+游标分页测试
+Keyset Pagination Tests
+"""
+import re
+from datetime import datetime
+from app import db
+from app.models import User, Article, Comment
+from app.utils.database import keyset_paginate
+
+
+def _create_articles(count, published_at=None):
+    """创建已发布文章，published_at 相同时按ID区分先后"""
+    user = User.query.filter_by(username='testuser').first()
+    articles = []
+    for i in range(count):
+        article = Article(title=f'文章{i}', content='内容', author_id=user.id, status='published',
+                          published_at=published_at or datetime(2024, 1, 1 + i % 3))
+        db.session.add(article)
+        articles.append(article)
+    db.session.commit()
+    return articles
+
+
+def test_keyset_walks_forward_and_back(app):
+    """测试游标分页前后翻页与OFFSET分页顺序一致（排序键存在重复值）"""
+    _create_articles(11)
+    columns = (Article.published_at, Article.id)
+    query = Article.query.filter_by(status='published')
+    expected = [a.id for a in query.order_by(Article.published_at.desc(), Article.id.desc())]
+
+    pages, cursor = [], None
+    while True:
+        page = keyset_paginate(query, columns, cursor=cursor, per_page=4, total_key='test-articles')
+        pages.append([a.id for a in page.items])
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+    assert sum(pages, []) == expected
+    assert [len(p) for p in pages] == [4, 4, 3]
+    assert page.total == 11 and page.pages == 3
+
+    previous = keyset_paginate(query, columns, cursor=page.prev_cursor, per_page=4)
+    assert [a.id for a in previous.items] == pages[1]
+    first = keyset_paginate(query, columns, cursor=previous.prev_cursor, per_page=4)
+    assert [a.id for a in first.items] == pages[0]
+    assert not first.has_prev
+
+    # 无效游标按第一页处理
+    assert [a.id for a in keyset_paginate(query, columns, cursor='invalid!', per_page=4).items] == pages[0]
+
+
+def test_article_list_uses_cursor_links_and_cached_total(app, client, count_queries):
+    """测试文章列表提供游标翻页链接，近似总数缓存并随文章变更失效"""
+    _create_articles(12)
+
+    response = client.get('/articles')
+    html = response.data.decode('utf-8')
+    cursor = re.search(r'cursor=([\w-]+)', html).group(1)
+
+    with count_queries() as counter:
+        second = client.get(f'/articles?cursor={cursor}')
+    assert second.status_code == 200
+    assert not [s for s in counter.statements if 'count(' in s.lower()]
+
+    # 旧的页码链接仍然可用
+    assert client.get('/articles?page=2').status_code == 200
+
+    _create_articles(1)
+    with count_queries() as counter:
+        client.get('/articles')
+    assert [s for s in counter.statements if 'count(' in s.lower()]
+
+
+def test_comments_api_cursor(app, client):
+    """测试评论API的游标分页"""
+    article = _create_articles(1)[0]
+    for _ in range(3):
+        db.session.add(Comment(content='评论', author_id=article.author_id, article_id=article.id))
+    db.session.commit()
+
+    data = client.get(f'/api/articles/{article.id}/comments?cursor=&per_page=2').get_json()
+    assert len(data['comments']) == 2 and data['pagination']['has_next']
+    cursor = data['pagination']['next_cursor']
+
+    data = client.get(f'/api/articles/{article.id}/comments?cursor={cursor}&per_page=2').get_json()
+    assert len(data['comments']) == 1
+    assert not data['pagination']['has_next'] and data['pagination']['has_prev']
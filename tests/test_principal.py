@@ -0,0 +1,70 @@
+"""
+登录用户身份缓存测试
+Logged-in Principal Cache Tests
+"""
+from app import db
+from app.models import User, Admin
+from app.utils.principal import load_principal
+
+
+def _testuser():
+    return User.query.filter_by(username='testuser').first()
+
+
+def test_principal_loaded_once_and_cached(app, client, auth, count_queries):
+    """测试身份信息由一条查询加载，之后的请求直接读取缓存"""
+    db.session.add(Admin(user_id=_testuser().id))
+    db.session.commit()
+    auth.login()
+
+    with app.app_context(), count_queries() as counter:
+        assert client.get('/admin/').status_code == 200
+    statements = ' '.join(counter.statements)
+    assert 'FROM users LEFT OUTER JOIN admins' in statements
+    assert 'FROM admins' not in statements.replace('LEFT OUTER JOIN admins', '')
+
+    with app.app_context(), count_queries() as counter:
+        assert client.get('/admin/').status_code == 200
+    assert not any('JOIN admins' in statement for statement in counter.statements)
+
+    principal = load_principal(_testuser().id)
+    assert principal.is_admin() and not principal.is_super_admin()
+    assert principal.has_permission('user_management', 'delete')
+    assert not principal.has_permission('user_management', 'no_such_action')
+    assert load_principal(999) is None
+
+
+def test_permission_changes_invalidate_principal(app, client, auth):
+    """测试授予、修改和撤销管理员权限后立即生效"""
+    auth.login()
+    assert client.get('/admin/').status_code == 403
+
+    user = _testuser()
+    admin = Admin(user_id=user.id)
+    db.session.add(admin)
+    db.session.commit()
+    assert client.get('/admin/').status_code == 200
+
+    admin.remove_permission('comment_management', 'delete')
+    db.session.commit()
+    assert not load_principal(user.id).has_permission('comment_management', 'delete')
+    assert not admin.has_permission('comment_management', 'delete')
+    admin.add_permission('comment_management', 'delete')
+    assert admin.has_permission('comment_management', 'delete')
+
+    db.session.delete(admin)
+    db.session.commit()
+    assert client.get('/admin/').status_code == 403
+
+
+def test_profile_edit_through_principal(app, client, auth):
+    """测试通过身份对象修改资料写入用户记录，并刷新缓存的显示名称"""
+    auth.login()
+    response = client.post('/profile/edit', data={'nickname': '新昵称', 'bio': '简介'},
+                           follow_redirects=True)
+    assert '新昵称'.encode('utf-8') in response.data
+
+    db.session.expire_all()
+    user = _testuser()
+    assert (user.nickname, user.bio) == ('新昵称', '简介')
+    assert load_principal(user.id).get_display_name() == '新昵称'
@@ -0,0 +1,61 @@
+"""
+请求级查询分析测试
+Request-Scoped Query Profiler Tests
+"""
+import logging
+import os
+from app import db
+from app.models import User, Admin
+from app.utils.profiler import normalize_statement, reset_endpoint_stats, get_endpoint_stats
+
+
+def test_normalize_statement_folds_literals_and_in_lists():
+    """测试语句形态归一化合并空白、IN 列表和字面量"""
+    assert normalize_statement('SELECT *\n  FROM users WHERE id IN (?, ?, ?)') == \
+        'SELECT * FROM users WHERE id IN (?)'
+    assert normalize_statement("SELECT * FROM t WHERE name = 'a''b' LIMIT 10") == \
+        'SELECT * FROM t WHERE name = ? LIMIT ?'
+
+
+def test_server_timing_and_n_plus_one_warning(app, client, caplog):
+    """测试响应带 Server-Timing，重复语句记录 N+1 警告并汇总到端点统计"""
+    reset_endpoint_stats()
+    app.config['QUERY_PROFILER_N_PLUS_ONE_THRESHOLD'] = 3
+
+    def repeated_lookups():
+        for user_id in range(5):
+            db.session.execute(db.text('SELECT id FROM users WHERE id = :id'), {'id': user_id})
+        return 'ok'
+
+    app.add_url_rule('/_repeated', 'repeated_lookups', repeated_lookups)
+    with caplog.at_level(logging.WARNING):
+        response = client.get('/_repeated')
+    assert 'Server-Timing' not in response.headers
+
+    app.debug = True
+    response = client.get('/_repeated')
+    app.debug = False
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('db;dur=') and '5 queries' in timing
+
+    assert 'Possible N+1 query' in caplog.text and 'executed 5 times' in caplog.text
+
+    stats = {item['endpoint']: item for item in get_endpoint_stats()}['repeated_lookups']
+    assert stats['requests'] == 2 and stats['max_queries'] == 5
+    assert sum(stats['query_buckets']) == 2
+    assert stats['n_plus_one'] == [('SELECT id FROM users WHERE id = ?', 5)]
+
+
+def test_admin_performance_page(app, client, auth):
+    """测试管理员可以查看按端点汇总的统计"""
+    reset_endpoint_stats()
+    user = User.query.filter_by(username='testuser').first()
+    db.session.add(Admin(user_id=user.id))
+    db.session.commit()
+    auth.login()
+
+    assert 'Server-Timing' in client.get('/articles').headers
+    response = client.get('/admin/performance')
+    assert response.status_code == 200
+    assert b'article.list_articles' in response.data
+    assert f'PID {os.getpid()}'.encode() in response.data
@@ -0,0 +1,80 @@
+"""
+页面查询数量测试
+Per-Request Query Count Tests
+
+列表类页面的SQL查询数量不应随每页条目数增长（防止N+1查询回归）。
+"""
+import pytest
+from app import db
+from app.models import User, Admin, Category, Article, Comment
+from app.utils.principal import load_principal
+from app.services.category_registry import get_snapshot
+
+
+# 各页面允许的最大查询数量
+QUERY_BUDGETS = {
+    '/': 1,
+    '/articles': 2,
+    '/articles?keyword=article': 2,
+    '/my-articles': 2,
+    '/admin/articles': 2,
+}
+
+
+def _get(app, client, count_queries, url):
+    """在新的应用上下文中请求页面并统计查询数量，使请求拥有独立的会话，与线上一致"""
+    with app.app_context(), count_queries() as counter:
+        response = client.get(url)
+    assert response.status_code == 200
+    return counter
+
+
+def _seed_articles(count):
+    """创建指定数量的文章，每篇文章有不同作者、分类和评论"""
+    user = User.query.filter_by(username='testuser').first()
+    if user.admin is None:
+        db.session.add(Admin(user_id=user.id))
+    for i in range(count):
+        n = Article.query.count()
+        author = User(username=f'author{n}', email=f'author{n}@example.com', password='testpass')
+        category = Category(name=f'分类{n}', slug=f'category-{n}')
+        db.session.add_all([author, category])
+        db.session.flush()
+        # 一半文章属于当前登录用户，以覆盖"我的文章"页面
+        article = Article(title=f'article {n}', content='内容', category_id=category.id,
+                          author_id=user.id if i % 2 else author.id)
+        article.publish()
+        db.session.add(article)
+        db.session.flush()
+        db.session.add(Comment(content='评论', author_id=user.id, article_id=article.id))
+    db.session.commit()
+
+
+@pytest.mark.parametrize('url', sorted(QUERY_BUDGETS))
+def test_query_count_does_not_grow_with_rows(app, client, auth, count_queries, url):
+    """测试页面查询数量在预算内，且不随条目数增长"""
+    auth.login()
+
+    _seed_articles(2)
+    # 预热登录用户身份缓存，两次请求都不再查询用户和管理员记录
+    load_principal(User.query.filter_by(username='testuser').first().id)
+    # 新增分类后预热分类快照，统计的是快照有效时的稳定查询数量
+    get_snapshot()
+    few = _get(app, client, count_queries, url)
+
+    _seed_articles(6)
+    get_snapshot()
+    many = _get(app, client, count_queries, url)
+
+    assert many.count == few.count, many.statements
+    assert many.count <= QUERY_BUDGETS[url], many.statements
+
+
+@pytest.mark.parametrize('url', ['/', '/articles', '/my-articles', '/admin/articles'])
+def test_list_pages_do_not_load_article_content(app, client, auth, count_queries, url):
+    """测试列表页不读取文章正文（正文延迟加载，只在详情、编辑和搜索摘录时读取）"""
+    auth.login()
+    _seed_articles(3)
+
+    counter = _get(app, client, count_queries, url)
+    assert not any('articles.content AS' in statement for statement in counter.statements), counter.statements
@@ -0,0 +1,83 @@
+"""
+全文检索测试
+Full-Text Search Tests
+"""
+from app import db
+from app.models.article import Article
+from app.models.user import User
+from app.services.search import can_use_index, search_articles
+
+
+def _create_article(title, content, status='published', summary=None):
+    """创建测试文章"""
+    user = User.query.filter_by(username='testuser').first()
+    article = Article(title=title, content=content, author_id=user.id, status=status, summary=summary)
+    if status == 'published':
+        article.publish()
+    db.session.add(article)
+    db.session.commit()
+    return article
+
+
+def test_search_ranks_title_matches_first(app):
+    """测试标题匹配的相关度高于正文匹配"""
+    body_match = _create_article('普通文章', '这里讨论了全文检索的实现细节')
+    title_match = _create_article('全文检索入门', '一些介绍性的内容')
+    _create_article('无关文章', '完全不相关的内容')
+
+    assert can_use_index('全文检索')
+    results = search_articles('全文检索').all()
+    assert [a.id for a in results] == [title_match.id, body_match.id]
+
+
+def test_search_excludes_unpublished(app):
+    """测试只返回已发布文章"""
+    _create_article('草稿中的数据库优化', '内容', status='draft')
+    published = _create_article('数据库优化实践', '内容')
+
+    results = Article.search('数据库优化').all()
+    assert [a.id for a in results] == [published.id]
+
+
+def test_search_index_follows_edits_and_deletes(app):
+    """测试编辑和删除后索引增量更新"""
+    article = _create_article('缓存设计', '原始内容')
+
+    article.title = '索引设计'
+    db.session.commit()
+    assert search_articles('缓存设计').all() == []
+    assert [a.id for a in search_articles('索引设计')] == [article.id]
+
+    db.session.delete(article)
+    db.session.commit()
+    assert search_articles('索引设计').all() == []
+
+
+def test_short_keyword_falls_back_to_like(app):
+    """测试短关键词退回LIKE匹配"""
+    article = _create_article('Python 入门', '内容')
+
+    assert not can_use_index('Py')
+    assert [a.id for a in search_articles('Py')] == [article.id]
+
+
+def test_list_articles_uses_search(client, app):
+    """测试文章列表页关键词搜索"""
+    _create_article('全文检索入门', '内容')
+    _create_article('其他文章', '内容')
+
+    response = client.get('/articles?keyword=全文检索')
+    assert response.status_code == 200
+    assert '全文检索入门'.encode('utf-8') in response.data
+    assert '其他文章'.encode('utf-8') not in response.data
+
+
+def test_rebuild_command(app, runner):
+    """测试重建索引命令"""
+    article = _create_article('重建索引测试', '内容')
+    db.session.execute(db.text("DELETE FROM articles_fts"))
+    db.session.commit()
+
+    result = runner.invoke(args=['search-index', 'rebuild'])
+    assert '重建完成' in result.output
+    assert [a.id for a in search_articles('重建索引')] == [article.id]
@@ -0,0 +1,179 @@
+"""
+进程内检索引擎测试
+In-Process Search Engine Tests
+"""
+from datetime import datetime
+from app import db
+from app.models.article import Article
+from app.models.user import User
+from app.services import search_engine
+from app.services.search_engine import SearchEngine, tokenize, highlight_snippet
+
+
+def test_tokenize_cjk_bigrams_and_words():
+    """测试中文按二元组切分，英文按单词切分"""
+    assert tokenize('全文检索 Python3 入门') == ['全文', '文检', '检索', 'python3', '入门']
+    assert tokenize('<p>字</p>') == ['p', '字', 'p']
+
+
+def test_engine_ranks_and_filters():
+    """测试BM25排序、全部词项匹配和分类过滤"""
+    engine = SearchEngine()
+    engine.add(1, '数据库优化', None, '索引的使用', category_id=1, published_at=datetime(2024, 1, 1))
+    engine.add(2, '随笔', None, '今天聊聊数据库优化和缓存', category_id=2, published_at=datetime(2024, 1, 2))
+    engine.add(3, '数据结构', None, '链表与树', category_id=1, published_at=datetime(2024, 1, 3))
+
+    total, hits = engine.search('数据库优化')
+    assert total == 2
+    assert [article_id for article_id, _ in hits] == [1, 2]
+
+    total, hits = engine.search('数据库优化', category_id=2)
+    assert [article_id for article_id, _ in hits] == [2]
+
+
+def test_engine_incremental_updates_and_merge():
+    """测试增量更新、删除和段合并"""
+    engine = SearchEngine(merge_threshold=2)
+    engine.add(1, '缓存设计', None, '内容')
+    engine.add(2, '索引设计', None, '内容')  # 达到阈值，在后台合并到基础段
+    engine.wait_for_merge()
+    assert len(engine.base) == 2
+
+    engine.add(1, '队列设计', None, '内容')  # 基础段中的旧版本被标记为墓碑
+    assert engine.search('缓存设计') == (0, [])
+    assert [a for a, _ in engine.search('队列设计')[1]] == [1]
+
+    engine.remove(2)
+    assert engine.search('索引设计') == (0, [])
+    assert len(engine) == 1
+
+
+def test_merge_keeps_changes_made_while_building(monkeypatch):
+    """测试构建新段期间的写入和删除在替换基础段后仍然生效"""
+    engine = SearchEngine()
+    engine.add(1, '缓存设计', None, '内容')
+    engine.add(2, '索引设计', None, '内容')
+    original = search_engine.Segment.from_documents.__func__
+
+    def from_documents(cls, documents):
+        engine.add(3, '队列设计', None, '内容')
+        engine.add(2, '日志设计', None, '内容')
+        engine.remove(1)
+        return original(cls, documents)
+
+    monkeypatch.setattr(search_engine.Segment, 'from_documents', classmethod(from_documents))
+    engine.merge()
+    monkeypatch.undo()
+
+    assert sorted(engine.base.doc_ids) == [1, 2]
+    assert engine.article_ids() == {2, 3}
+    assert engine.search('缓存设计') == (0, [])
+    assert engine.search('索引设计') == (0, [])
+    assert [a for a, _ in engine.search('日志设计')[1]] == [2]
+    assert [a for a, _ in engine.search('队列设计')[1]] == [3]
+    assert len(engine) == 2
+
+
+def test_engine_persists_with_mmap(tmp_path):
+    """测试持久化并通过内存映射加载"""
+    engine = SearchEngine()
+    engine.add(7, '全文检索入门', '摘要', '正文内容')
+    engine.synced_at = datetime(2024, 5, 1)
+    engine.save(str(tmp_path))
+
+    loaded = SearchEngine.load(str(tmp_path))
+    assert isinstance(loaded.base.postings_docs, memoryview)
+    assert loaded.synced_at == datetime(2024, 5, 1)
+    assert [a for a, _ in loaded.search('检索')[1]] == [7]
+
+
+def test_save_keeps_generations_not_older_than_replaced(tmp_path):
+    """测试保存只清理比被替换的代更早的代目录，不删除其他进程新写入的代"""
+    engine = SearchEngine()
+    engine.add(7, '全文检索入门', '摘要', '正文内容')
+    engine.save(str(tmp_path))
+    first = search_engine._read_generation(str(tmp_path / 'CURRENT'))
+    (tmp_path / 'gen-1').mkdir()
+
+    engine.save(str(tmp_path))
+    # 另一个进程写完但尚未切换指针的代
+    pending = tmp_path / f'gen-{search_engine.time.time_ns()}'
+    pending.mkdir()
+    engine.save(str(tmp_path))
+
+    names = {p.name for p in tmp_path.iterdir()}
+    assert 'gen-1' not in names and first not in names
+    assert pending.name in names
+    assert search_engine._read_generation(str(tmp_path / 'CURRENT')) in names
+    assert not [name for name in names if name.startswith('tmp-')]
+
+
+def test_highlight_snippet_escapes_and_marks():
+    """测试高亮片段转义HTML并标记命中词"""
+    snippet = highlight_snippet('<b>前言</b> 关于全文检索的<script>说明</script>', '检索')
+    assert '<mark>检索</mark>' in snippet
+    assert '<script>' not in snippet
+
+
+def test_list_articles_served_by_engine(app, client, tmp_path, monkeypatch):
+    """测试启用引擎后文章搜索由引擎匹配，并随提交增量更新"""
+    monkeypatch.setattr(search_engine, '_engine', None)
+    app.config['SEARCH_BACKEND'] = 'engine'
+    app.config['SEARCH_ENGINE_PATH'] = str(tmp_path)
+
+    user = User.query.filter_by(username='testuser').first()
+    first = Article(title='全文检索入门', content='内容', author_id=user.id)
+    first.publish()
+    db.session.add(first)
+    db.session.commit()
+
+    search_engine.init_search_engine(app)
+    assert (tmp_path / 'CURRENT').exists()
+
+    second = Article(title='检索进阶', content='更多检索内容', author_id=user.id)
+    second.publish()
+    draft = Article(title='检索草稿', content='内容', author_id=user.id)
+    db.session.add_all([second, draft])
+    db.session.commit()
+
+    response = client.get('/articles?keyword=检索')
+    assert response.status_code == 200
+    assert '全文检索入门'.encode('utf-8') in response.data
+    assert '检索进阶'.encode('utf-8') in response.data
+    assert '检索草稿'.encode('utf-8') not in response.data
+    assert '<mark>检索</mark>'.encode('utf-8') in response.data
+
+
+def test_engine_refresh_removes_deleted_and_single_character_fallback(app, client, tmp_path, monkeypatch):
+    """测试后台删除检测移除其他进程删除的文章，单个汉字的关键词退回 LIKE 匹配"""
+    monkeypatch.setattr(search_engine, '_engine', None)
+    app.config['SEARCH_BACKEND'] = 'engine'
+    app.config['SEARCH_ENGINE_PATH'] = str(tmp_path)
+
+    user = User.query.filter_by(username='testuser').first()
+    kept = Article(title='全文检索入门', content='内容', author_id=user.id)
+    removed = Article(title='检索进阶', content='内容', author_id=user.id)
+    kept.publish()
+    removed.publish()
+    db.session.add_all([kept, removed])
+    db.session.commit()
+    kept_id, removed_id = kept.id, removed.id
+    search_engine.init_search_engine(app)
+
+    # 以集合语句删除（与批量删除和其他工作进程一样，不经过本进程的会话事件）
+    db.session.execute(Article.__table__.delete().where(Article.id == removed_id))
+    db.session.commit()
+    engine = search_engine.get_search_engine()
+    assert removed_id in engine.article_ids()
+    # 增量同步不读取全部ID，删除检测在后台线程中执行
+    search_engine.refresh_from_database(engine)
+    assert removed_id in engine.article_ids()
+    app.config['SEARCH_ENGINE_RECONCILE_INTERVAL'] = 0
+    search_engine.maybe_refresh(app)
+    search_engine._reconcile_thread.join(timeout=5)
+    assert engine.article_ids() == {kept_id}
+
+    assert not search_engine.can_use_engine('检')
+    assert search_engine.can_use_engine('检索 a')
+    response = client.get('/articles?keyword=检')
+    assert '全文检索入门'.encode('utf-8') in response.data
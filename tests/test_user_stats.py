@@ -0,0 +1,107 @@
+"""
+用户统计汇总测试
+User Statistics Rollup Tests
+"""
+from app import db
+from app.models import User, Article, Comment, UserStats
+from app.services.deletion import delete_articles, delete_user
+from app.services.view_counter import record_view, flush_view_counts
+
+
+def _stats(user_id):
+    db.session.expire_all()
+    return UserStats.get_for_user(user_id).to_dict()
+
+
+def _assert_consistent():
+    """汇总与实际数据一致：重新统计不需要修正任何行"""
+    assert UserStats.rebuild() == {'created': 0, 'fixed': 0}
+
+
+def _setup():
+    user = User.query.filter_by(username='testuser').first()
+    other = User(username='reader', email='reader@example.com', password='testpass')
+    db.session.add(other)
+    db.session.commit()
+    articles = [Article(title=f'文章{i}', content='内容', author_id=user.id) for i in range(3)]
+    db.session.add_all(articles)
+    db.session.commit()
+    return user, other, articles
+
+
+def test_stats_follow_orm_writes(app):
+    """测试文章和评论的增删改、浏览次数写入同步更新汇总"""
+    app.config['VIEW_COUNT_BUFFER'] = False
+    user, other, (draft, published, archived) = _setup()
+    published.publish()
+    archived.archive()
+    comment = Comment(content='评论', author_id=other.id, article_id=published.id)
+    db.session.add(comment)
+    db.session.commit()
+    db.session.add(Comment(content='回复', author_id=user.id, article_id=published.id, parent_id=comment.id))
+    db.session.commit()
+    record_view(published.id, count=3)
+
+    assert _stats(user.id) == {'user_id': user.id, 'article_count': 3, 'published_count': 1, 'draft_count': 1,
+                               'archived_count': 1, 'comment_count': 1, 'view_count': 3}
+    assert _stats(other.id)['comment_count'] == 1
+    _assert_consistent()
+
+    published.author_id = other.id
+    db.session.commit()
+    db.session.delete(db.session.get(Article, draft.id))
+    db.session.commit()
+    stats = _stats(user.id)
+    assert (stats['article_count'], stats['draft_count'], stats['view_count']) == (1, 0, 0)
+    assert _stats(other.id)['view_count'] == 3
+    _assert_consistent()
+
+
+def test_stats_follow_bulk_deletes(app):
+    """测试批量审核删除、批量删除文章和删除用户时扣除汇总"""
+    user, other, articles = _setup()
+    for article in articles:
+        db.session.add(Comment(content='评论', author_id=other.id, article_id=article.id))
+    db.session.commit()
+    root = Comment.query.first()
+    db.session.add(Comment(content='回复', author_id=user.id, article_id=root.article_id, parent_id=root.id))
+    db.session.commit()
+
+    Comment.bulk_moderate('delete', [Comment.id == root.id])
+    assert _stats(other.id)['comment_count'] == 2
+    assert _stats(user.id)['comment_count'] == 0
+    _assert_consistent()
+
+    delete_articles([articles[1].id])
+    assert _stats(user.id)['article_count'] == 2
+    assert _stats(other.id)['comment_count'] == 1
+    _assert_consistent()
+
+    user_id, other_id = user.id, other.id
+    delete_user(user_id)
+    assert db.session.get(UserStats, user_id) is None
+    assert _stats(other_id)['comment_count'] == 0
+    _assert_consistent()
+
+
+def test_profile_reads_stats_row(app, client, auth, count_queries):
+    """测试个人中心一次主键查询读取统计，汇总行缺失时即时统计，rebuild-stats 补齐"""
+    user, other, articles = _setup()
+    articles[0].publish()
+    db.session.commit()
+    auth.login()
+
+    with app.app_context(), count_queries() as counter:
+        response = client.get('/profile')
+    assert response.status_code == 200
+    assert not any('count(' in statement.lower() for statement in counter.statements)
+    assert sum('FROM user_stats' in statement for statement in counter.statements) == 1
+
+    UserStats.query.delete()
+    db.session.commit()
+    assert _stats(user.id)['article_count'] == 3
+    assert db.session.get(UserStats, user.id) is None
+
+    result = app.test_cli_runner().invoke(args=['users', 'rebuild-stats'])
+    assert '新增 2 行' in result.output
+    assert db.session.get(UserStats, user.id).published_count == 1
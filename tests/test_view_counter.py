@@ -0,0 +1,76 @@
+"""
+浏览次数缓冲测试
+Buffered View Count Tests
+"""
+from app import db
+from app.models import User, Article
+from app.services.view_counter import flush_view_counts
+
+
+def _create_article(title='浏览测试'):
+    """创建已发布的测试文章"""
+    user = User.query.filter_by(username='testuser').first()
+    article = Article(title=title, content='内容', author_id=user.id)
+    article.publish()
+    db.session.add(article)
+    db.session.commit()
+    return article
+
+
+def _stored_view_count(article_id):
+    """读取数据库中的浏览次数"""
+    return db.session.execute(
+        db.text('SELECT view_count FROM articles WHERE id = :id'), {'id': article_id}
+    ).scalar()
+
+
+def test_views_are_buffered_and_flushed_in_batch(app, client, count_queries):
+    """测试浏览次数先缓冲，达到阈值后每篇文章一条UPDATE批量写入"""
+    app.config['VIEW_COUNT_FLUSH_THRESHOLD'] = 5
+    app.config['VIEW_COUNT_FLUSH_INTERVAL'] = 3600
+    first = _create_article()
+    second = _create_article('另一篇')
+    updated_at = first.updated_at
+
+    with count_queries() as counter:
+        for _ in range(2):
+            client.get(f'/articles/{first.id}')
+            client.get(f'/articles/{second.id}')
+    assert not [s for s in counter.statements if s.startswith('UPDATE')]
+    assert _stored_view_count(first.id) == 0
+
+    response = client.get(f'/articles/{first.id}')  # 第5次浏览触发写入
+    assert response.status_code == 200
+    assert _stored_view_count(first.id) == 3
+    assert _stored_view_count(second.id) == 2
+
+    db.session.expire_all()
+    assert db.session.get(Article, first.id).updated_at == updated_at
+
+
+def test_flush_writes_remaining_views(app, client):
+    """测试退出前调用的写入函数会写入缓冲中剩余的浏览次数"""
+    app.config['VIEW_COUNT_FLUSH_INTERVAL'] = 3600
+    article = _create_article()
+    client.get(f'/articles/{article.id}')
+    assert _stored_view_count(article.id) == 0
+
+    assert flush_view_counts() == 1
+    assert _stored_view_count(article.id) == 1
+    assert flush_view_counts() == 0
+
+
+def test_unbuffered_write_failure_does_not_break_page(app, client, monkeypatch, caplog):
+    """测试关闭缓冲时浏览次数写入失败只记录错误，详情页正常返回"""
+    from sqlalchemy.exc import OperationalError
+    from app.services import view_counter
+
+    def fail(counts):
+        raise OperationalError('UPDATE articles', {}, Exception('lock wait timeout'))
+
+    app.config['VIEW_COUNT_BUFFER'] = False
+    monkeypatch.setattr(view_counter, '_write_counts', fail)
+    article = _create_article()
+    response = client.get(f'/articles/{article.id}')
+    assert response.status_code == 200
+    assert 'Failed to record view' in caplog.text
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+后台任务进程启动文件
+Background Job Worker Entry Point
+
+与 gunicorn 并行运行，执行请求中加入队列的任务：
+    python worker.py
+"""
+import os
+from app import create_app
+from app.services.jobs import run_worker
+
+# 获取配置环境（与 web 进程使用相同的 FLASK_ENV，未设置时使用 create_app 的默认配置）
+config_name = os.environ.get('FLASK_ENV') or 'default'
+
+# 创建应用实例
+app = create_app(config_name)
+
+if __name__ == '__main__':
+    run_worker(app)